@@ -0,0 +1,216 @@
+"""
+Benchmarks of the checks on synthetic documents.
+
+    python benchmarks/bench.py run [--sizes small medium] [--repeat 3] [--output results.json]
+                                   [--baseline baseline.json] [--threshold 0.25]
+    python benchmarks/bench.py compare <baseline.json> <results.json> [--threshold 0.25]
+    python benchmarks/bench.py generate <path.docx> [--size medium]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from prettytable import PrettyTable
+
+from generator import SPECS, generate_document
+
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 0.25
+# differences below this many seconds are noise, whatever the ratio
+MIN_DELTA = 0.005
+
+# checks reading the state left by the table of contents check
+PREREQUISITES = {
+    "check_titles": ["check_table_of_contents"],
+    "check_paragraphs": ["check_table_of_contents"],
+    "check_chapters": ["check_table_of_contents"],
+}
+
+
+def _measure(func: Callable[[], object], repeat: int, setup: Callable[[], object] = None) -> Dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        if setup is not None:
+            func(argument)
+        else:
+            func()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "median": statistics.median(times)}
+
+
+def check_names(checker_class) -> List[str]:
+    return sorted(name for name in dir(checker_class)
+                  if name.startswith("check_") and callable(getattr(checker_class, name)))
+
+
+def _bench_checker(checker_class, doc_path, repeat: int) -> Dict[str, Dict[str, float]]:
+    import aspose.words as aw
+
+    # main_check releases the layout of its document, so it gets fresh ones
+    doc = aw.Document(doc_path)
+    timings = {}
+    for name in check_names(checker_class):
+        def setup():
+            checker = checker_class(doc)
+            # layout is measured on its own, checks are timed with a ready one
+            checker.geometry
+            checker.document_text
+            checker.page_text_index
+            for prerequisite in PREREQUISITES.get(name, []):
+                getattr(checker, prerequisite)()
+            return checker
+
+        timings[name] = _measure(lambda checker: getattr(checker, name)(), repeat, setup)
+
+    timings["main_check"] = _measure(lambda checker: checker.main_check(), repeat,
+                                     lambda: checker_class(aw.Document(doc_path)))
+    return timings
+
+
+def _bench_layout(doc_path, repeat: int) -> Dict[str, float]:
+    import aspose.words as aw
+    from docsCheck.layout import DocumentGeometry, LayoutService, PageTextIndex
+    from docsCheck.text import DocumentText
+
+    def build(doc):
+        layout = LayoutService(doc)
+        DocumentGeometry.from_layout(layout)
+        PageTextIndex(layout, DocumentText(doc))
+        layout.release()
+
+    return _measure(build, repeat, lambda: aw.Document(doc_path))
+
+
+def _bench_startup(repeat: int) -> Dict[str, float]:
+    command = [sys.executable, "-m", "docsCheck", "--help"]
+    return _measure(lambda: subprocess.run(command, stdout=subprocess.DEVNULL, check=True), repeat)
+
+
+def run(sizes: List[str], repeat: int, documents_dir: str = None) -> dict:
+    import aspose.words as aw
+    from docsCheck import runners
+    from docsCheck.checker import allowed_checkers
+
+    try:
+        runners.set_license()
+    except runners.CheckError as err:
+        print(f"Лицензия не установлена, документы обрезаются ознакомительным режимом: {err}".strip(),
+              file=sys.stderr)
+
+    results = {
+        "version": RESULTS_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "aspose_words": getattr(aw, "__version__", ""),
+        },
+        "repeat": repeat,
+        "documents": {},
+        "timings": {"startup/help": _bench_startup(repeat)},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            spec = SPECS[size]
+            doc_path = os.path.join(documents_dir or tmp_dir, f"{size}.docx")
+            generate_document(spec).save(doc_path)
+
+            results["documents"][size] = {"spec": spec.to_dict(), "pages": aw.Document(doc_path).page_count}
+            results["timings"][f"{size}/load"] = _measure(lambda: aw.Document(doc_path), repeat)
+            results["timings"][f"{size}/layout"] = _bench_layout(doc_path, repeat)
+
+            for doc_type, checker_class in allowed_checkers.items():
+                for name, timing in _bench_checker(checker_class, doc_path, repeat).items():
+                    results["timings"][f"{size}/{doc_type}/{name}"] = timing
+                print(f"{size}: {doc_type} готово", file=sys.stderr)
+
+    return results
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Prints the comparison table, returns keys of the regressed measurements"""
+    table = PrettyTable(["Замер", "Было, с", "Стало, с", "Изменение"], border=True)
+    table.align = "l"
+    regressions = []
+    for key, timing in current["timings"].items():
+        if key not in baseline["timings"]:
+            continue
+        before = baseline["timings"][key]["median"]
+        after = timing["median"]
+        change = (after - before) / before if before else 0.0
+        mark = ""
+        if after > before * (1 + threshold) and after - before > MIN_DELTA:
+            regressions.append(key)
+            mark = " !"
+        table.add_row([key, f"{before:.4f}", f"{after:.4f}", f"{change:+.0%}{mark}"])
+
+    print(table)
+    return regressions
+
+
+def _report_regressions(regressions: List[str], threshold: float) -> int:
+    if regressions:
+        print(f"Замедление более чем на {threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print("Замедлений нет")
+    return 0
+
+
+def _load(path) -> dict:
+    with open(path, encoding="utf-8") as results_file:
+        return json.load(results_file)
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры времени проверок на синтетических документах")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--sizes", nargs="+", choices=list(SPECS), default=["small", "medium"])
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--output", default="benchmark.json")
+    run_parser.add_argument("--documents", help="директория для сгенерированных документов")
+    run_parser.add_argument("--baseline")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    generate_parser = commands.add_parser("generate")
+    generate_parser.add_argument("path")
+    generate_parser.add_argument("--size", choices=list(SPECS), default="medium")
+
+    options = parser.parse_args(args)
+
+    if options.command == "generate":
+        generate_document(SPECS[options.size]).save(options.path)
+        return 0
+
+    if options.command == "compare":
+        regressions = compare(_load(options.baseline), _load(options.results), options.threshold)
+        return _report_regressions(regressions, options.threshold)
+
+    results = run(options.sizes, options.repeat, options.documents)
+    with open(options.output, "w", encoding="utf-8") as output:
+        json.dump(results, output, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {options.output}")
+
+    if options.baseline:
+        regressions = compare(_load(options.baseline), results, options.threshold)
+        return _report_regressions(regressions, options.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
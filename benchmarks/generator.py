@@ -0,0 +1,184 @@
+"""Synthetic GOST 19.x documents for the benchmarks"""
+from dataclasses import asdict, dataclass
+
+import aspose.words as aw
+
+IDENTIFIER = "RU.17701729.05.01-01"
+# characters of body text in a paragraph and paragraphs on a page of 12pt text with 1.5 line spacing
+PARAGRAPH_LENGTH = 480
+PARAGRAPHS_PER_PAGE = 5
+# certification page, title page, annotation, table of contents and change registration page
+SERVICE_PAGES = 5
+
+
+@dataclass
+class DocumentSpec:
+    pages: int = 20
+    sections: int = 3
+    chapters: int = 4
+    subchapters: int = 2
+    # runs per body paragraph, every seventh run uses a wrong font
+    fragmentation: int = 2
+    # bullet list items after each subchapter
+    list_items: int = 1
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+SPECS = {
+    "small": DocumentSpec(pages=10, sections=3, chapters=4, subchapters=2, fragmentation=2, list_items=1),
+    "medium": DocumentSpec(pages=50, sections=5, chapters=8, subchapters=3, fragmentation=4, list_items=2),
+    "large": DocumentSpec(pages=200, sections=10, chapters=20, subchapters=4, fragmentation=8, list_items=3),
+}
+
+
+def _paragraphs_per_subchapter(spec: DocumentSpec) -> int:
+    body_pages = max(1, spec.pages - SERVICE_PAGES)
+    return max(1, round(body_pages * PARAGRAPHS_PER_PAGE / (spec.chapters * spec.subchapters)))
+
+
+def _write_front_matter(builder: aw.DocumentBuilder):
+    builder.paragraph_format.alignment = aw.ParagraphAlignment.CENTER
+    builder.writeln("ЛИСТ УТВЕРЖДЕНИЯ")
+    builder.writeln(IDENTIFIER + " 12 01-1-ЛУ")
+
+    table = builder.start_table()
+    for caption in ["Инв. № подл", "Подп. и дата", "Взам. инв", "Инв. № дубл", "Подп. и дата"]:
+        builder.insert_cell()
+        builder.write(caption)
+        builder.end_row()
+    builder.end_table()
+    # registration table is placed on the left margin
+    table.horizontal_anchor = aw.drawing.RelativeHorizontalPosition.PAGE
+    table.absolute_horizontal_distance = 5
+    for row in table.rows:
+        row.as_row().cells[0].cell_format.width = 20
+
+    builder.writeln("2024")
+    builder.insert_break(aw.BreakType.PAGE_BREAK)
+
+    builder.writeln("УТВЕРЖДЕН")
+    builder.writeln(IDENTIFIER + " 12 01-1-ЛУ")
+    builder.writeln("НАЗВАНИЕ ПРОГРАММЫ")
+    builder.writeln(IDENTIFIER + " 12 01-1")
+    builder.writeln("Листов 10")
+    builder.writeln("2024")
+
+
+def _write_headers_footers(builder: aw.DocumentBuilder):
+    builder.move_to_header_footer(aw.HeaderFooterType.HEADER_PRIMARY)
+    builder.current_section.headers_footers.link_to_previous(False)
+    builder.write(IDENTIFIER + " 12 01-1 ")
+    builder.insert_field("PAGE")
+
+    builder.move_to_header_footer(aw.HeaderFooterType.FOOTER_PRIMARY)
+    builder.start_table()
+    for cells in [["Изм.", "Лист", "№ докум.", "Подп.", "Дата"],
+                  [IDENTIFIER + " 12 01-1", "", "", "", ""],
+                  ["Инв. № подл.", "Подп. и дата", "Взам.", "", ""]]:
+        for text in cells:
+            builder.insert_cell()
+            builder.write(text)
+        builder.end_row()
+    builder.end_table()
+    builder.move_to_document_end()
+
+
+def _write_heading(builder: aw.DocumentBuilder, text: str, level: int):
+    builder.paragraph_format.style_identifier = (aw.StyleIdentifier.HEADING1 if level == 1
+                                                 else aw.StyleIdentifier.HEADING2)
+    builder.paragraph_format.alignment = (aw.ParagraphAlignment.CENTER if level == 1
+                                          else aw.ParagraphAlignment.LEFT)
+    builder.paragraph_format.first_line_indent = 0 if level == 1 else 20
+    builder.paragraph_format.space_after = 36
+    builder.font.bold = True
+    builder.font.name = "Times New Roman"
+    builder.writeln(text)
+
+
+def _start_body_text(builder: aw.DocumentBuilder):
+    builder.paragraph_format.style_identifier = aw.StyleIdentifier.NORMAL
+    builder.paragraph_format.space_after = 0
+    builder.paragraph_format.line_spacing = 18
+    builder.paragraph_format.alignment = aw.ParagraphAlignment.JUSTIFY
+    builder.font.bold = False
+    builder.font.name = "Times New Roman"
+    builder.font.size = 12
+
+
+def _write_paragraph(builder: aw.DocumentBuilder, number: str, fragmentation: int):
+    run_length = max(1, PARAGRAPH_LENGTH // fragmentation)
+    for fragment in range(fragmentation):
+        text = f"Фрагмент текста {number}.{fragment} "
+        if fragment % 7 == 3:
+            builder.font.name = "Arial"
+        builder.write((text * (run_length // len(text) + 1))[:run_length])
+        builder.font.name = "Times New Roman"
+    builder.writeln()
+
+
+def generate_document(spec: DocumentSpec) -> aw.Document:
+    """Document with the structure checked by BaseChecker, sizes are taken from spec"""
+    doc = aw.Document()
+    builder = aw.DocumentBuilder(doc)
+
+    page_setup = builder.page_setup
+    page_setup.paper_size = aw.PaperSize.A4
+    page_setup.left_margin = aw.ConvertUtil.millimeter_to_point(20)
+    page_setup.right_margin = aw.ConvertUtil.millimeter_to_point(10)
+    page_setup.bottom_margin = aw.ConvertUtil.millimeter_to_point(15)
+    page_setup.top_margin = aw.ConvertUtil.millimeter_to_point(25)
+    builder.font.name = "Times New Roman"
+    builder.font.size = 12
+    builder.paragraph_format.line_spacing = 18
+
+    _write_front_matter(builder)
+    builder.insert_break(aw.BreakType.SECTION_BREAK_NEW_PAGE)
+    _write_headers_footers(builder)
+
+    _write_heading(builder, "АННОТАЦИЯ", level=1)
+    _start_body_text(builder)
+    builder.paragraph_format.first_line_indent = 35
+    _write_paragraph(builder, "0", 1)
+    builder.insert_break(aw.BreakType.PAGE_BREAK)
+
+    builder.paragraph_format.alignment = aw.ParagraphAlignment.CENTER
+    builder.paragraph_format.first_line_indent = 0
+    builder.font.bold = True
+    builder.writeln("СОДЕРЖАНИЕ")
+    builder.font.bold = False
+    builder.insert_table_of_contents('\\o "1-3" \\h \\z \\u')
+
+    paragraphs = _paragraphs_per_subchapter(spec)
+    body_sections = max(1, spec.sections - 1)
+    chapters_per_section = max(1, -(-spec.chapters // body_sections))
+    for chapter in range(1, spec.chapters + 1):
+        if chapter > 1 and (chapter - 1) % chapters_per_section == 0:
+            builder.insert_break(aw.BreakType.SECTION_BREAK_NEW_PAGE)
+        else:
+            builder.insert_break(aw.BreakType.PAGE_BREAK)
+        _write_heading(builder, f"{chapter}. ГЛАВА НОМЕР {chapter}", level=1)
+
+        for subchapter in range(1, spec.subchapters + 1):
+            _write_heading(builder, f"{chapter}.{subchapter}. Подраздел {chapter}.{subchapter}", level=2)
+            _start_body_text(builder)
+            for paragraph in range(paragraphs):
+                # every fifth paragraph has no indent
+                builder.paragraph_format.first_line_indent = 35 if paragraph % 5 else 0
+                _write_paragraph(builder, f"{chapter}.{subchapter}.{paragraph}", spec.fragmentation)
+
+            if spec.list_items:
+                builder.list_format.apply_bullet_default()
+                for item in range(spec.list_items):
+                    builder.writeln(f"элемент перечисления {item}")
+                builder.list_format.remove_numbers()
+
+    builder.insert_break(aw.BreakType.PAGE_BREAK)
+    _write_heading(builder, "ЛИСТ РЕГИСТРАЦИИ ИЗМЕНЕНИЙ", level=1)
+
+    # page numbers of the table of contents need the layout
+    doc.update_fields()
+    doc.update_page_layout()
+    doc.update_fields()
+    return doc
@@ -1,15 +1,42 @@
+import argparse
 import os
 import sys
 from docsCheck import runners
 from prettytable import PrettyTable
-from docsCheck.checker import allowed_checkers
+from docsCheck.registry import FULL_TIER, TIERS, ProfileError, allowed_doc_types
+from docsCheck.utils import MessageTypes
+
+# subcommand modules and the aspose backend are imported on demand to keep
+# --help and argument validation fast
+
+# exit codes: a document has errors or was not checked to the end, a document or the arguments can not be checked
+EXIT_FAILED = 1
+EXIT_ERROR = 2
 
 HELP = """ИСПОЛЬЗОВАНИЕ:
-docsCheck <path_to_docx> <doc_type>
+docsCheck <path_to_docx> <doc_type> [--no-cache] [--clear-cache] [--incremental] [--profile[=<file.json>]]
+          [--jobs <N>] [--format table|stream|jsonl] [--low-memory[=<MB>]] [--tier quick|full]
+          [--fail-fast | --max-errors <N>] [--time-budget <сек>] [--check-budget <сек>]
 
 где:
 path_to_docx - абсолютный или относительный путь до анализируемого файла
 doc_type - один из доступных типов документов (опционально)
+--jobs - число потоков для независимых проверок документа (по умолчанию 1), проверки документа Aspose
+выполняются по очереди при любом числе потоков
+--format - вид вывода: table - таблица после завершения всех проверок (по умолчанию),
+stream - строки таблицы по мере завершения проверок, jsonl - по одному JSON-объекту на сообщение
+--low-memory - проверять документ по разделам в одном потоке, освобождая данные каждого раздела,
+--low-memory=<MB> - то же с пределом памяти процесса в мегабайтах, при превышении проверка останавливается
+--tier - набор проверок: full - все проверки (по умолчанию), quick - только не требующие разбиения
+на страницы (поля, шрифты, перечисления, содержание, разделы), ошибки указываются по разделам,
+.docx при этом читается напрямую, без Aspose
+--max-errors - остановить проверку, когда найдено больше N ошибок, сначала выполняются самые быстрые проверки,
+проверки шрифтов, абзацев, перечислений и интервалов считают ошибки по ходу обхода документа
+--fail-fast - остановить проверку после первой ошибки (то же, что --max-errors 0)
+--time-budget - время на документ в секундах, включая загрузку, --check-budget - время на каждую проверку,
+незавершённые за это время проверки перечисляются в результате, завершённые сохраняют свои результаты;
+документ проверяется в отдельном процессе, который завершается, если не вернул результат через 10 секунд
+после --time-budget
 
 Доступные типы документов:
 ОБЩЕЕ - Только общая проверка (по умолчанию),
@@ -18,6 +45,50 @@ doc_type - один из доступных типов документов (о
 ПЗ - Пояснительная записка
 ПИМИ - Программа и методика испытаний
 ТП - Текст программы
+Типы документов и их правила (разделы, поля, шрифт, идентификатор) описаны в TOML-профилях,
+дополнительные профили загружаются из директорий в переменной DOCSCHECK_PROFILES.
+
+Кэш результатов:
+Результаты проверки неизменённых документов берутся из кэша
+(~/.cache/docsCheck или путь из переменной DOCSCHECK_CACHE_DIR).
+--no-cache - проверить документ заново, не используя кэш
+--clear-cache - очистить кэш
+--incremental - перепроверить только изменённые с прошлой проверки разделы,
+колонтитулы и содержание, результаты остальных частей взять из прошлой проверки
+
+Профилирование:
+--profile - вывести для каждой проверки время, изменение памяти и число дорогих операций
+(clone, extract_pages, LayoutCollector, to_string, поиск страниц), кэш при этом не используется;
+проверки с общим обходом документа показаны строками "└" под общей строкой
+--profile=<file.json> - записать эти данные в JSON
+
+Пакетная проверка:
+docsCheck batch <path>... [--type <doc_type>] [--manifest <file>] [--jobs <N>] [--no-cache] [--clear-cache]
+                [--time-budget <сек>] [--check-budget <сек>]
+
+где:
+path - файл, директория или шаблон пути (например, "docs/**/*.docx")
+--type - тип документов (опционально)
+--manifest - файл со списком путей, по одному на строку (опционально)
+--jobs - число параллельных процессов проверки (по умолчанию - число ядер)
+--time-budget, --check-budget - как у проверки одного документа, процесс, не вернувший результат
+через 10 секунд после --time-budget, завершается, а документ отмечается как непроверенный
+
+Сервер проверки:
+docsCheck serve [--host <host>] [--port <port>] [--jobs <N>] [--time-budget <сек>] [--max-body <MB>]
+docsCheck client <path_to_docx> <doc_type> [--host <host>] [--port <port>] [--no-cache]
+
+Сервер держит загруженными Aspose и лицензию и принимает документы по адресу
+POST /check (JSON {"path": ..., "doc_type": ...} или содержимое файла), ответ - JSON.
+--jobs - число одновременных проверок на сервере (по умолчанию - число ядер)
+--time-budget - время на документ, процесс проверки, не вернувший результат через 10 секунд после него, завершается
+--max-body - наибольший размер запроса в мегабайтах (по умолчанию 100), на больший сервер отвечает 413
+Клиент проверяет документ сам, если сервер не запущен.
+
+Код завершения:
+0 - ошибок нет, 1 - найдены ошибки или проверка остановлена (--max-errors, --time-budget),
+2 - документ не проверен (неверные аргументы, нет файла, сбой проверки). Пакетная проверка завершается с кодом 2,
+если не проверен хотя бы один документ, иначе с кодом 1, если хотя бы в одном документе найдены ошибки.
 
 Помощь:
 docsCheck --help
@@ -29,7 +100,7 @@ def print_verdict(verdict):
     row_names = ["Позиция", "Стандарт", "Описание"]
     table = PrettyTable(row_names, border=True)
     rows = []
-    for message in verdict.messages:
+    for message in verdict.iter_messages():
         rows.append([message.position, message.standard, message.text])
     table.add_rows(rows)
     table.align["Описание"] = "l"
@@ -37,17 +108,203 @@ def print_verdict(verdict):
     print(table)
 
 
-def main():
-    args = sys.argv[1:]
-    if len(args) > 2 or len(args) < 1:
-        print("Неверное количество аргументов!")
+def _exit_code(verdict) -> int:
+    if verdict is None:
+        return EXIT_ERROR
+    return EXIT_FAILED if not verdict.ok or verdict.truncated else 0
+
+
+# widths of the streamed table columns, rows are printed before all the messages are known
+STREAM_COLUMNS = [("Позиция", 20), ("Стандарт", 14), ("Описание", 80)]
+
+
+def _stream_line(cells, fill=" ", separator="|"):
+    return separator + separator.join(f"{fill}{cell:{fill}<{width}}{fill}"
+                                      for cell, (_, width) in zip(cells, STREAM_COLUMNS)) + separator
+
+
+def print_stream(messages) -> int:
+    """Returns the number of printed messages"""
+    import textwrap
+
+    border = _stream_line([""] * len(STREAM_COLUMNS), fill="-", separator="+")
+    print(border)
+    print(_stream_line([name for name, _ in STREAM_COLUMNS]))
+    print(border, flush=True)
+    count = 0
+    for message in messages:
+        cells = [textwrap.wrap(str(value), width) or [""]
+                 for value, (_, width) in zip([message.position, message.standard, message.text], STREAM_COLUMNS)]
+        for i in range(max(len(lines) for lines in cells)):
+            print(_stream_line([lines[i] if i < len(lines) else "" for lines in cells]))
+        print(border, flush=True)
+        count += 1
+    return count
+
+
+def print_jsonl(messages) -> int:
+    """Returns the number of printed messages"""
+    import json
+
+    count = 0
+    for message in messages:
+        print(json.dumps(message.to_dict(), ensure_ascii=False), flush=True)
+        count += 1
+    return count
+
+
+def print_profile(profile):
+    from docsCheck.profiling import OPERATIONS
+
+    row_names = ["Проверка", "Время, с", "Память, МБ"] + OPERATIONS
+    table = PrettyTable(row_names, border=True)
+    totals = [0] * len(OPERATIONS)
+    for check in profile:
+        memory = "" if check.memory_delta is None else f"{check.memory_delta / 2 ** 20:+.1f}"
+        counts = [check.counts.get(operation, 0) for operation in OPERATIONS]
+        if check.part_of is None:
+            totals = [total + count for total, count in zip(totals, counts)]
+        # parts of a task are already counted in its row
+        name = check.check if check.part_of is None else f"  └ {check.check}"
+        table.add_row([name, f"{check.wall_time:.3f}", memory] + counts)
+    wall_time = sum(check.wall_time for check in profile if check.part_of is None)
+    table.add_row(["Всего", f"{wall_time:.3f}", ""] + totals)
+    table.align["Проверка"] = "l"
+    table.max_width["Проверка"] = 40
+    print(table)
+
+
+def write_profile(profile, path):
+    import json
+
+    with open(path, "w", encoding="utf-8") as profile_file:
+        json.dump([check.to_dict() for check in profile], profile_file, ensure_ascii=False, indent=2)
+    print(f"Профиль проверки записан в {path}")
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    def error(self, message):
+        raise ValueError(message)
+
+
+def print_batch_result(result):
+    if result.error is not None:
+        status = f"СБОЙ: {result.error}"
+    elif result.verdict.ok:
+        status = "OK"
+    else:
+        status = f"ошибок: {result.errors_count}, предупреждений: {result.warnings_count}"
+    print(f"[{status}] {result.path}", flush=True)
+
+
+def print_batch_report(results):
+    row_names = ["Файл", "Позиция", "Стандарт", "Описание"]
+    table = PrettyTable(row_names, border=True)
+    rows = []
+    for result in results:
+        filename = os.path.basename(result.path)
+        if result.error is not None:
+            rows.append([filename, "", "", result.error])
+            continue
+        for message in result.verdict.iter_messages():
+            rows.append([filename, message.position, message.standard, message.text])
+    table.add_rows(rows)
+    table.align["Описание"] = "l"
+    table.max_width["Описание"] = 80
+    table.max_width["Файл"] = 30
+    if rows:
+        print(table)
+
+    failed = sum(1 for result in results if result.error is not None)
+    passed = sum(1 for result in results if result.error is None and result.verdict.ok)
+    print(f"Проверено документов: {len(results)}, без ошибок: {passed}, "
+          f"с ошибками: {len(results) - passed - failed}, сбоев: {failed}")
+
+
+def clear_cache():
+    from docsCheck.cache import VerdictCache
+
+    VerdictCache().clear()
+    print("Кэш результатов проверки очищен")
+
+
+def batch_main(args):
+    from docsCheck import batch
+
+    parser = _ArgumentParser(prog="docsCheck batch", add_help=False)
+    parser.add_argument("sources", nargs="*")
+    parser.add_argument("--type", dest="doc_type", default=None)
+    parser.add_argument("--manifest", action="append", default=[])
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--clear-cache", action="store_true")
+    parser.add_argument("--time-budget", type=float, default=None)
+    parser.add_argument("--check-budget", type=float, default=None)
+    try:
+        options = parser.parse_args(args)
+    except ValueError as err:
+        print(f"Неверные аргументы: {err}")
         print(HELP)
-        return
+        return EXIT_ERROR
 
-    if args[0] == "--help":
+    if options.clear_cache:
+        clear_cache()
+
+    if options.doc_type is not None and options.doc_type not in allowed_doc_types():
+        print(f"Тип документа {options.doc_type} недоступен")
         print(HELP)
-        return
+        return EXIT_ERROR
+
+    sources = list(options.sources)
+    for manifest in options.manifest:
+        if not os.path.isfile(manifest):
+            print(f"Путь {manifest} не является файлом")
+            return EXIT_ERROR
+        sources.extend(batch.read_manifest(manifest))
+
+    doc_paths = batch.collect_documents(sources)
+    if not doc_paths:
+        print("Не найдено ни одного документа")
+        return EXIT_ERROR
+
+    results = []
+    for result in batch.run_batch(doc_paths, options.doc_type, jobs=options.jobs, use_cache=not options.no_cache,
+                                  time_budget=options.time_budget, check_budget=options.check_budget):
+        print_batch_result(result)
+        results.append(result)
+    print_batch_report(results)
+    if any(result.error is not None for result in results):
+        return EXIT_ERROR
+    return max(_exit_code(result.verdict) for result in results)
+
+
+def serve_main(args):
+    from docsCheck import server
+
+    parser = _ArgumentParser(prog="docsCheck serve", add_help=False)
+    parser.add_argument("--host", default=server.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=server.DEFAULT_PORT)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--time-budget", type=float, default=None)
+    parser.add_argument("--max-body", type=float, default=server.DEFAULT_MAX_BODY / 2 ** 20)
+    try:
+        options = parser.parse_args(args)
+    except ValueError as err:
+        print(f"Неверные аргументы: {err}")
+        print(HELP)
+        return EXIT_ERROR
 
+    try:
+        server.serve(options.host, options.port, jobs=options.jobs, time_budget=options.time_budget,
+                     max_body=int(options.max_body * 2 ** 20))
+    except runners.CheckError as err:
+        print(err)
+        return EXIT_ERROR
+    return 0
+
+
+def _resolve_document(args):
+    """Validates <path_to_docx> <doc_type> arguments, returns None after printing the reason of a failure"""
     workdir_path = os.getcwd()
     if os.path.isabs(args[0]):
         doc_path = args[0]
@@ -63,18 +320,173 @@ def main():
         print("Файл должен иметь расширение docx")
         return
 
-    allowed_doc_types = allowed_checkers.keys()
-
     doc_type = None
     if len(args) == 2:
-        if args[1] in allowed_doc_types:
+        if args[1] in allowed_doc_types():
             doc_type = args[1]
         else:
             print(f"Тип документа {args[1]} недоступен")
             print(HELP)
             return
 
-    verdict = runners.run_check(doc_path, doc_type)
+    return doc_path, doc_type
+
+
+def client_main(args):
+    from docsCheck import server
+
+    parser = _ArgumentParser(prog="docsCheck client", add_help=False)
+    parser.add_argument("document", nargs="+")
+    parser.add_argument("--host", default=server.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=server.DEFAULT_PORT)
+    parser.add_argument("--no-cache", action="store_true")
+    try:
+        options = parser.parse_args(args)
+    except ValueError as err:
+        print(f"Неверные аргументы: {err}")
+        print(HELP)
+        return EXIT_ERROR
+
+    if len(options.document) > 2:
+        print("Неверное количество аргументов!")
+        print(HELP)
+        return EXIT_ERROR
+
+    resolved = _resolve_document(options.document)
+    if resolved is None:
+        return EXIT_ERROR
+    doc_path, doc_type = resolved
+
+    try:
+        verdict = server.request_check(doc_path, doc_type, host=options.host, port=options.port,
+                                       use_cache=not options.no_cache)
+    except server.ServerUnavailable:
+        # no running server, the document is checked in this process
+        verdict = runners.run_check(doc_path, doc_type, use_cache=not options.no_cache)
+    except RuntimeError as err:
+        print(err)
+        return EXIT_ERROR
+
+    if verdict is not None:
+        print_verdict(verdict)
+    return _exit_code(verdict)
+
+
+def main() -> int:
+    """Exit code: 0 - no errors, EXIT_FAILED - errors or a stopped check, EXIT_ERROR - nothing checked"""
+    try:
+        return _main(sys.argv[1:])
+    except ProfileError as err:
+        print(err)
+        return EXIT_ERROR
+
+
+def _main_parser():
+    parser = _ArgumentParser(prog="docsCheck", add_help=False)
+    parser.add_argument("document", nargs="*")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--clear-cache", action="store_true")
+    parser.add_argument("--jobs", type=int, default=1)
+    # --profile prints the table, --profile=<file.json> writes the JSON
+    parser.add_argument("--profile", nargs="?", const="", default=None)
+    # --low-memory alone checks by sections, --low-memory=<MB> also sets the memory limit
+    parser.add_argument("--low-memory", nargs="?", type=int, const=0, default=None)
+    parser.add_argument("--tier", choices=TIERS, default=FULL_TIER)
+    parser.add_argument("--format", dest="output_format", choices=["table", "stream", "jsonl"], default="table")
+    parser.add_argument("--time-budget", type=float, default=None)
+    parser.add_argument("--check-budget", type=float, default=None)
+    # the incremental check reuses the results of the last one, so it is never stopped early
+    stop = parser.add_mutually_exclusive_group()
+    stop.add_argument("--incremental", action="store_true")
+    stop.add_argument("--fail-fast", dest="max_errors", action="store_const", const=0)
+    stop.add_argument("--max-errors", dest="max_errors", type=int, default=None)
+    return parser
+
+
+def _conflict(options):
+    """Returns the message for options given together that do not work together, None if there are none"""
+    streamed = options.output_format != "table"
+    budgets = options.time_budget is not None or options.check_budget is not None
+    if options.incremental and options.tier != FULL_TIER:
+        return "--incremental используется только с --tier full"
+    if options.max_errors is not None and streamed:
+        return "--fail-fast и --max-errors не используются с потоковым выводом"
+    if budgets and (options.incremental or streamed):
+        return "--time-budget и --check-budget не используются с --incremental и потоковым выводом"
+    if streamed and (options.incremental or options.profile is not None):
+        return "--incremental и --profile используются только с --format table"
+    return None
+
+
+def _main(args):
+    if args and args[0] == "batch":
+        return batch_main(args[1:])
+    if args and args[0] == "serve":
+        return serve_main(args[1:])
+    if args and args[0] == "client":
+        return client_main(args[1:])
+    if "--help" in args:
+        print(HELP)
+        return 0
+
+    try:
+        options = _main_parser().parse_intermixed_args(args)
+    except ValueError as err:
+        print(f"Неверные аргументы: {err}")
+        print(HELP)
+        return EXIT_ERROR
+
+    if options.clear_cache:
+        clear_cache()
+        if not options.document:
+            return 0
+    if not options.document or len(options.document) > 2:
+        print("Неверное количество аргументов!")
+        print(HELP)
+        return EXIT_ERROR
+
+    resolved = _resolve_document(options.document)
+    if resolved is None:
+        return EXIT_ERROR
+    doc_path, doc_type = resolved
+
+    conflict = _conflict(options)
+    if conflict is not None:
+        print(conflict)
+        return EXIT_ERROR
+
+    low_memory = options.low_memory is not None
+    memory_limit = options.low_memory * 2 ** 20 if options.low_memory else None
+    if options.output_format != "table":
+        messages = runners.iter_check(doc_path, doc_type, use_cache=not options.no_cache, jobs=options.jobs,
+                                      low_memory=low_memory, memory_limit=memory_limit, tier=options.tier)
+        try:
+            if options.output_format == "jsonl":
+                count = print_jsonl(messages)
+            else:
+                count = print_stream(messages)
+        except runners.CheckError as err:
+            print(err)
+            return EXIT_ERROR
+        return EXIT_FAILED if count else 0
+
+    verdict = runners.run_check(doc_path, doc_type, use_cache=not options.no_cache, incremental=options.incremental,
+                                profile=options.profile is not None, jobs=options.jobs, low_memory=low_memory,
+                                memory_limit=memory_limit, tier=options.tier, max_errors=options.max_errors,
+                                time_budget=options.time_budget, check_budget=options.check_budget)
     if verdict is None:
-        return
+        return EXIT_ERROR
     print_verdict(verdict)
+    errors = sum(message.message_type == MessageTypes.ERROR for message in verdict.iter_messages())
+    if verdict.truncated and options.max_errors is not None and errors > options.max_errors:
+        print("Проверка остановлена: превышено допустимое число ошибок, остальные проверки не выполнялись")
+
+    if options.profile:
+        write_profile(verdict.profile, options.profile)
+    elif options.profile is not None:
+        print_profile(verdict.profile)
+    return _exit_code(verdict)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
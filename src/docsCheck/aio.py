@@ -0,0 +1,153 @@
+"""Checks awaited from an asyncio event loop, run by reused worker processes that apply the license once"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Union
+
+from docsCheck import runners, workers
+from docsCheck.utils import Verdict
+
+# admitted checks waiting for a worker per worker, further callers wait for admission
+QUEUE_FACTOR = 4
+
+
+def _read_document(doc) -> bytes:
+    stream = runners.document_source(doc)
+    stream.seek(0)
+    return stream.read()
+
+
+async def _picklable(doc):
+    """Documents cross to the worker processes as paths or bytes"""
+    if isinstance(doc, (bytearray, memoryview)):
+        return bytes(doc)
+    if hasattr(doc, "read"):
+        return await asyncio.get_running_loop().run_in_executor(None, _read_document, doc)
+    return doc
+
+
+class AsyncChecker:
+    """
+    concurrency checks run at a time and queue_size more wait for a free worker, callers beyond them
+    wait for admission, so a burst of requests holds neither their documents nor the event loop.
+    Workers are started on the first check and reused, the checker is used from one event loop
+    """
+
+    def __init__(self, concurrency: int = None, queue_size: int = None, licence_path=None):
+        self.concurrency = concurrency or os.cpu_count() or 1
+        self.queue_size = self.concurrency * QUEUE_FACTOR if queue_size is None else queue_size
+        self.licence_path = licence_path
+        self._pool = workers.WorkerPool(self.concurrency, licence_path)
+        # threads waiting for the workers, one per running check
+        self._waiters = None
+        # asyncio primitives of python 3.8 bind to the loop they are created in, so they are created in it
+        self._admission = None
+        self._running = None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._waiters is None:
+            self._waiters = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="docsCheck")
+        return self._waiters
+
+    def _bind(self):
+        if self._admission is None:
+            self._admission = asyncio.Semaphore(self.concurrency + self.queue_size)
+            self._running = asyncio.Semaphore(self.concurrency)
+
+    async def check_async(self, doc, doc_type=None, **options) -> Verdict:
+        """
+        Verdict of the document, doc is a path, bytes, a memoryview or a binary file-like object
+        and options are the keyword arguments of runners.check_cached, the license is the one of the checker.
+        Raises CheckError if the document can not be checked. Cancelling the coroutine drops a waiting check
+        and stops a running one at its next node or section, a worker that does not stop within KILL_GRACE
+        is killed, as is one that does not return within KILL_GRACE over time_budget
+        """
+        self._bind()
+        async with self._admission:
+            doc = await _picklable(doc)
+            await self._running.acquire()
+            return await self._run(doc, doc_type, dict(options, licence_path=self.licence_path))
+
+    async def _run(self, doc, doc_type, options: dict) -> Verdict:
+        loop = asyncio.get_running_loop()
+        cancelled = threading.Event()
+        time_budget = options.get("time_budget")
+        kill_after = time_budget + workers.KILL_GRACE if time_budget is not None else None
+        job = self._executor().submit(self._pool.run, workers.check_job, doc, doc_type, options, True,
+                                      kill_after=kill_after, cancelled=cancelled.is_set)
+        # the slot is free once the worker is, a cancelled coroutine does not wait for its check to stop
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._running.release))
+
+        try:
+            return await asyncio.wrap_future(job)
+        except asyncio.CancelledError:
+            # a job not started yet is cancelled with the coroutine, a running one is cancelled in its worker
+            cancelled.set()
+            raise
+        except workers.WorkerDied as err:
+            raise workers.died_error(err, time_budget)
+
+    async def check_many(self, docs: Iterable, doc_type=None,
+                         **options) -> List[Union[Verdict, runners.CheckError]]:
+        """
+        Verdicts in the order of docs, a document that can not be checked gets its CheckError instead.
+        Documents are taken from docs only as fast as they are admitted, cancelling stops the checks in flight
+        """
+        results = []
+        running = set()
+
+        async def check(index, doc):
+            try:
+                results[index] = await self.check_async(doc, doc_type, **options)
+            except runners.CheckError as err:
+                results[index] = err
+
+        try:
+            for index, doc in enumerate(docs):
+                results.append(None)
+                running.add(asyncio.ensure_future(check(index, doc)))
+                if len(running) >= self.concurrency + self.queue_size:
+                    done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+            await asyncio.gather(*running)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.wait(running)
+        return results
+
+    def close(self):
+        """Stops the workers, a later check starts new ones"""
+        if self._waiters is not None:
+            self._waiters.shutdown()
+            self._waiters = None
+        self._pool.close()
+
+    async def __aenter__(self) -> "AsyncChecker":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+_default_checker = None
+
+
+def _checker() -> AsyncChecker:
+    global _default_checker
+    if _default_checker is None:
+        _default_checker = AsyncChecker()
+    return _default_checker
+
+
+async def check_async(doc, doc_type=None, **options) -> Verdict:
+    """AsyncChecker.check_async of the checker shared by the process, with a worker per core"""
+    return await _checker().check_async(doc, doc_type, **options)
+
+
+async def check_many(docs: Iterable, doc_type=None, **options) -> List[Union[Verdict, runners.CheckError]]:
+    """AsyncChecker.check_many of the checker shared by the process, with a worker per core"""
+    return await _checker().check_many(docs, doc_type, **options)
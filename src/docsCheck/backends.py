@@ -0,0 +1,385 @@
+"""Checks shared by the document backends, importable without loading aspose"""
+from abc import ABC, abstractmethod
+from math import isclose
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+from docsCheck.profiling import NULL_PROFILER
+from docsCheck.registry import FULL_TIER, QUICK_TIER, RuleProfile, get_profile
+from docsCheck.scheduler import CancellationToken, CheckTask, ErrorBudget, iter_tasks
+from docsCheck.utils import Message, MessageTypes, Verdict
+import re
+
+# optional item number, name and page number of a table of contents item
+TOC_ITEM = re.compile(r"((\d+(\.\d+)*\.?\s+)|^)(.*?)\s+(\d+)$")
+TITLE = re.compile(r"((\d+(\.\d+)*\.?\s+)|^)(.*?)$")
+
+# order of the check verdicts in the result of main_check
+MERGE_ORDER = ["check_page_margins", "check_certification_page", "check_title_page", "check_fonts", "check_footers",
+               "check_headers", "check_table_of_contents", "check_titles", "check_paragraphs", "check_lists",
+               "check_line_spacing", "check_chapters"]
+# order of the tasks of a run with an error budget: checks without the layout first,
+# the front pages that may be extracted and the checks waiting for them last
+CHEAP_FIRST = ["package", "check_page_margins", "layout", "check_table_of_contents", "check_chapters",
+               "check_fonts, check_lists", "check_fonts, check_paragraphs, check_lists, check_line_spacing",
+               "check_titles",
+               "certification_page_view", "title_page_view", "check_certification_page", "check_title_page",
+               "check_footers", "check_headers"]
+
+
+# value of aspose.words.PaperSize.A4, the other backends report paper sizes with the same numbers
+PAPER_A4 = 1
+
+
+class PageSetup(NamedTuple):
+    """Page setup of a section, margins in points"""
+    portrait: bool
+    paper_size: int
+    left_margin: float
+    right_margin: float
+    bottom_margin: float
+    top_margin: float
+
+
+class TocLink(NamedTuple):
+    """Hyperlink of a table of contents item to its title"""
+    # stripped text of the table of contents paragraph
+    item_text: str
+    # text of the paragraph with the bookmark the item links to, None if there is no such paragraph,
+    # then the title is looked for on the page of the item
+    pointed_text: Optional[str]
+    # bookmark of the backend, read by the checks of titles
+    bookmark: Any = None
+
+
+class DocumentChecks(ABC):
+    """
+    Scheduling of the checks and the checks that only read the parsed table of contents,
+    backends read the document and declare their checks in _check_tasks
+    """
+    profile: RuleProfile = get_profile()
+
+    toc_valid = False
+    names_to_numbers = None
+    sorted_numbers = None
+    name_to_page = None
+    name_to_real_name = None
+    name_to_bookmark = None
+    has_no_number = None
+    numbers_to_names = None
+
+    def __init__(self, profiler=NULL_PROFILER, jobs: int = 1, tier: str = FULL_TIER):
+        self.profiler = profiler
+        # threads running independent checks of main_check, parallel checks hold their data at the same time
+        self.jobs = jobs
+        # the quick tier never builds the layout, node level checks report sections instead of pages
+        self.tier = tier
+        # cancelled when a run with an error budget exceeds it, checks stop at the next node or section
+        self.cancel_token = CancellationToken()
+        # errors of a run of main_check with max_errors, node level checks stop their traversal once it is over
+        self.error_budget: Optional[ErrorBudget] = None
+
+    def release_layout(self):
+        pass
+
+    @abstractmethod
+    def _check_tasks(self) -> List[CheckTask]:
+        """Checks of main_check with the checks whose state they read, in the order of the sequential run"""
+
+    @abstractmethod
+    def _page_setups(self) -> Iterable[PageSetup]:
+        """Page setup of every section in the order of the document"""
+
+    def _profiled(self, check: Callable, *args, name: str = None):
+        with self.profiler.check(name or check.__name__):
+            return check(*args)
+
+    def _task(self, name: str, check: Callable, *requires: str) -> CheckTask:
+        return CheckTask(name, lambda: self._profiled(check, name=name), requires)
+
+    @staticmethod
+    def _main_verdict() -> Verdict:
+        return Verdict(position="Весь документ", standard="ГОСТ 19.103-78")
+
+    def main_check(self, max_errors: int = None, check_budget: float = None) -> Verdict:
+        """
+        With max_errors the cheapest checks run first and the run stops once more errors are found,
+        the partial verdict is marked as truncated. check_budget gives every check that many seconds,
+        the deadline of the whole run is the one of cancel_token. Checks over their time are reported by name,
+        the finished ones keep their results
+        """
+        try:
+            verdict = self._main_check(max_errors, check_budget)
+        finally:
+            self.error_budget = None
+            # an abandoned check still reads the layout
+            if not self.cancel_token.abandoned:
+                self.release_layout()
+
+        if self.profiler.enabled:
+            verdict.profile = self.profiler.checks
+        return verdict
+
+    def iter_check(self) -> Iterator[Message]:
+        """
+        Yields the messages of every check as soon as it finishes, checks run as in main_check.
+        Messages come in the order checks finish and are completed as the merge in main_check does
+        """
+        tasks = iter_tasks(self._check_tasks(), self.jobs)
+        try:
+            for _, result in tasks:
+                for verdict in (result if isinstance(result, list) else [result]):
+                    if isinstance(verdict, Verdict):
+                        yield from (self._main_verdict() + verdict).iter_messages()
+        finally:
+            # running checks are waited for before their layout is released
+            tasks.close()
+            if not self.cancel_token.abandoned:
+                self.release_layout()
+
+    def _main_check(self, max_errors: int = None, check_budget: float = None) -> Verdict:
+        main_verdict = self._main_verdict()
+
+        tasks = self._check_tasks()
+        if max_errors is not None:
+            # the order still respects the requirements, it is validated by the scheduler
+            tasks.sort(key=lambda task: CHEAP_FIRST.index(task.name))
+
+        verdicts = {}
+        budget = self.error_budget = ErrorBudget(max_errors) if max_errors is not None else None
+        for name, result in iter_tasks(tasks, self.jobs, self.cancel_token, check_budget):
+            # a task of several node level checks returns their verdicts in the order of its name
+            for check_name, verdict in zip(name.split(", "), result if isinstance(result, list) else [result]):
+                if not isinstance(verdict, Verdict):
+                    continue
+                verdicts[check_name] = verdict
+                if budget is not None:
+                    budget.settle(check_name, sum(message.message_type == MessageTypes.ERROR
+                                                  for message in verdict.iter_messages()))
+            if budget is not None and budget.exceeded:
+                self.cancel_token.cancel()
+
+        for name in MERGE_ORDER:
+            if name in verdicts:
+                main_verdict += verdicts[name]
+        main_verdict.truncated = self.cancel_token.cancelled
+
+        over_errors = budget is not None and budget.exceeded
+        if (check_budget is not None or self.cancel_token.deadline is not None) and not over_errors:
+            # checks stopped by a deadline or never started after the task they require was stopped
+            timed_out = [name for task in tasks for name in task.name.split(", ")
+                         if name in MERGE_ORDER and name not in verdicts]
+            if timed_out:
+                main_verdict.add_message("Превышено время проверки, не завершены: {}", args=(", ".join(timed_out),))
+                main_verdict.truncated = True
+        return main_verdict
+
+    def _location(self, number: int) -> str:
+        return f"Раздел {number}" if self.tier == QUICK_TIER else f"Страница {number}"
+
+    def check_page_margins(self) -> Verdict:
+        verdict = Verdict(position="Весь документ", standard="ГОСТ 19.106-78")
+        margins = self.profile.margin_points
+        tolerance = self.profile.margin_tolerance
+        for page_setup in self._page_setups():
+            if not page_setup.portrait:
+                verdict.add_message("Некорректная ориентация страницы. Она должна быть книжной.")
+            if page_setup.paper_size != PAPER_A4:
+                verdict.add_message(
+                    f"Документация оформляется на листах формата А4. Ваш формат - {page_setup.paper_size}"
+                )
+            if not isclose(page_setup.left_margin, margins["left"], rel_tol=tolerance):
+                verdict.add_message(
+                    "Неверный отступ слева. Требуемый - {:g}мм.", args=(self.profile.margins["left"],)
+                )
+            if not isclose(page_setup.right_margin, margins["right"], rel_tol=tolerance):
+                verdict.add_message(
+                    "Неверный отступ справа. Требуемый - {:g}мм.", args=(self.profile.margins["right"],)
+                )
+            if not isclose(page_setup.bottom_margin, margins["bottom"], rel_tol=tolerance):
+                verdict.add_message(
+                    "Неверный отступ снизу. Требуемый - {:g}мм.", args=(self.profile.margins["bottom"],)
+                )
+            if not isclose(page_setup.top_margin, margins["top"], rel_tol=tolerance):
+                verdict.add_message(
+                    "Неверный отступ сверху. Требуемый - {:g}мм.", args=(self.profile.margins["top"],)
+                )
+
+        return verdict
+
+    def _lists_report(self, parts: List[dict]) -> Verdict:
+        verdict = Verdict(standard="ГОСТ 19.106.78")
+        for page in sorted(set(page for part in parts for page in part["pages"])):
+            verdict.add_message(
+                "Допускается использовать перечисления только с дефисом.",
+                position=self._location(page)
+            )
+
+        if any(part["has_hyphen"] for part in parts):
+            verdict.add_message("Рекомендуется использовать только нумерованные перечисления.",
+                                position="Весь документ",
+                                message_type=MessageTypes.WARNING)
+
+        return verdict
+
+    def _fonts_report(self, parts: List[dict]) -> Verdict:
+        verdict = Verdict()
+        for page_number in sorted(set(page for part in parts for page in part["pages"])):
+            verdict.add_message(
+                'Используется некорректный шрифт, используйте "{}" 12 или 14',
+                position=self._location(page_number),
+                args=(self.profile.font,)
+            )
+        return verdict
+
+    def check_chapters(self):
+        verdict = Verdict(position="Веcь документ", standard=self.profile.standard)
+        if self.toc_valid:
+            numerated = set(self.name_to_page.keys())
+            if self.toc_valid:
+                for chapter in self.profile.chapters:
+                    if not (chapter.lower() in self.has_no_number or chapter.lower() in numerated):
+                        verdict.add_message('Нет необходимого раздела "{}"', args=(chapter,))
+
+        return verdict
+
+    def _read_table_of_contents(self, links: Iterable[TocLink],
+                                start_page: Callable[[], int] = None,
+                                is_text_on_page: Callable[..., bool] = None) -> Verdict:
+        """
+        Checks the items of the table of contents and keeps their names, numbers and pages for the next checks.
+        start_page gives the 1-based page of the table of contents and is_text_on_page(text, page_number, lower)
+        looks for a text on a page, without them the checks of pages are skipped
+        """
+        verdict = Verdict(position="Содержание", standard="ГОСТ 19.106-78")
+        toc_exists = False
+        toc_numeration_valid = True
+        toc_valid = True
+
+        names_to_numbers = {}  # key - name: value - structured number 1.x.x
+        numbers_to_names = {}
+        unsorted_numbers = []
+        name_to_page = {}
+        name_to_real_name = {}
+        name_to_bookmark = {}
+        has_no_number = set()
+        was_numerated = False
+
+        allowed_before_numbers = ['аннотация', 'глоссарий']
+        allowed_after_numbers = ['лист регистрации изменений']
+
+        for link in links:
+            toc_exists = True
+            matched = TOC_ITEM.search(link.item_text)
+            if matched is None:
+                continue
+
+            name_in_toc = matched.group(4)
+            number_in_toc = matched.group(2)
+            page_number = matched.group(5)
+
+            cleared_name = name_in_toc.strip().lower()
+            name_to_page[cleared_name] = int(page_number)
+
+            if number_in_toc:
+                was_numerated = True
+                number_in_toc = number_in_toc.strip()
+                if number_in_toc[-1] != ".":
+                    verdict.add_message("Номера пунктов должны оканчиваться точкой")
+                number_in_toc = number_in_toc.strip(".")
+
+                structure_number = list(map(int, number_in_toc.split(".")))
+                if len(structure_number) > 4:
+                    toc_numeration_valid = False
+                    verdict.add_message(
+                        "Минимальная единица документа - подпункт с номером вида x.x.x.x"
+                        "Более мелкие единицы относятся к перечислениям и в содержании не указываются"
+                    )
+                    break
+
+                while len(structure_number) != 4:
+                    structure_number.append(0)
+                unsorted_numbers.append(tuple(structure_number))
+                names_to_numbers[cleared_name] = tuple(structure_number)
+                numbers_to_names[tuple(structure_number)] = cleared_name
+            else:
+                has_no_number.add(cleared_name)
+                if was_numerated:
+                    if not (cleared_name in allowed_after_numbers or "приложение" in cleared_name):
+                        verdict.add_message(
+                            f"Пункт {name_in_toc} должен быть пронумерован "
+                            f"или находиться перед содержанием документа"
+                        )
+                else:
+                    if not (cleared_name in allowed_before_numbers):
+                        verdict.add_message(
+                            f"Пункт {name_in_toc} должен быть пронумерован или находиться в конце документа"
+                        )
+
+            name_to_bookmark[name_in_toc.lower().strip()] = link.bookmark
+            pointed_text = link.pointed_text
+            title = TITLE.search(pointed_text) if pointed_text is not None else None
+            if title is not None:
+                real_name = title.group(4).strip()
+                if not (cleared_name == pointed_text.lower().strip() or real_name.lower() == cleared_name):
+                    verdict.add_message(
+                        f'Заголовок содержания "{name_in_toc}" не совпадает с заголовком в тексте'
+                    )
+                    toc_valid = False
+                else:
+                    name_to_real_name[cleared_name] = real_name
+            elif is_text_on_page is None:
+                # the title is looked for on its page, that needs the layout
+                name_to_real_name[cleared_name] = name_in_toc.strip()
+            elif not is_text_on_page(name_in_toc.lower().strip(), page_number):
+                verdict.add_message(
+                    f'Заголовок содержания "{name_in_toc}" не совпадает с заголовком в тексте'
+                )
+                toc_valid = False
+            else:
+                name_to_real_name[cleared_name] = name_in_toc.strip()
+
+        if not toc_exists:
+            verdict.add_message("В документе нет содержания")
+            return verdict
+
+        if start_page is None:
+            # pages of the table of contents are checked only by the full tier
+            toc_start_page = None
+        else:
+            toc_start_page = start_page()  # this is 1-based index
+            if not is_text_on_page("СОДЕРЖАНИЕ", toc_start_page - 1, lower=False):
+                verdict.add_message("Страница содержания должна содержать заголовок 'СОДЕРЖАНИЕ'")
+        name_to_page["содержание"] = toc_start_page
+
+        sorted_numbers = sorted(unsorted_numbers)
+        if toc_numeration_valid:
+            if sorted_numbers != unsorted_numbers:
+                verdict.add_message("Нарушен порядок нумерации в содержании и тексте документа")
+            if sorted_numbers and toc_start_page is not None:
+                first_element_page = name_to_page[numbers_to_names[sorted_numbers[0]]]
+                if first_element_page <= toc_start_page:
+                    verdict.add_message("Содержание должно находиться перед основным текстом на отдельной странице.")
+
+        if "аннотация" in has_no_number:
+            if toc_start_page is not None and toc_start_page < name_to_page["аннотация"]:
+                verdict.add_message("Аннотация должна быть перед содержанием")
+        else:
+            verdict.add_message("Аннотация не нумеруется")
+
+        if "содержание" in has_no_number:
+            verdict.add_message("Содержание не указывается в содержании и не нумеруется.")
+
+        if "лист регистрации изменений" not in has_no_number:
+            verdict.add_message("Лист регистрации изменений не нумеруется")
+
+        if toc_valid and toc_numeration_valid:
+            self.toc_valid = True
+            self.names_to_numbers = names_to_numbers
+            self.sorted_numbers = sorted_numbers
+            self.name_to_page = name_to_page
+            self.name_to_real_name = name_to_real_name
+            self.name_to_bookmark = name_to_bookmark
+            self.has_no_number = has_no_number
+            self.numbers_to_names = numbers_to_names
+
+        return verdict
@@ -0,0 +1,198 @@
+import glob
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from docsCheck import runners, workers
+from docsCheck.cache import VerdictCache
+from docsCheck.utils import MessageTypes, Verdict
+from docsCheck.workers import KILL_GRACE, Worker, WorkerDied
+
+
+@dataclass
+class BatchResult:
+    path: str
+    verdict: Optional[Verdict] = None
+    error: Optional[str] = None
+
+    @property
+    def errors_count(self) -> int:
+        if self.verdict is None:
+            return 0
+        return len(self.verdict.group_by("message_type").get((MessageTypes.ERROR,), []))
+
+    @property
+    def warnings_count(self) -> int:
+        if self.verdict is None:
+            return 0
+        return len(self.verdict.group_by("message_type").get((MessageTypes.WARNING,), []))
+
+
+def read_manifest(manifest_path) -> List[str]:
+    """One document path per line, relative paths are resolved against the manifest directory"""
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    paths = []
+    with open(manifest_path, encoding="utf-8") as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            paths.append(line if os.path.isabs(line) else os.path.join(base_dir, line))
+
+    return paths
+
+
+def collect_documents(sources: Iterable[str]) -> List[str]:
+    """Expands directories and glob patterns into the list of .docx files"""
+    documents = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                for name in sorted(files):
+                    # skip Word lock files
+                    if name.endswith(".docx") and not name.startswith("~$"):
+                        documents.append(os.path.join(root, name))
+        elif glob.has_magic(source):
+            documents.extend(sorted(glob.glob(source, recursive=True)))
+        else:
+            documents.append(source)
+
+    seen = set()
+    unique = []
+    for path in documents:
+        path = os.path.abspath(path)
+        if path not in seen:
+            seen.add(path)
+            unique.append(path)
+
+    return unique
+
+
+def _check_one(doc_path, doc_type, time_budget=None, check_budget=None) -> BatchResult:
+    if workers.license_error() is not None:
+        return BatchResult(doc_path, error=workers.license_error())
+
+    if not os.path.isfile(doc_path):
+        return BatchResult(doc_path, error=f"Путь {doc_path} не является файлом")
+    if os.path.splitext(doc_path)[1] != ".docx":
+        return BatchResult(doc_path, error="Файл должен иметь расширение docx")
+
+    try:
+        return BatchResult(doc_path, verdict=runners.check_document(doc_path, doc_type, time_budget=time_budget,
+                                                                    check_budget=check_budget))
+    except runners.CheckError as err:
+        return BatchResult(doc_path, error=str(err))
+    except Exception as err:
+        return BatchResult(doc_path, error=f"Ошибка при проверке: {err!r}")
+
+
+def _kill_deadline(time_budget) -> float:
+    return time_budget + KILL_GRACE if time_budget is not None else None
+
+
+def _timed_out(doc_path, time_budget) -> BatchResult:
+    return BatchResult(doc_path, error=f"Проверка прервана: документ не проверен за {time_budget:g} с")
+
+
+def run_batch(doc_paths: List[str], doc_type=None, jobs=1, licence_path=None,
+              use_cache=True, time_budget=None, check_budget=None) -> Iterator[BatchResult]:
+    """
+    Yields results as soon as documents are checked, order is not preserved.
+    Cached verdicts are yielded first, the rest is checked by worker processes
+    applying the license once, jobs=0 checks documents in the current process.
+    time_budget and check_budget in seconds are those of runners.check_document, a worker that does not return
+    the partial verdict within KILL_GRACE over the budget of its document is killed
+    """
+    if not use_cache:
+        yield from _run_workers(doc_paths, doc_type, jobs, licence_path, time_budget, check_budget)
+        return
+
+    cache = VerdictCache()
+    keys = {}
+    to_check = []
+    for doc_path in doc_paths:
+        try:
+            key = cache.key(doc_path, doc_type)
+        except OSError:
+            # reported by the worker
+            to_check.append(doc_path)
+            continue
+
+        verdict = cache.get(key)
+        if verdict is not None:
+            yield BatchResult(doc_path, verdict=verdict)
+        else:
+            keys[doc_path] = key
+            to_check.append(doc_path)
+
+    for result in _run_workers(to_check, doc_type, jobs, licence_path, time_budget, check_budget):
+        if result.verdict is not None and not result.verdict.truncated and result.path in keys:
+            cache.put(keys[result.path], result.verdict)
+        yield result
+
+
+def _run_workers(doc_paths: List[str], doc_type, jobs, licence_path, time_budget=None,
+                 check_budget=None) -> Iterator[BatchResult]:
+    if not doc_paths:
+        return
+
+    if jobs <= 0:
+        try:
+            runners.set_license(licence_path)
+        except runners.CheckError as err:
+            yield from (BatchResult(doc_path, error=str(err).strip()) for doc_path in doc_paths)
+            return
+        for doc_path in doc_paths:
+            yield _check_one(doc_path, doc_type, time_budget, check_budget)
+        return
+
+    kill_deadline = _kill_deadline(time_budget)
+    queue = deque(doc_paths)
+    idle: List[Worker] = []
+    # no more than one document per worker is in flight, workers and their documents by their connection
+    busy: Dict[Connection, Tuple[Worker, str]] = {}
+    try:
+        while queue or busy:
+            while queue and len(busy) < jobs:
+                worker = idle.pop() if idle else Worker(licence_path)
+                doc_path = queue.popleft()
+                try:
+                    worker.submit(_check_one, doc_path, doc_type, time_budget, check_budget, kill_after=kill_deadline)
+                except WorkerDied:
+                    yield BatchResult(doc_path, error="Процесс проверки аварийно завершился")
+                    continue
+                busy[worker.connection] = (worker, doc_path)
+            if not busy:
+                # every document left failed to start, there is nothing to wait for
+                continue
+
+            timeout = None
+            if kill_deadline is not None:
+                timeout = max(0.0, min(worker.kill_at for worker, _ in busy.values()) - time.monotonic())
+            # a dead worker closes its end of the connection, so a crash wakes the wait as a result does
+            for connection in wait(list(busy), timeout):
+                worker, doc_path = busy.pop(connection)
+                try:
+                    result = worker.received()
+                except WorkerDied:
+                    yield BatchResult(doc_path, error="Процесс проверки аварийно завершился")
+                    continue
+                if not worker.retired:
+                    idle.append(worker)
+                yield result
+
+            now = time.monotonic()
+            for connection, (worker, doc_path) in list(busy.items()):
+                if worker.kill_at is not None and worker.kill_at <= now:
+                    del busy[connection]
+                    worker.kill()
+                    yield _timed_out(doc_path, time_budget)
+    finally:
+        # a consumer stopping early leaves no worker behind
+        for worker, _ in busy.values():
+            worker.kill()
+        for worker in idle:
+            worker.close()
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+from docsCheck.registry import FULL_TIER, rules_version
+from docsCheck.utils import Verdict
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+_CHUNK_SIZE = 1024 * 1024
+
+
+def write_atomic(path: str, data: bytes) -> bool:
+    """
+    Writes a temporary file first, so concurrent readers never see a partial file.
+    False if the file can not be written, an unwritable cache only turns the caching off
+    """
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    return True
+
+
+def _hash_stream(stream, content_hash):
+    for chunk in iter(lambda: stream.read(_CHUNK_SIZE), b""):
+        content_hash.update(chunk)
+
+
+def default_cache_dir() -> str:
+    if os.environ.get("DOCSCHECK_CACHE_DIR"):
+        return os.environ["DOCSCHECK_CACHE_DIR"]
+    base_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base_dir, "docsCheck")
+
+
+class VerdictCache:
+    """
+    On-disk verdicts keyed by document content, document type and rule set version.
+    Least recently used entries are evicted when the cache grows over max_size bytes.
+    """
+
+    def __init__(self, cache_dir: str = None, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_size = max_size
+        self._size = None
+
+    @staticmethod
+    def key(doc_path, doc_type=None, tier=FULL_TIER) -> str:
+        """doc_path is a path or a binary stream read from its current position"""
+        content_hash = hashlib.sha256()
+        if hasattr(doc_path, "read"):
+            _hash_stream(doc_path, content_hash)
+        else:
+            with open(doc_path, "rb") as doc_file:
+                _hash_stream(doc_file, content_hash)
+
+        key_hash = hashlib.sha256()
+        # BaseChecker is used for both an omitted type and "ОБЩЕЕ"
+        for part in [content_hash.hexdigest(), doc_type or "ОБЩЕЕ", rules_version(), tier]:
+            key_hash.update(part.encode("utf-8"))
+            key_hash.update(b"\0")
+        return key_hash.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, key: str) -> Optional[Verdict]:
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding="utf-8") as entry:
+                verdict = Verdict.from_dict(json.load(entry))
+            # modification time is the last use for the eviction order
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return verdict
+
+    def put(self, key: str, verdict: Verdict):
+        data = json.dumps(verdict.to_dict(), ensure_ascii=False).encode("utf-8")
+        if not write_atomic(self._entry_path(key), data):
+            return
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += len(data)
+        if self._size > self.max_size:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[str, int, float]]:
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for bucket in os.scandir(self.cache_dir):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith(".json"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for path, entry_size, _ in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+        self._size = size
+
+    def clear(self):
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._size = 0
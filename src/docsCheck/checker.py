@@ -1,11 +1,25 @@
+import threading
 from datetime import datetime
 
 from docsCheck.utils import *
-from math import isclose
+from docsCheck.backends import DocumentChecks, PageSetup, TocLink
+from docsCheck.registry import FULL_TIER, QUICK_TIER, RuleProfile, get_profile, get_profiles
+from docsCheck.incremental import PackageFingerprints, fingerprint
+from docsCheck.layout import DocumentGeometry, LayoutService, PageTextIndex, PageView
+from docsCheck.profiling import EXTRACT_PAGES, NULL_PROFILER, MemoryGuard
+from docsCheck.rules import RuleEngine
+from docsCheck.scheduler import CheckTask
+from docsCheck.text import DocumentText
+from typing import Callable, Dict, Iterator, Optional, Tuple
 import re
 
 import aspose.words as aw
 
+NodeRule = Callable[[RuleEngine], Callable[[], dict]]
+NodeReport = Callable[[List[dict]], Verdict]
+
+NUMBERED_TEXT = re.compile(r"(\d+(\.\d+)*\.?\s+)(.*?)$")
+
 
 def is_empty_string(string: str):
     empty_symbols = ["\r", "\n", "\r", " ", "\r\n"]
@@ -16,102 +30,199 @@ def is_empty_string(string: str):
     return True
 
 
-class UnitChecks:
+class UnitChecks(DocumentChecks):
+    """Aspose backend, reads the layout and extracts pages for the checks that need pagination"""
     doc: aw.Document
-    doc_type: str = ""
-    doc_type_id: str = ""
     doc_identifier: str = None
 
-    def __init__(self, doc: aw.Document):
+    def __init__(self, doc: aw.Document, profiler=NULL_PROFILER, jobs: int = 1, memory_guard: MemoryGuard = None,
+                 tier: str = FULL_TIER):
         if not type(doc) is aw.Document:
             raise ValueError("doc parameter should provide aspose.words.Document")
+        # low memory mode: node level checks run section by section and the guard is checked after each one,
+        # parallel checks would hold their data at the same time
+        super().__init__(profiler, 1 if memory_guard is not None else jobs, tier)
         self.doc = doc
-
-    def _check_footers_headers(self, is_header=True):
+        self.memory_guard = memory_guard
+        # aspose supports one thread at a time per document, parallel tasks take turns on it
+        self._document_lock = threading.Lock()
+        self._rules_section = None
+        self._layout = None
+        self._page_text_index = None
+        self._document_text = None
+        self._geometry = None
+        self._page_views = {}
+
+    def _task(self, name: str, check: Callable, *requires: str) -> CheckTask:
+        task = super()._task(name, check, *requires)
+
+        def run():
+            with self._document_lock:
+                return task.run()
+
+        return CheckTask(name, run, task.requires)
+
+    @property
+    def layout(self) -> LayoutService:
+        if self._layout is None:
+            self._layout = LayoutService(self.doc, self.profiler)
+        return self._layout
+
+    @property
+    def document_text(self) -> DocumentText:
+        if self._document_text is None:
+            self._document_text = DocumentText(self.doc, self.profiler)
+        return self._document_text
+
+    @property
+    def page_text_index(self) -> PageTextIndex:
+        if self._page_text_index is None:
+            self._page_text_index = PageTextIndex(self.layout, self.document_text)
+        return self._page_text_index
+
+    @property
+    def geometry(self) -> DocumentGeometry:
+        if self._geometry is None:
+            self._geometry = DocumentGeometry.from_layout(self.layout)
+        return self._geometry
+
+    def release_layout(self):
+        if self._layout is not None:
+            self._layout.release()
+            self._layout = None
+
+    def _page_view(self, first_page: int, last_page: int = None) -> PageView:
+        """0-based pages of the document, extracted only if a node crosses the bounds of the range"""
+        if last_page is None:
+            last_page = first_page
+        key = (first_page, last_page)
+        if key not in self._page_views:
+            view = PageView.from_layout(self.layout, self.geometry, first_page, last_page)
+            if view is None:
+                self.profiler.count(EXTRACT_PAGES)
+                pages = self.doc.extract_pages(first_page, last_page - first_page + 1)
+                view = PageView.from_document(pages, first_page, last_page)
+            self._page_views[key] = view
+        return self._page_views[key]
+
+    def _to_text(self, node: aw.Node) -> str:
+        return self.document_text.text(node)
+
+    def _locations(self, nodes: List[aw.Node]) -> List[int]:
+        """1-based pages of the nodes, in the quick tier the number of the section they are collected from"""
+        if self.tier == QUICK_TIER:
+            return [self._rules_section + 1] * len(nodes)
+        return self.layout.start_pages(nodes)
+
+    def _check_footers_headers(self, is_header=True, keys: List[str] = None, stored: List[dict] = None):
         """
-        :param is_header:
-        :param header: False if footer
+        :param is_header: False if footer
+        :param keys: fingerprints of the headers or footers of the sections, given by the incremental check
+        :param stored: entries of the previous incremental check, a section with the same key is not checked again
         :return:
-        miss_header_by_section - no header on some page of section
+        main_verdict, flags by section (see _check_section_footers_headers) and entries for the next incremental check
         """
 
         main_verdict = Verdict(position="Весь документ", standard="19.106-78")
-        sections_count = self.doc.sections.count
-        has_page_number_by_section = [False] * sections_count
-        has_correct_id_by_section = [False] * sections_count
-        has_any_header_by_section = [False] * sections_count
-        miss_header_by_section = [False] * sections_count
-
-        for i in range(sections_count):
-            section = self.doc.sections[i]
-            if is_header:
-                verdict = Verdict(position=f"Верхний колонтитул раздела {i + 1}", standard="19.106-78")
-                headers_array = [section.headers_footers.header_even, section.headers_footers.header_primary]
-                if section.page_setup.different_first_page_header_footer:
-                    headers_array.append(section.headers_footers.header_first)
+        flags_by_section = []
+        entries = []
+        # the first section has no previous one to be linked to
+        flags = (False, False, False, False)
+
+        for i in range(self.doc.sections.count):
+            self.cancel_token.raise_if_cancelled()
+            if keys is None:
+                verdict, flags = self._check_section_footers_headers(i, is_header, flags)
             else:
-                verdict = Verdict(position=f"Нижний колонтитул раздела {i + 1}", standard="19.106-78")
-                headers_array = [section.headers_footers.footer_even, section.headers_footers.footer_primary]
-                if section.page_setup.different_first_page_header_footer:
-                    headers_array.append(section.headers_footers.header_first)
-
-            if not any(headers_array):
-                # linked to previous whole
-                has_correct_id_by_section[i] = has_correct_id_by_section[i - 1]
-                has_page_number_by_section[i] = has_page_number_by_section[i - 1]
-                miss_header_by_section[i] = miss_header_by_section[i - 1]
-                has_any_header_by_section[i] = has_any_header_by_section[i - 1]
-                continue
-
-            section_miss_header = False
-            section_has_any_header = False
-            section_has_page_field = True
-            section_has_correct_id = True
-            for header in headers_array:
-                has_page_field = False
-                has_correct_id = True
-
-                if header is not None:
-                    if not is_empty_string(header.to_string(aw.SaveFormat.TEXT)):
-                        section_has_any_header = True
-                        if header.is_linked_to_previous:
-                            has_page_field = has_page_number_by_section[i - 1]
-                            has_correct_id = has_correct_id_by_section[i - 1]
-                        else:
-                            for field in header.range.fields:
-                                if field.as_field().type == aw.fields.FieldType.FIELD_PAGE:
-                                    has_page_field = True
-                                    break
-
-                            header_text = header.to_string(aw.SaveFormat.TEXT)
-                            if is_header:
-                                header_text_verdict = self._check_header_text(header_text)
-                                has_correct_id = header_text_verdict.ok
-                                verdict += header_text_verdict
-                            else:
-                                verdict += self._check_footer_table(header.tables, header_text)
-                                if self._check_identifier(header_text, short=True, exact=False):
-                                    verdict += self._check_id_similarity(header_text)
+                key = fingerprint(keys[i], *flags, self.doc_identifier)
+                entry = stored[i] if stored is not None and i < len(stored) else None
+                if entry is not None and entry["key"] == key:
+                    verdict = Verdict.from_dict(entry["verdict"])
+                    flags = tuple(entry["flags"])
+                    self.doc_identifier = entry["doc_identifier"]
+                else:
+                    verdict, flags = self._check_section_footers_headers(i, is_header, flags)
+                    entry = {"key": key, "verdict": verdict.to_dict(), "flags": list(flags),
+                             "doc_identifier": self.doc_identifier}
+                entries.append(entry)
+
+            main_verdict += verdict
+            flags_by_section.append(flags)
+            if self.memory_guard is not None:
+                self.memory_guard.check()
+
+        return main_verdict, flags_by_section, entries
+
+    def _check_section_footers_headers(self, i: int, is_header: bool,
+                                       previous_flags: Tuple[bool, bool, bool, bool]):
+        """
+        :return:
+        verdict and flags of the section: has_correct_id, has_page_number, miss_header - no header on some page
+        of section, has_any_header. Linked headers take the flags of the previous section
+        """
+
+        section_verdict = Verdict(position="Весь документ", standard="19.106-78")
+        prev_has_correct_id, prev_has_page_number, _, _ = previous_flags
+
+        section = self.doc.sections[i]
+        if is_header:
+            verdict = Verdict(position=f"Верхний колонтитул раздела {i + 1}", standard="19.106-78")
+            headers_array = [section.headers_footers.header_even, section.headers_footers.header_primary]
+            if section.page_setup.different_first_page_header_footer:
+                headers_array.append(section.headers_footers.header_first)
+        else:
+            verdict = Verdict(position=f"Нижний колонтитул раздела {i + 1}", standard="19.106-78")
+            headers_array = [section.headers_footers.footer_even, section.headers_footers.footer_primary]
+            if section.page_setup.different_first_page_header_footer:
+                headers_array.append(section.headers_footers.header_first)
+
+        if not any(headers_array):
+            # linked to previous whole
+            return section_verdict, previous_flags
+
+        section_miss_header = False
+        section_has_any_header = False
+        section_has_page_field = True
+        section_has_correct_id = True
+        for header in headers_array:
+            has_page_field = False
+            has_correct_id = True
+
+            if header is not None:
+                if not is_empty_string(self._to_text(header)):
+                    section_has_any_header = True
+                    if header.is_linked_to_previous:
+                        has_page_field = prev_has_page_number
+                        has_correct_id = prev_has_correct_id
                     else:
-                        section_miss_header = True
+                        for field in header.range.fields:
+                            if field.as_field().type == aw.fields.FieldType.FIELD_PAGE:
+                                has_page_field = True
+                                break
 
-                    if not has_correct_id:
-                        section_has_correct_id = False
-                    if not has_page_field:
-                        section_has_page_field = False
-                    main_verdict += verdict
-
-            has_correct_id_by_section[i] = section_has_correct_id
-            has_page_number_by_section[i] = section_has_page_field
-            miss_header_by_section[i] = section_miss_header
-            has_any_header_by_section[i] = section_has_any_header
-
-        return (
-            main_verdict,
-            has_correct_id_by_section,
-            has_page_number_by_section,
-            miss_header_by_section,
-            has_any_header_by_section
+                        header_text = self._to_text(header)
+                        if is_header:
+                            header_text_verdict = self._check_header_text(header_text)
+                            has_correct_id = header_text_verdict.ok
+                            verdict += header_text_verdict
+                        else:
+                            verdict += self._check_footer_table(header.tables, header_text)
+                            if self._check_identifier(header_text, short=True, exact=False):
+                                verdict += self._check_id_similarity(header_text)
+                else:
+                    section_miss_header = True
+
+                if not has_correct_id:
+                    section_has_correct_id = False
+                if not has_page_field:
+                    section_has_page_field = False
+                section_verdict += verdict
+
+        return section_verdict, (
+            section_has_correct_id,
+            section_has_page_field,
+            section_miss_header,
+            section_has_any_header
         )
 
     def _check_footer_table(self, footer_tables: aw.tables.TableCollection, footer_text) -> Verdict:
@@ -145,14 +256,12 @@ class UnitChecks:
 
         return verdict
 
-    @staticmethod
-    def _index_paragraph(paragraphs: aw.ParagraphCollection, regexp) -> int:
+    def _index_paragraph(self, paragraphs: List[aw.Paragraph], regexp) -> int:
         proper_tile_index = -1
 
-        for i in range(paragraphs.count):
+        for i in range(len(paragraphs)):
             node = paragraphs[i]
-            paragraph_text = node.as_paragraph().to_string(aw.SaveFormat.TEXT)
-            if re.match(regexp, paragraph_text.lower()):
+            if re.match(regexp, self.document_text.normalized(node)):
                 return i
 
         return proper_tile_index
@@ -170,8 +279,7 @@ class UnitChecks:
 
         return verdict
 
-    @staticmethod
-    def _check_registration_and_storing(registration_table: aw.tables.Table) -> Verdict:
+    def _check_registration_and_storing(self, registration_table: aw.tables.Table) -> Verdict:
         verdict = Verdict(standard="ГОСТ 19.601-78")
         if registration_table.rows.count != 5:
             verdict.add_message("В таблице регистрации и хранения должно быть 5 колонок.")
@@ -181,7 +289,7 @@ class UnitChecks:
         for cell in registration_table.rows[0].as_row().cells:
             left_length += cell.as_cell().cell_format.width
 
-        if left_length > aw.ConvertUtil.millimeter_to_point(20):
+        if left_length > self.profile.margin_points["left"]:
             verdict.add_message(
                 f"Таблица регистрации и хранения должна быть за левым полем документа полностью."
             )
@@ -196,35 +304,18 @@ class UnitChecks:
         return verdict
 
     def _check_identifier(self, identifier: str, short=False, page_type=None, exact=True):
-        if page_type is None:
-            page_type = ""
+        if short:
+            pattern = self.profile.short_identifier
         else:
-            page_type = "-" + page_type
-
-        doc_type_name = r"\w\w"
-        doc_type_id = r"\d\d-\d"
-        if self.doc_type is not None:
-            doc_type_name = self.doc_type
-
-        if self.doc_type_id is not None:
-            doc_type_id = self.doc_type_id
+            pattern = self.profile.full_identifier(page_type)
 
         if exact:
-            comparing_func = re.match
-        else:
-            comparing_func = re.search
-
-        if short:
-            return comparing_func(r"\s*[A-Z]{2}\.\d+\.\d\d\.\d\d-\d\d\s", identifier)
-        else:
-            return comparing_func(
-                r"\s*[A-Z]{2}\.\d+\.\d\d\.\d\d-\d\d\s" + doc_type_name + r"\s" + doc_type_id + page_type + r"\s*",
-                identifier
-            )
+            return pattern.match(identifier)
+        return pattern.search(identifier)
 
     def _check_id_similarity(self, identifier: str) -> Verdict:
         verdict = Verdict()
-        clean_id = re.search(r"[A-Z]{2}\.\d+\.\d\d\.\d\d-\d\d", identifier)[0]
+        clean_id = self.profile.identifier.search(identifier)[0]
         if clean_id:
             if self.doc_identifier is None:
                 self.doc_identifier = clean_id
@@ -234,28 +325,13 @@ class UnitChecks:
         return verdict
 
     def _is_text_on_page(self, text, page_number, lower=True) -> bool:
-        cloned = self.doc.clone()
-        page_text = cloned.extract_pages(int(page_number), 1).to_string(aw.SaveFormat.TEXT)
-        if lower:
-            page_text = page_text.lower()
-
-        return text in page_text
-
-    def _get_section_page_count(self, section) -> int:
-        layout_collector = aw.layout.LayoutCollector(self.doc)
-
-        start_page = layout_collector.get_start_page_index(section)
-        end_page = layout_collector.get_end_page_index(section)
+        return text in self.page_text_index.text(page_number, lower=lower)
 
-        return end_page - start_page + 1
-
-    @staticmethod
-    def _find_registration_table(page: aw.Document, verdict: Verdict) -> (bool, Verdict):
+    def _find_registration_table(self, page: PageView, verdict: Verdict) -> (bool, Verdict):
         has_registration_table = False
-        for node in page.first_section.body.tables:
-            table = node.as_table()
+        for table in page.tables:
             if table.horizontal_anchor == aw.drawing.RelativeHorizontalPosition.PAGE:
-                verdict += BaseChecker._check_registration_and_storing(table)
+                verdict += self._check_registration_and_storing(table)
                 has_registration_table = True
                 break
 
@@ -263,46 +339,85 @@ class UnitChecks:
 
 
 class NonTableOfContentsChecker(UnitChecks):
-    FLOAT_DELTA: float = 1e-3
-
-    def check_page_margins(self) -> Verdict:
-        verdict = Verdict(position="Весь документ", standard="ГОСТ 19.106-78")
+    def _page_setups(self) -> Iterator[PageSetup]:
         for section in self.doc.sections:
             page_setup = section.as_section().page_setup
+            yield PageSetup(page_setup.orientation == aw.Orientation.PORTRAIT, page_setup.paper_size,
+                            page_setup.left_margin, page_setup.right_margin,
+                            page_setup.bottom_margin, page_setup.top_margin)
 
-            if page_setup.orientation != aw.Orientation.PORTRAIT:
-                verdict.add_message("Некорректная ориентация страницы. Она должна быть книжной.")
-            if page_setup.paper_size != aw.PaperSize.A4:
-                verdict.add_message(
-                    f"Документация оформляется на листах формата А4. Ваш формат - {page_setup.paper_size}"
-                )
-            if not isclose(page_setup.left_margin, aw.ConvertUtil.millimeter_to_point(20), rel_tol=self.FLOAT_DELTA):
-                verdict.add_message(
-                    f"Неверный отступ слева. Требуемый - 20мм."
-                )
-            if not isclose(page_setup.right_margin, aw.ConvertUtil.millimeter_to_point(10), rel_tol=self.FLOAT_DELTA):
-                verdict.add_message(
-                    f"Неверный отступ справа. Требуемый - 10мм."
-                )
-            if not isclose(page_setup.bottom_margin, aw.ConvertUtil.millimeter_to_point(15), rel_tol=self.FLOAT_DELTA):
-                verdict.add_message(
-                    f"Неверный отступ снизу. Требуемый - 15мм."
-                )
-            if not isclose(page_setup.top_margin, aw.ConvertUtil.millimeter_to_point(25), rel_tol=self.FLOAT_DELTA):
-                verdict.add_message(
-                    f"Неверный отступ сверху. Требуемый - 25мм."
-                )
+    def _node_rules(self) -> Dict[str, Tuple[NodeRule, NodeReport]]:
+        """
+        Node level checks by name: the rule collects a part of the result over the visited subtree,
+        the report builds the verdict from the parts of all subtrees
+        """
+        return {
+            "fonts": (self._fonts_rule, self._fonts_report),
+            "lists": (self._lists_rule, self._lists_report),
+            "line_spacing": (self._line_spacing_rule, self._line_spacing_report),
+        }
+
+    def _collect_rules(self, names, root: aw.CompositeNode) -> Dict[str, dict]:
+        """Runs node level checks in one traversal of root, parts are returned by the name of the check"""
+        node_rules = self._node_rules()
+        engine = RuleEngine(self.error_budget, self.profiler)
+        finishers = {}
+        for name in names:
+            with engine.rule(f"check_{name}"):
+                finishers[name] = node_rules[name][0](engine)
+        engine.visit(root, self.cancel_token)
+        parts = {}
+        for name, finish in finishers.items():
+            with engine.rule(f"check_{name}"):
+                parts[name] = finish()
+        return parts
+
+    def _run_rules(self, *names: str) -> List[Verdict]:
+        """Runs node level checks in one document traversal, verdicts are returned in the order of names"""
+        node_rules = self._node_rules()
+        if self.memory_guard is None and self.tier != QUICK_TIER:
+            parts_list = [self._collect_rules(names, self.doc)]
+        else:
+            # nodes collected by the rules are turned into page or section numbers and dropped after every section
+            parts_list = []
+            for i, section in enumerate(self.doc.sections):
+                self._rules_section = i
+                parts_list.append(self._collect_rules(names, section.as_section()))
+                if self.memory_guard is not None:
+                    self.memory_guard.check()
+        verdicts = []
+        for name in names:
+            with self.profiler.accumulate(self.profiler.part(f"check_{name}")):
+                verdicts.append(node_rules[name][1]([parts[name] for parts in parts_list]))
+        return verdicts
+
+    def _error_counter(self, engine: RuleEngine, check: str, body_only: bool = False,
+                       per_page: bool = True) -> Callable[[aw.Node], None]:
+        """
+        Counts a wrong node into the error budget of the run as soon as the rule finds it, the way the report
+        of the check turns nodes into messages: one per page or one per node, on any page or on body pages only
+        """
+        budget = engine.error_budget
+        if budget is None:
+            return lambda node: None
 
-        return verdict
+        def count(node: aw.Node):
+            page = self._locations([node])[0]
+            if not body_only or self.geometry.is_body_page(page):
+                budget.found(check, page if per_page else None)
+
+        return count
 
     def check_lists(self):
-        verdict = Verdict(standard="ГОСТ 19.106.78")
-        layout_collector = aw.layout.LayoutCollector(self.doc)
+        return self._run_rules("lists")[0]
+
+    def _lists_rule(self, engine: RuleEngine) -> Callable[[], dict]:
         has_hyphen = False
-        page_set = set()
-        for para in self.doc.get_child_nodes(aw.NodeType.PARAGRAPH, True):
-            paragraph = para.as_paragraph()
+        wrong_items = []
+        count_error = self._error_counter(engine, "check_lists")
 
+        def visit_paragraph(paragraph: aw.Paragraph):
+            nonlocal has_hyphen
             if paragraph.list_format.is_list_item:
                 list_level = paragraph.list_format.list_level
                 if list_level.number_style == aw.NumberStyle.BULLET:
@@ -310,143 +425,143 @@ class NonTableOfContentsChecker(UnitChecks):
                     if list_level.number_format == "–" or list_level.number_format == "-":
                         has_hyphen = True
                     else:
-                        page_set.add(layout_collector.get_start_page_index(paragraph))
+                        wrong_items.append(paragraph)
+                        count_error(paragraph)
 
-        for page in page_set:
-            verdict.add_message(
-                "Допускается использовать перечисления только с дефисом.",
-                position=f"Страница {page}"
-            )
-
-        if has_hyphen:
-            verdict.add_message("Рекомендуется использовать только нумерованные перечисления.",
-                                position="Весь документ",
-                                message_type=MessageTypes.WARNING)
+        def finish() -> dict:
+            return {"pages": sorted(set(self._locations(wrong_items))), "has_hyphen": has_hyphen}
 
-        return verdict
+        engine.register(aw.NodeType.PARAGRAPH, visit_paragraph)
+        return finish
 
     def check_fonts(self):
-        verdict = Verdict()
-        right_font = "Times New Roman"
+        return self._run_rules("fonts")[0]
 
-        layout_collector = aw.layout.LayoutCollector(self.doc)
-        page_set = set()
-        for run in self.doc.get_child_nodes(aw.NodeType.RUN, True):
-            # Extract the font name
-            font = run.as_run().font
-            if font.name != right_font:
-                page_set.add(layout_collector.get_start_page_index(run))
+    def _fonts_rule(self, engine: RuleEngine) -> Callable[[], dict]:
+        wrong_runs = []
+        count_error = self._error_counter(engine, "check_fonts")
 
-        for page_number in page_set:
-            verdict.add_message(
-                f'Используется некорректный шрифт, используйте "{right_font}" 12 или 14',
-                position=f"Страница {page_number}"
-            )
-        layout_collector.document = None
-        return verdict
+        def visit_run(run: aw.Run):
+            if run.font.name != self.profile.font:
+                wrong_runs.append(run)
+                count_error(run)
+
+        def finish() -> dict:
+            return {"pages": sorted(set(self._locations(wrong_runs)))}
+
+        engine.register(aw.NodeType.RUN, visit_run)
+        return finish
 
     def check_line_spacing(self):
-        verdict = Verdict(position="Весь документ", standard="ГОСТ 19.103-78")
+        return self._run_rules("line_spacing")[0]
+
+    def _line_spacing_rule(self, engine: RuleEngine) -> Callable[[], dict]:
+        wrong_paragraphs = []
+        count_error = self._error_counter(engine, "check_line_spacing", body_only=True)
 
-        layout_collector = aw.layout.LayoutCollector(self.doc)
-        page_set = set()
-        for para in self.doc.get_child_nodes(aw.NodeType.PARAGRAPH, True):
-            paragraph = para.as_paragraph()
-            if paragraph.paragraph_format.style.name.startswith("Heading"):
-                continue
+        def visit_paragraph(paragraph: aw.Paragraph):
+            paragraph_format = paragraph.paragraph_format
+            if paragraph_format.style_name.startswith("Heading"):
+                return
 
-            line_spacing = paragraph.paragraph_format.line_spacing
+            line_spacing = paragraph_format.line_spacing
             if paragraph.runs[0] is not None:
-                if line_spacing != 12 * 1.5:
-                    text = para.to_string(aw.SaveFormat.TEXT).strip()
+                if line_spacing != self.profile.line_spacing:
+                    text = self._to_text(paragraph).strip()
                     if text != "" and not (paragraph.runs[0].font.bold and text.isupper()):
-                        page_number = layout_collector.get_start_page_index(para)
-                        if 2 < page_number < self.doc.page_count:
-                            page_set.add(page_number)
+                        wrong_paragraphs.append(paragraph)
+                        count_error(paragraph)
 
-        for page_number in page_set:
+        def finish() -> dict:
+            return {"pages": sorted(set(self._locations(wrong_paragraphs)))}
+
+        engine.register(aw.NodeType.PARAGRAPH, visit_paragraph)
+        return finish
+
+    def _line_spacing_report(self, parts: List[dict]) -> Verdict:
+        verdict = Verdict(position="Весь документ", standard="ГОСТ 19.103-78")
+        geometry = self.geometry
+        pages = set(page for part in parts for page in part["pages"])
+        for page_number in sorted(page for page in pages if geometry.is_body_page(page)):
             verdict.add_message(
                 "Используется некорректный межстрочный интервал",
-                position=f"Страница {page_number}",
+                position=self._location(page_number),
             )
 
         return verdict
 
     def check_headers(self) -> Verdict:
-        sections_count = self.doc.sections.count
-        (main_verdict, has_correct_id_by_section, has_page_number_by_section, miss_header_by_section,
-         has_any_header_by_section) = self._check_footers_headers(is_header=True)
-
-        page_count = 0
-        for i in range(sections_count):
-            if page_count < 2:
-                if has_any_header_by_section[i]:
+        main_verdict, flags_by_section, _ = self._check_footers_headers(is_header=True)
+        return self._headers_report(main_verdict, flags_by_section)
+
+    def _headers_report(self, main_verdict: Verdict, flags_by_section: list) -> Verdict:
+        geometry = self.geometry
+        for i, (has_correct_id, has_page_number, miss_header, has_any_header) in enumerate(flags_by_section):
+            pages_before = geometry.pages_before_section(i)
+            if geometry.is_front_matter_page(pages_before + 1):
+                if has_any_header:
                     main_verdict.add_message(
                         "На титульном листе и листе утверждения не должно быть верхнего колонтитула."
                     )
             else:
-                if miss_header_by_section[i]:
+                if miss_header:
                     new_verdict = Verdict(position=f"Раздел {i + 1}", standard="19.106-78")
                     new_verdict.add_message("Пропущен верхний колонтитул в основном тексте документа.")
                     main_verdict += new_verdict
-                elif has_any_header_by_section[i]:
+                elif has_any_header:
                     new_verdict = Verdict(position=f"Верхний колонтитул раздела {i + 1}", standard="19.106-78")
-                    if not has_page_number_by_section[i]:
+                    if not has_page_number:
                         new_verdict.add_message("Нет номера страницы")
-                    if not has_correct_id_by_section[i]:
+                    if not has_correct_id:
                         new_verdict.add_message("Некорректный идентификатор документа")
 
                     main_verdict += new_verdict
 
-            page_count += self._get_section_page_count(self.doc.sections[i])
-
         return main_verdict
 
     def check_footers(self):
-        sections_count = self.doc.sections.count
-        (main_verdict, has_correct_id_by_section, has_page_number_by_section, miss_header_by_section,
-         has_any_header_by_section) = self._check_footers_headers(is_header=False)
-
-        page_count = 0
-        for i in range(sections_count):
-            if page_count < 2:
-                if has_any_header_by_section[i]:
+        main_verdict, flags_by_section, _ = self._check_footers_headers(is_header=False)
+        return self._footers_report(main_verdict, flags_by_section)
+
+    def _footers_report(self, main_verdict: Verdict, flags_by_section: list) -> Verdict:
+        geometry = self.geometry
+        for i, (has_correct_id, _, miss_header, has_any_header) in enumerate(flags_by_section):
+            pages_before = geometry.pages_before_section(i)
+            if geometry.is_front_matter_page(pages_before + 1):
+                if has_any_header:
                     main_verdict.add_message(
                         "На титульном листе и листе утверждения не должно быть нижнего колонтитула."
                     )
             else:
-                if page_count == self.doc.page_count - 1:
-                    if has_any_header_by_section[i]:
+                if pages_before == geometry.page_count - 1:
+                    if has_any_header:
                         new_verdict = Verdict(position=f"Раздел {i + 1}", standard="19.106-78")
                         new_verdict.add_message("Таблица в нижнем колонтитуле листа регистрации изменений избыточна")
                 else:
-                    if miss_header_by_section[i]:
+                    if miss_header:
                         new_verdict = Verdict(position=f"Раздел {i + 1}", standard="19.106-78")
                         new_verdict.add_message("Пропущен нижний колонтитул в основном тексте документа.")
                         main_verdict += new_verdict
-                    elif has_any_header_by_section[i]:
+                    elif has_any_header:
                         new_verdict = Verdict(position=f"Нижний колонтитул раздела {i + 1}", standard="19.106-78")
-                        if not has_correct_id_by_section[i]:
+                        if not has_correct_id:
                             new_verdict.add_message("Некорректный идентификатор документа")
 
                         main_verdict += new_verdict
 
-            page_count += self._get_section_page_count(self.doc.sections[i])
-
         return main_verdict
 
     def check_certification_page(self) -> Verdict:
         verdict = Verdict(position="Лист утверждения", standard="ГОСТ 19.104-78")
-        cloned = self.doc.clone()
-        first_page = cloned.extract_pages(0, 1)
-        paragraphs = first_page.first_section.body.paragraphs
+        first_page = self._page_view(0)
+        paragraphs = first_page.paragraphs
 
-        proper_tile_index = BaseChecker._index_paragraph(paragraphs, r"\s*лист.+утверждения\s*")
+        proper_tile_index = self._index_paragraph(paragraphs, r"\s*лист.+утверждения\s*")
 
         if proper_tile_index == -1:
             verdict.add_message('Нет надписи "Лист утверждения" на первом листе.')
-        elif (proper_tile_index + 1) < paragraphs.count:
-            identifier = paragraphs[proper_tile_index + 1].to_string(aw.SaveFormat.TEXT)
+        elif (proper_tile_index + 1) < len(paragraphs):
+            identifier = self._to_text(paragraphs[proper_tile_index + 1])
             if self._check_identifier(
                     identifier,
                     page_type="ЛУ"
@@ -457,10 +572,10 @@ class NonTableOfContentsChecker(UnitChecks):
                     "Идентификатор документа имеет неверный формат, отсутствует или находится в неположенном месте."
                 )
 
-        last_paragraph_text = paragraphs[-1].as_paragraph().to_string(aw.SaveFormat.TEXT)
+        last_paragraph_text = self._to_text(paragraphs[-1].as_paragraph())
         verdict += BaseChecker._check_bottom_year(last_paragraph_text)
 
-        has_registration_table, verdict = BaseChecker._find_registration_table(first_page, verdict)
+        has_registration_table, verdict = self._find_registration_table(first_page, verdict)
         if not has_registration_table:
             verdict.add_message("Нет таблицы регистрации и хранения или она расположена внутри отступов страницы.")
 
@@ -468,20 +583,20 @@ class NonTableOfContentsChecker(UnitChecks):
 
     def check_title_page(self) -> Verdict:
         verdict = Verdict(position="Титульный лист", standard="ГОСТ 19.104-78")
-        title_page = self.doc.extract_pages(1, 1)
-        paragraphs = title_page.first_section.body.paragraphs
-        proper_tile_index = BaseChecker._index_paragraph(paragraphs, r"\s*листов\s*\d+")
+        title_page = self._page_view(1)
+        paragraphs = title_page.paragraphs
+        proper_tile_index = self._index_paragraph(paragraphs, r"\s*листов\s*\d+")
 
         if proper_tile_index == -1:
             verdict.add_message('Нет надписи о количестве листов на титульном листе.')
         else:
-            written_page_count = int(paragraphs[proper_tile_index].to_string(aw.SaveFormat.TEXT).split(" ")[1])
-            true_page_count = self.doc.page_count - 1
+            written_page_count = int(self._to_text(paragraphs[proper_tile_index]).split(" ")[1])
+            true_page_count = self.geometry.page_count - 1
             if true_page_count != written_page_count:
                 verdict.add_message('Некорректное число листов ')
 
             if (proper_tile_index - 1) >= 0:
-                identifier = paragraphs[proper_tile_index - 1].to_string(aw.SaveFormat.TEXT)
+                identifier = self._to_text(paragraphs[proper_tile_index - 1])
                 if self._check_identifier(
                         identifier,
                         page_type=None
@@ -492,14 +607,14 @@ class NonTableOfContentsChecker(UnitChecks):
                         "Идентификатор документа имеет неверный формат, отсутствует или находится в неположенном месте."
                     )
 
-        has_registration_table, verdict = BaseChecker._find_registration_table(title_page, verdict)
+        has_registration_table, verdict = self._find_registration_table(title_page, verdict)
         if not has_registration_table:
             verdict.add_message("Нет таблицы регистрации и хранения или она расположена внутри отступов страницы.")
 
-        first_paragraph_text = paragraphs[0].as_paragraph().to_string(aw.SaveFormat.TEXT)
+        first_paragraph_text = self._to_text(paragraphs[0].as_paragraph())
         if re.match(r"\s*УТВЕРЖД[ЁЕ]Н\s*", first_paragraph_text):
-            if 1 < paragraphs.count:
-                identifier = paragraphs[1].to_string(aw.SaveFormat.TEXT)
+            if 1 < len(paragraphs):
+                identifier = self._to_text(paragraphs[1])
                 if self._check_identifier(
                         identifier,
                         page_type="ЛУ"
@@ -510,56 +625,155 @@ class NonTableOfContentsChecker(UnitChecks):
         else:
             verdict.add_message("Отсутствует пометка об утверждении")
 
-        last_paragraph_text = paragraphs[-1].as_paragraph().to_string(aw.SaveFormat.TEXT)
+        last_paragraph_text = self._to_text(paragraphs[-1].as_paragraph())
         verdict += BaseChecker._check_bottom_year(last_paragraph_text)
 
         return verdict
 
 
 class BaseChecker(NonTableOfContentsChecker):
-    chapters: List[str] = ["аннотация", "содержание", "лист регистрации изменений"]
-    doc_standard: str = "ГОСТ 19.106-78"
-
-    toc_valid = False
-    names_to_numbers = None
-    sorted_numbers = None
-    name_to_page = None
-    name_to_real_name = None
-    name_to_bookmark = None
-    has_no_number = None
-    numbers_to_names = None
-
-    def main_check(self) -> Verdict:
-        main_verdict = Verdict(position="Весь документ", standard="ГОСТ 19.103-78")
-
-        main_verdict += self.check_page_margins()
-        main_verdict += self.check_certification_page()
-        main_verdict += self.check_title_page()
-        main_verdict += self.check_fonts()
-
-        main_verdict += self.check_footers()
-        main_verdict += self.check_headers()
-        main_verdict += self.check_table_of_contents()
-        # next require table of contents
-        main_verdict += self.check_titles()
-        main_verdict += self.check_paragraphs()
-        main_verdict += self.check_lists()
-        main_verdict += self.check_line_spacing()
-        main_verdict += self.check_chapters()
-
-        # self.doc.save("WorkingWithComments.add_comments.docx")
-        return main_verdict
+    def _check_tasks(self) -> List[CheckTask]:
+        """Checks of main_check with the checks whose state they read, in the order of the sequential run"""
+        if self.tier == QUICK_TIER:
+            return [
+                self._task("check_page_margins", self.check_page_margins),
+                self._task("check_table_of_contents", self.check_table_of_contents),
+                self._task("check_fonts, check_lists", lambda: self._run_rules("fonts", "lists")),
+                self._task("check_chapters", self.check_chapters, "check_table_of_contents"),
+            ]
+        return [
+            # built before everything reading pages or text, so parallel checks do not race for them
+            self._task("layout", lambda: (self.geometry, self.document_text)),
+            self._task("check_page_margins", self.check_page_margins),
+            # a page crossed by a node is extracted, that is the expensive part and does not wait for the identifier;
+            # both pages come from the original document, so they are not extracted at the same time
+            self._task("certification_page_view", lambda: self._page_view(0), "layout"),
+            self._task("title_page_view", lambda: self._page_view(1), "certification_page_view"),
+            # the first identifier found is compared with the next ones, so these run in the order of the document
+            self._task("check_certification_page", self.check_certification_page, "certification_page_view"),
+            self._task("check_title_page", self.check_title_page, "title_page_view", "check_certification_page"),
+            self._task("check_footers", self.check_footers, "check_title_page"),
+            self._task("check_headers", self.check_headers, "check_footers"),
+            self._task("check_table_of_contents", self.check_table_of_contents, "layout"),
+            # next require table of contents
+            self._task("check_titles", self.check_titles, "check_table_of_contents"),
+            # node level checks share one document traversal
+            self._task("check_fonts, check_paragraphs, check_lists, check_line_spacing",
+                       lambda: self._run_rules("fonts", "paragraphs", "lists", "line_spacing"),
+                       "check_table_of_contents"),
+            self._task("check_chapters", self.check_chapters, "check_table_of_contents"),
+        ]
+
+    def incremental_check(self, fingerprints: PackageFingerprints,
+                          previous: dict = None) -> Tuple[Verdict, Optional[dict]]:
+        """
+        Reruns only the checks whose fragments changed since the previous state,
+        returns the verdict and the state for the next run
+        """
+        try:
+            verdict, state = self._incremental_check(fingerprints, previous or {})
+        finally:
+            self.release_layout()
 
-    def check_chapters(self):
-        verdict = Verdict(position="Веcь документ", standard=self.doc_standard)
-        if self.toc_valid:
-            numerated = set(self.name_to_page.keys())
-            if self.toc_valid:
-                for chapter in self.chapters:
-                    if not (chapter.lower() in self.has_no_number or chapter.lower() in numerated):
-                        verdict.add_message(f'Нет необходимого раздела "{chapter}"')
+        if self.profiler.enabled:
+            verdict.profile = self.profiler.checks
+        return verdict, state
 
-        return verdict
+    def _incremental_check(self, fingerprints: PackageFingerprints, previous: dict) -> Tuple[Verdict, Optional[dict]]:
+        sections_count = self.doc.sections.count
+        if len(fingerprints.sections) != sections_count:
+            # the package is split into sections differently than aspose sees it
+            return self._main_check(), None
+
+        with self.profiler.check("layout"):
+            geometry = self.geometry
+        # page numbers of the stored results stay valid while the section keeps its pages
+        section_keys = [
+            fingerprint(fingerprints.sections[i], geometry.pages_before_section(i), geometry.section_page_count(i))
+            for i in range(sections_count)
+        ]
+
+        main_verdict = self._main_verdict()
+
+        page_margins = self._profiled(self.check_page_margins)
+
+        front_sections = [section_keys[i] for i in range(sections_count)
+                          if geometry.is_front_matter_page(geometry.pages_before_section(i) + 1)]
+        front = previous.get("front")
+        front_key = fingerprint(geometry.page_count, *front_sections)
+        if front is not None and front["key"] == front_key:
+            certification_page = Verdict.from_dict(front["certification_page"])
+            title_page = Verdict.from_dict(front["title_page"])
+            self.doc_identifier = front["doc_identifier"]
+        else:
+            certification_page = self._profiled(self.check_certification_page)
+            title_page = self._profiled(self.check_title_page)
+            front = {"key": front_key, "certification_page": certification_page.to_dict(),
+                     "title_page": title_page.to_dict(), "doc_identifier": self.doc_identifier}
+
+        with self.profiler.check("check_footers"):
+            footers_verdict, flags_by_section, footer_entries = self._check_footers_headers(
+                is_header=False, keys=fingerprints.headers_footers, stored=previous.get("footers")
+            )
+            footers = self._footers_report(footers_verdict, flags_by_section)
+        with self.profiler.check("check_headers"):
+            headers_verdict, flags_by_section, header_entries = self._check_footers_headers(
+                is_header=True, keys=fingerprints.headers_footers, stored=previous.get("headers")
+            )
+            headers = self._headers_report(headers_verdict, flags_by_section)
+
+        toc = previous.get("toc")
+        # titles and chapters read headings and page text of any section, not only of the ones the contents links to
+        toc_key = fingerprint(*section_keys)
+        if toc is not None and toc["key"] == toc_key:
+            table_of_contents = Verdict.from_dict(toc["table_of_contents"])
+            titles = Verdict.from_dict(toc["titles"])
+            chapters = Verdict.from_dict(toc["chapters"])
+            self.toc_valid = toc["toc_valid"]
+            self.has_no_number = set(toc["has_no_number"])
+        else:
+            table_of_contents = self._profiled(self.check_table_of_contents)
+            titles = self._profiled(self.check_titles)
+            chapters = self._profiled(self.check_chapters)
+            toc = {"key": toc_key, "table_of_contents": table_of_contents.to_dict(), "titles": titles.to_dict(),
+                   "chapters": chapters.to_dict(), "toc_valid": self.toc_valid,
+                   "has_no_number": sorted(self.has_no_number or [])}
+
+        # indents are not checked for table of contents items and unnumbered chapters
+        toc_state = fingerprint(self.toc_valid, *sorted(self.has_no_number or []))
+        stored_sections = previous.get("sections", [])
+        section_entries = []
+        parts = {name: [] for name in self._node_rules()}
+        for i in range(sections_count):
+            entry = stored_sections[i] if i < len(stored_sections) else None
+            if entry is None or entry["key"] != section_keys[i]:
+                entry = {"key": section_keys[i], "toc_state": toc_state, "parts": {}}
+                names = list(parts)
+            elif entry["toc_state"] != toc_state:
+                entry["toc_state"] = toc_state
+                names = ["paragraphs"]
+            else:
+                names = []
+
+            if names:
+                with self.profiler.check(f"{', '.join(names)} (раздел {i + 1})"):
+                    entry["parts"].update(self._collect_rules(names, self.doc.sections[i]))
+            for name in parts:
+                parts[name].append(entry["parts"][name])
+            section_entries.append(entry)
+
+        node_rules = self._node_rules()
+        fonts, paragraphs, lists, line_spacing = [
+            node_rules[name][1](parts[name]) for name in ["fonts", "paragraphs", "lists", "line_spacing"]
+        ]
+
+        for verdict in [page_margins, certification_page, title_page, fonts, footers, headers,
+                        table_of_contents, titles, paragraphs, lists, line_spacing, chapters]:
+            main_verdict += verdict
+
+        state = {"front": front, "footers": footer_entries, "headers": header_entries, "toc": toc,
+                 "sections": section_entries}
+        return main_verdict, state
 
     def check_titles(self) -> Verdict:
         verdict = Verdict(standard="ГОСТ 19.106-78")
@@ -575,7 +789,7 @@ class BaseChecker(NonTableOfContentsChecker):
             name = self.numbers_to_names[number]
             bookmark = self.name_to_bookmark[name]
             pointer = bookmark.bookmark_start.get_ancestor(aw.NodeType.PARAGRAPH).as_paragraph()
-            pointed_text = pointer.to_string(aw.SaveFormat.TEXT).strip()
+            pointed_text = self._to_text(pointer).strip()
             first_run = pointer.runs[0]
             if first_run:
                 next_paragraph = pointer.next_sibling
@@ -589,7 +803,7 @@ class BaseChecker(NonTableOfContentsChecker):
                 distance_to_next = (pointer.as_paragraph().paragraph_format.space_after
                                     + pointer.as_paragraph().paragraph_format.space_before)
 
-                next_paragraph_text = next_paragraph.to_string(aw.SaveFormat.TEXT).strip()
+                next_paragraph_text = self._to_text(next_paragraph).strip()
                 has_title_after = False
                 if i < len(self.sorted_numbers) - 1:
                     next_title_text = self.name_to_real_name[self.numbers_to_names[self.sorted_numbers[i + 1]]].strip()
@@ -610,18 +824,8 @@ class BaseChecker(NonTableOfContentsChecker):
                         verdict.add_message(
                             f"Заголовок уровня 1 '{pointed_text}' написан не строчными буквами."
                         )
-                    cloned = self.doc.clone()
-                    page = cloned.extract_pages(self.name_to_page[name], 1).sections[0].body
-
-                    is_first = False
-                    for node in page.get_child_nodes(aw.NodeType.ANY, True):
-
-                        if node.node_type in [aw.NodeType.PARAGRAPH, aw.NodeType.TABLE]:
-                            if node.node_type == aw.NodeType.PARAGRAPH:
-                                first_text = node.as_paragraph().to_string(aw.SaveFormat.TEXT).strip()
-                                if first_text == self.name_to_real_name[name]:
-                                    is_first = True
-                            break
+                    first_text = self.page_text_index.first_paragraph_text(self.name_to_page[name])
+                    is_first = first_text == self.name_to_real_name[name]
 
                     if not is_first:
                         verdict.add_message(
@@ -629,7 +833,7 @@ class BaseChecker(NonTableOfContentsChecker):
                         )
 
                     if has_title_after:
-                        if distance_to_next < 12 * 3:
+                        if distance_to_next < self.profile.heading_spacing:
                             verdict.add_message(
                                 f"Расстояние между заголовком раздела '{pointed_text}' "
                                 f"и заголовком подраздела менее, чем 3 высоты шрифта"
@@ -650,7 +854,7 @@ class BaseChecker(NonTableOfContentsChecker):
                     prev_indents_by_level[title_level - 1] = left_indent
 
                     if not has_title_after:
-                        if distance_to_next < 12 * 3 and next_paragraph_text:
+                        if distance_to_next < self.profile.heading_spacing and next_paragraph_text:
                             verdict.add_message(
                                 f"Расстояние между заголовком '{pointed_text}' "
                                 f"и следующим текстом менее, чем 3 высоты шрифта"
@@ -664,238 +868,97 @@ class BaseChecker(NonTableOfContentsChecker):
         return verdict
 
     def check_paragraphs(self):
-        verdict = Verdict(standard="ГОСТ 19.106.78")
-        if not self.toc_valid:
-            return verdict
+        return self._run_rules("paragraphs")[0]
+
+    def _node_rules(self) -> Dict[str, Tuple[NodeRule, NodeReport]]:
+        node_rules = super()._node_rules()
+        node_rules["paragraphs"] = (self._paragraphs_rule, self._paragraphs_report)
+        return node_rules
+
+    def _paragraphs_rule(self, engine: RuleEngine) -> Callable[[], dict]:
+        not_indented = []
+        count_error = self._error_counter(engine, "check_paragraphs", body_only=True, per_page=False)
+
+        def visit_paragraph(paragraph: aw.Paragraph):
+            if paragraph.parent_node.node_type != aw.NodeType.BODY:
+                return
+
+            paragraph_text = self._to_text(paragraph).strip()
+            paragraph_format = paragraph.paragraph_format
+            if paragraph_text and not (paragraph_text.lower() in self.has_no_number
+                                       or paragraph_format.style_name.startswith("TOC")
+                                       or NUMBERED_TEXT.match(paragraph_text)
+                                       or paragraph.is_list_item):
+                if (paragraph_format.first_line_indent <= 0 and
+                        paragraph_format.alignment != aw.ParagraphAlignment.CENTER):
+                    not_indented.append(paragraph)
+                    count_error(paragraph)
+
+        def finish() -> dict:
+            return {"pages": self._locations(not_indented)}
 
-        skip = 2
-        cloned = self.doc.clone()
-        new_doc = cloned.extract_pages(skip, self.doc.page_count - 3)
-        layout_collector = aw.layout.LayoutCollector(new_doc)
-        for section in new_doc.sections:
-            for node in section.as_section().body.paragraphs:
-                paragraph = node.as_paragraph()
-                paragraph_text = paragraph.to_string(aw.SaveFormat.TEXT).strip()
-                if paragraph_text and not (paragraph_text.lower() in self.has_no_number
-                                           or paragraph.paragraph_format.style.name.startswith("TOC")
-                                           or re.match(r"(\d+(\.\d+)*\.?\s+)(.*?)$", paragraph_text)
-                                           or paragraph.is_list_item):
-                    if (paragraph.paragraph_format.first_line_indent <= 0 and
-                            paragraph.paragraph_format.alignment != aw.ParagraphAlignment.CENTER):
-                        verdict.add_message(
-                            f"Абзац текста не имеет абзацного отступа",
-                            position=f"Страница {skip + layout_collector.get_start_page_index(paragraph)}")
+        if self.toc_valid:
+            engine.register(aw.NodeType.PARAGRAPH, visit_paragraph)
+        return finish
+
+    def _paragraphs_report(self, parts: List[dict]) -> Verdict:
+        verdict = Verdict(standard="ГОСТ 19.106.78")
+        geometry = self.geometry
+        for part in parts:
+            for page in part["pages"]:
+                if geometry.is_body_page(page):
+                    verdict.add_message(
+                        "Абзац текста не имеет абзацного отступа",
+                        position=self._location(page))
 
         return verdict
 
     def check_table_of_contents(self) -> Verdict:
-        verdict = Verdict(position="Содержание", standard="ГОСТ 19.106-78")
-        toc_exists = False
-        toc_numeration_valid = True
-        toc_valid = True
-        toc_start = None
-
-        names_to_numbers = {}  # key - name: value - structured number 1.x.x
-        numbers_to_names = {}
-        unsorted_numbers = []
-        name_to_page = {}
-        name_to_real_name = {}
-        name_to_bookmark = {}
-        has_no_number = set()
-        was_numerated = False
-
-        allowed_before_numbers = ['аннотация', 'глоссарий']
-        allowed_after_numbers = ['лист регистрации изменений']
-
+        toc_start = []
+        links = self._toc_links(toc_start)
+        if self.tier == QUICK_TIER:
+            return self._read_table_of_contents(links)
+        # the last table of contents field found before the links end
+        return self._read_table_of_contents(links, lambda: self.layout.start_page(toc_start[-1] if toc_start else None),
+                                            self._is_text_on_page)
+
+    def _toc_links(self, toc_start: list) -> Iterator[TocLink]:
+        """Links of the table of contents items in the order of the document, its field start is put in toc_start"""
         for field in self.doc.range.fields:
+            self.cancel_token.raise_if_cancelled()
             if field.type == aw.fields.FieldType.FIELD_TOC:
-                toc_start = field.start
+                toc_start.append(field.start)
             if field.type == aw.fields.FieldType.FIELD_HYPERLINK:
                 hyperlink = field.as_field_hyperlink()
                 if hyperlink.sub_address is not None and hyperlink.sub_address.find("_Toc") == 0:
-                    toc_exists = True
                     toc_item = field.start.get_ancestor(aw.NodeType.PARAGRAPH).as_paragraph()
-                    toc_item_text = toc_item.to_string(aw.SaveFormat.TEXT).strip()
-
-                    matched = re.search(r"((\d+(\.\d+)*\.?\s+)|^)(.*?)\s+(\d+)$", toc_item_text)
-                    if matched is not None:
-                        name_in_toc = matched.group(4)
-                        number_in_toc = matched.group(2)
-                        page_number = matched.group(5)
-
-                        cleared_name = name_in_toc.strip().lower()
-                        name_to_page[cleared_name] = int(page_number)
-
-                        if number_in_toc:
-                            was_numerated = True
-                            number_in_toc = number_in_toc.strip()
-                            if number_in_toc[-1] != ".":
-                                verdict.add_message("Номера пунктов должны оканчиваться точкой")
-                            number_in_toc = number_in_toc.strip(".")
-
-                            structure_number = list(map(int, number_in_toc.split(".")))
-                            if len(structure_number) > 4:
-                                toc_numeration_valid = False
-                                verdict.add_message(
-                                    "Минимальная единица документа - подпункт с номером вида x.x.x.x"
-                                    "Более мелкие единицы относятся к перечислениям и в содержании не указываются"
-                                )
-                                break
-
-                            while len(structure_number) != 4:
-                                structure_number.append(0)
-                            unsorted_numbers.append(tuple(structure_number))
-                            names_to_numbers[cleared_name] = tuple(structure_number)
-                            numbers_to_names[tuple(structure_number)] = cleared_name
-                        else:
-                            has_no_number.add(cleared_name)
-                            if was_numerated:
-                                if not (cleared_name in allowed_after_numbers or "приложение" in cleared_name):
-                                    verdict.add_message(
-                                        f"Пункт {name_in_toc} должен быть пронумерован "
-                                        f"или находиться перед содержанием документа"
-                                    )
-                            else:
-                                if not (cleared_name in allowed_before_numbers):
-                                    verdict.add_message(
-                                        f"Пункт {name_in_toc} должен быть пронумерован или находиться в конце документа"
-                                    )
-
-                        bookmark = self.doc.range.bookmarks.get_by_name(hyperlink.sub_address)
-                        try:
-                            name_to_bookmark[name_in_toc.lower().strip()] = bookmark
-                            pointer = bookmark.bookmark_start.get_ancestor(aw.NodeType.PARAGRAPH).as_paragraph()
-                            pointed_text = pointer.to_string(aw.SaveFormat.TEXT)
-                            matched = re.search(r"((\d+(\.\d+)*\.?\s+)|^)(.*?)$", pointed_text)
-                            real_name = matched.group(4).strip()
-                            if not (cleared_name == pointed_text.lower().strip() or real_name.lower() == cleared_name):
-                                verdict.add_message(
-                                    f'Заголовок содержания "{name_in_toc}" не совпадает с заголовком в тексте'
-                                )
-                                toc_valid = False
-                            else:
-                                name_to_real_name[cleared_name] = real_name
-
-                        except Exception:
-                            if not self._is_text_on_page(name_in_toc.lower().strip(), page_number):
-                                verdict.add_message(
-                                    f'Заголовок содержания "{name_in_toc}" не совпадает с заголовком в тексте'
-                                )
-                                toc_valid = False
-                            else:
-                                name_to_real_name[cleared_name] = name_in_toc.strip()
-
-        if not toc_exists:
-            verdict.add_message("В документе нет содержания")
-            return verdict
-
-        layout_collector = aw.layout.LayoutCollector(self.doc)
-        toc_start_page = layout_collector.get_start_page_index(toc_start)  # this is 1-based index
-        name_to_page["содержание"] = toc_start_page
-
-        if not self._is_text_on_page("СОДЕРЖАНИЕ", toc_start_page - 1, lower=False):
-            verdict.add_message("Страница содержания должна содержать заголовок 'СОДЕРЖАНИЕ'")
-
-        sorted_numbers = sorted(unsorted_numbers)
-        if toc_numeration_valid:
-            if sorted_numbers != unsorted_numbers:
-                verdict.add_message("Нарушен порядок нумерации в содержании и тексте документа")
-            if sorted_numbers:
-                first_element_page = name_to_page[numbers_to_names[sorted_numbers[0]]]
-                if first_element_page <= toc_start_page:
-                    verdict.add_message("Содержание должно находиться перед основным текстом на отдельной странице.")
-
-        if "аннотация" in has_no_number:
-            if toc_start_page < name_to_page["аннотация"]:
-                verdict.add_message("Аннотация должна быть перед содержанием")
-        else:
-            verdict.add_message("Аннотация не нумеруется")
-
-        if "содержание" in has_no_number:
-            verdict.add_message("Содержание не указывается в содержании и не нумеруется.")
-
-        if "лист регистрации изменений" not in has_no_number:
-            verdict.add_message("Лист регистрации изменений не нумеруется")
-
-        if toc_valid and toc_numeration_valid:
-            self.toc_valid = True
-            self.names_to_numbers = names_to_numbers
-            self.sorted_numbers = sorted_numbers
-            self.name_to_page = name_to_page
-            self.name_to_real_name = name_to_real_name
-            self.name_to_bookmark = name_to_bookmark
-            self.has_no_number = has_no_number
-            self.numbers_to_names = numbers_to_names
-
-        return verdict
+                    bookmark = self.doc.range.bookmarks.get_by_name(hyperlink.sub_address)
+                    try:
+                        pointer = bookmark.bookmark_start.get_ancestor(aw.NodeType.PARAGRAPH).as_paragraph()
+                        pointed_text = self._to_text(pointer)
+                    except Exception:
+                        pointed_text = None
+                    yield TocLink(self._to_text(toc_item).strip(), pointed_text, bookmark)
 
 
 class TechTaskChecker(BaseChecker):
-    doc_type: str = "ТЗ"
-    doc_type_id: str = "05"
-    chapters: List[str] = [
-        "аннотация", "введение", "содержание",
-        "лист регистрации изменений", "назначение разработки",
-        "требования к программе",
-        "требования к программной документации",
-        "технико-экономические показатели",
-        "стадии и этапы разработки",
-        "порядок контроля и приемки"
-    ]
-    doc_standard: str = "ГОСТ 19.106-78"
+    profile = get_profile("ТЗ")
 
 
 class OperatorManualChecker(BaseChecker):
-    doc_type: str = "34"
-    doc_type_id: str = "01-1"
-    chapters: List[str] = [
-        "содержание",
-        "лист регистрации изменений",
-        "назначение программы",
-        "условия выполнения программы",
-        "выполнение программы",
-        "сообщения автору"
-    ]
-    doc_standard: str = "ГОСТ 19.505-79"
+    profile = get_profile("РО")
 
 
 class ExplanatoryNoteChecker(BaseChecker):
-    doc_type: str = "81"
-    doc_type_id: str = "01-1"
-    chapters: List[str] = [
-        "содержание",
-        "лист регистрации изменений",
-        "введение",
-        "назначение и область применения",
-        "технические характеристики",
-        "ожидаемые технико-экономические показатели",
-        "источники, использованные при разработке"
-    ]
-    doc_standard: str = "ГОСТ 19.404-79"
+    profile = get_profile("ПЗ")
 
 
 class TestProgramAndMethods(BaseChecker):
-    doc_type: str = "51"
-    doc_type_id: str = "01-1"
-    chapters: List[str] = [
-        "содержание",
-        "лист регистрации изменений",
-        "объект испытаний",
-        "цель испытаний",
-        "требования к программной документации",
-        "состав и порядок испытаний",
-        "методы испытаний"
-    ]
-    doc_standard: str = "ГОСТ 19.301-79"
+    profile = get_profile("ПИМИ")
 
 
 class ProgramText(BaseChecker):
-    doc_type: str = "12"
-    doc_type_id: str = "01-1"
-    chapters: List[str] = [
-        "лист регистрации изменений",
-    ]
-    doc_standard: str = "ГОСТ 19.401-78"
+    profile = get_profile("ТП")
 
 
 allowed_checkers = {
@@ -906,12 +969,7 @@ allowed_checkers = {
     "ПИМИ": TestProgramAndMethods,
     "ТП": ProgramText
 }
-
-full_allowed_checkers_name = {
-    "ОБЩЕЕ": "Только общая проверка",
-    "ТЗ": "Техническое задание",
-    "РО": "Руководство оператора",
-    "ПЗ": "Пояснительная записка",
-    "ПИМИ": "Программа и методика испытаний",
-    "ТП": "Текст программы"
-}
+# document types described only by a profile get the checks of BaseChecker with their rules
+for _name, _profile in get_profiles().items():
+    if _name not in allowed_checkers:
+        allowed_checkers[_name] = type("ProfileChecker", (BaseChecker,), {"profile": _profile})
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import posixpath
+import re
+import zipfile
+from typing import Dict, List, Optional
+from xml.etree import ElementTree
+
+from docsCheck.cache import default_cache_dir, write_atomic
+from docsCheck.registry import rules_version
+
+# parts shared by all sections, settings.xml is left out as Word rewrites revision ids in it on every save
+_SHARED_PARTS = ["word/styles.xml", "word/numbering.xml", "word/fontTable.xml", "word/theme/theme1.xml"]
+_DOCUMENT_PART = "word/document.xml"
+_DOCUMENT_RELS_PART = "word/_rels/document.xml.rels"
+
+_SECTION_PROPERTIES_END = re.compile(rb"</(?:\w+:)?sectPr>")
+_PARAGRAPH_END = re.compile(rb"</(?:\w+:)?p>")
+_SECTION_PROPERTIES = re.compile(rb"<(?:\w+:)?sectPr\b.*?</(?:\w+:)?sectPr>", re.S)
+_HEADER_FOOTER_REFERENCE = re.compile(rb"<(?:\w+:)?(?:header|footer)Reference\b[^>]*?\b(?:\w+:)?id=\"([^\"]+)\"")
+
+
+def fingerprint(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode("utf-8")
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class PackageFingerprints:
+    """
+    Content hashes of every section body and of its headers and footers,
+    read from the XML of the .docx package without loading aspose
+    """
+
+    def __init__(self, sections: List[str], headers_footers: List[str]):
+        self.sections = sections
+        self.headers_footers = headers_footers
+
+    @classmethod
+    def from_file(cls, doc_path) -> "PackageFingerprints":
+        with zipfile.ZipFile(doc_path) as package:
+            names = set(package.namelist())
+            shared = fingerprint(*(package.read(name) for name in _SHARED_PARTS if name in names))
+            targets = cls._relationship_targets(package.read(_DOCUMENT_RELS_PART))
+            document = package.read(_DOCUMENT_PART)
+
+            sections = []
+            headers_footers = []
+            for chunk in cls._split_sections(document):
+                sections.append(fingerprint(shared, chunk))
+
+                properties = _SECTION_PROPERTIES.findall(chunk)
+                properties = properties[-1] if properties else b""
+                parts = []
+                for relationship_id in _HEADER_FOOTER_REFERENCE.findall(properties):
+                    target = targets.get(relationship_id.decode("utf-8"))
+                    parts.append(package.read(target) if target in names else b"")
+                headers_footers.append(fingerprint(shared, properties, *parts))
+
+        return cls(sections, headers_footers)
+
+    @staticmethod
+    def _relationship_targets(rels: bytes) -> Dict[str, str]:
+        targets = {}
+        for relationship in ElementTree.fromstring(rels):
+            target = relationship.get("Target", "")
+            if not target.startswith("/"):
+                target = posixpath.normpath(posixpath.join("word", target))
+            targets[relationship.get("Id")] = target.lstrip("/")
+        return targets
+
+    @staticmethod
+    def _split_sections(document: bytes) -> List[bytes]:
+        # properties of every section but the last end its last paragraph,
+        # the last section properties are the last child of the body
+        chunks = []
+        start = 0
+        ends = list(_SECTION_PROPERTIES_END.finditer(document))
+        for i, match in enumerate(ends):
+            end = match.end()
+            if i < len(ends) - 1:
+                paragraph_end = _PARAGRAPH_END.search(document, end)
+                if paragraph_end is not None:
+                    end = paragraph_end.end()
+            chunks.append(document[start:end])
+            start = end
+
+        return chunks
+
+
+class IncrementalStore:
+    """Per-fragment results of the previous check of a document, kept next to the verdict cache"""
+
+    def __init__(self, cache_dir: str = None):
+        self.store_dir = os.path.join(cache_dir or default_cache_dir(), "incremental")
+
+    def _state_path(self, doc_path, doc_type) -> str:
+        return os.path.join(self.store_dir, fingerprint(os.path.abspath(doc_path), doc_type or "ОБЩЕЕ") + ".json")
+
+    def load(self, doc_path, doc_type=None) -> Optional[dict]:
+        try:
+            with open(self._state_path(doc_path, doc_type), encoding="utf-8") as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            return None
+        if state.get("rules_version") != rules_version():
+            return None
+        return state
+
+    def save(self, doc_path, doc_type, state: dict):
+        state = dict(state, rules_version=rules_version())
+        write_atomic(self._state_path(doc_path, doc_type), json.dumps(state, ensure_ascii=False).encode("utf-8"))
+
+
+def check_incremental(checker, doc_path, doc_type=None, store: IncrementalStore = None):
+    """Checks the document rerunning only the checks whose fragments changed since the previous run"""
+    if store is None:
+        store = IncrementalStore()
+    try:
+        with checker.profiler.check("fingerprints"):
+            fingerprints = PackageFingerprints.from_file(doc_path)
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile, ElementTree.ParseError):
+        return checker.main_check()
+
+    verdict, state = checker.incremental_check(fingerprints, store.load(doc_path, doc_type))
+    if state is not None:
+        store.save(doc_path, doc_type, state)
+    return verdict
@@ -0,0 +1,221 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aspose.words as aw
+
+from docsCheck.profiling import LAYOUT_COLLECTOR, NULL_PROFILER, PAGE_LOOKUP
+from docsCheck.text import DocumentText
+
+
+class LayoutService:
+    """Node to page mapping of one document, shared by all checks"""
+
+    def __init__(self, doc: aw.Document, profiler=NULL_PROFILER):
+        self.doc = doc
+        self.profiler = profiler
+        self._layout_collector = None
+
+    @property
+    def layout_collector(self) -> aw.layout.LayoutCollector:
+        if self._layout_collector is None:
+            self.profiler.count(LAYOUT_COLLECTOR)
+            self._layout_collector = aw.layout.LayoutCollector(self.doc)
+        return self._layout_collector
+
+    def start_page(self, node: aw.Node) -> int:
+        """1-based index of the page the node starts on, 0 if the node is not laid out"""
+        self.profiler.count(PAGE_LOOKUP)
+        return self.layout_collector.get_start_page_index(node)
+
+    def end_page(self, node: aw.Node) -> int:
+        self.profiler.count(PAGE_LOOKUP)
+        return self.layout_collector.get_end_page_index(node)
+
+    def page_range(self, node: aw.Node) -> Tuple[int, int]:
+        return self.start_page(node), self.end_page(node)
+
+    def start_pages(self, nodes: Iterable[aw.Node]) -> List[int]:
+        layout_collector = self.layout_collector
+        pages = [layout_collector.get_start_page_index(node) for node in nodes]
+        self.profiler.count(PAGE_LOOKUP, len(pages))
+        return pages
+
+    def page_ranges(self, nodes: Iterable[aw.Node]) -> List[Tuple[int, int]]:
+        layout_collector = self.layout_collector
+        ranges = [
+            (layout_collector.get_start_page_index(node), layout_collector.get_end_page_index(node))
+            for node in nodes
+        ]
+        self.profiler.count(PAGE_LOOKUP, 2 * len(ranges))
+        return ranges
+
+    def release(self):
+        if self._layout_collector is not None:
+            self._layout_collector.document = None
+            self._layout_collector = None
+
+
+class PageTextIndex:
+    """Text of every page collected from a single layout pass"""
+
+    def __init__(self, layout: LayoutService, text: DocumentText):
+        self.doc = layout.doc
+        self.layout = layout
+        self.document_text = text
+        self._texts: Dict[int, str] = {}
+        self._lower_texts: Dict[int, str] = {}
+        self._first_paragraphs: Dict[int, Optional[str]] = {}
+        self._build()
+
+    def _build(self):
+        texts_by_page: Dict[int, List[str]] = {}
+
+        paragraphs = [
+            node for node in self.doc.get_child_nodes(aw.NodeType.PARAGRAPH, True)
+            if node.get_ancestor(aw.NodeType.HEADER_FOOTER) is None
+        ]
+        for node, (start_page, end_page) in zip(paragraphs, self.layout.page_ranges(paragraphs)):
+            # layout pages are 1-based, extract_pages indexes are 0-based
+            start_page -= 1
+            end_page -= 1
+            if start_page < 0:
+                continue
+
+            text = self.document_text.text(node)
+            in_table = node.get_ancestor(aw.NodeType.TABLE) is not None
+            for page in range(start_page, end_page + 1):
+                texts_by_page.setdefault(page, []).append(text)
+                if page not in self._first_paragraphs:
+                    # page starts with a table or with the tail of the previous paragraph
+                    if in_table or page != start_page:
+                        self._first_paragraphs[page] = None
+                    else:
+                        self._first_paragraphs[page] = text.strip()
+
+        for page, texts in texts_by_page.items():
+            self._texts[page] = "".join(texts)
+
+    def text(self, page_number: int, lower: bool = False) -> str:
+        self.layout.profiler.count(PAGE_LOOKUP)
+        page_number = int(page_number)
+        if not lower:
+            return self._texts.get(page_number, "")
+
+        if page_number not in self._lower_texts:
+            self._lower_texts[page_number] = self._texts.get(page_number, "").lower()
+        return self._lower_texts[page_number]
+
+    def first_paragraph_text(self, page_number: int) -> Optional[str]:
+        """Stripped text of the paragraph the page starts with, None if it starts with something else"""
+        self.layout.profiler.count(PAGE_LOOKUP)
+        return self._first_paragraphs.get(int(page_number))
+
+
+class PageView:
+    """
+    Paragraphs and tables at the body level of a page range, the same as body.paragraphs and body.tables
+    of the first section of extract_pages(first_page, last_page - first_page + 1)
+    """
+    PAGE_BREAK = "\x0c"
+
+    def __init__(self, first_page: int, last_page: int, paragraphs: List[aw.Paragraph], tables: List[aw.tables.Table]):
+        # 0-based and inclusive, as page indexes of extract_pages
+        self.first_page = first_page
+        self.last_page = last_page
+        self.paragraphs = paragraphs
+        self.tables = tables
+
+    @classmethod
+    def from_layout(cls, layout: LayoutService, geometry: "DocumentGeometry",
+                    first_page: int, last_page: int) -> Optional["PageView"]:
+        """
+        Nodes of the original document, nothing is copied. None if the range is not inside one section
+        or a node crosses its bounds: extract_pages splits such a node, so only an extracted copy has the same nodes
+        """
+        first_number, last_number = first_page + 1, last_page + 1
+        sections = [i for i, (start_page, end_page) in enumerate(geometry.section_pages)
+                    if start_page <= last_number and end_page >= first_number]
+        if len(sections) != 1:
+            return None
+        section = layout.doc.sections[sections[0]].as_section()
+
+        paragraphs = []
+        tables = []
+        for node in section.body.get_child_nodes(aw.NodeType.ANY, False):
+            start_page, end_page = layout.page_range(node)
+            if node.node_type == aw.NodeType.PARAGRAPH and start_page < end_page \
+                    and node.as_paragraph().get_text().startswith(cls.PAGE_BREAK):
+                # the break at the start of a paragraph moves its text to the next page
+                start_page += 1
+            if start_page > last_number:
+                break
+            if end_page < first_number:
+                continue
+            if start_page < first_number or end_page > last_number \
+                    or node.node_type not in (aw.NodeType.PARAGRAPH, aw.NodeType.TABLE):
+                return None
+
+            if node.node_type == aw.NodeType.PARAGRAPH:
+                paragraphs.append(node.as_paragraph())
+            else:
+                tables.append(node.as_table())
+
+        return cls(first_page, last_page, paragraphs, tables)
+
+    @classmethod
+    def from_document(cls, pages: aw.Document, first_page: int, last_page: int) -> "PageView":
+        """View of the pages extracted with extract_pages"""
+        body = pages.first_section.body
+        return cls(first_page, last_page,
+                   [node.as_paragraph() for node in body.paragraphs], [node.as_table() for node in body.tables])
+
+    def page_number(self, page_in_view: int) -> int:
+        """1-based page of the document from the 1-based page inside the view"""
+        return self.first_page + page_in_view
+
+
+class DocumentGeometry:
+    """Page count and page ranges of the document computed once per run"""
+    # certification page and title page
+    FRONT_MATTER_PAGES: int = 2
+
+    def __init__(self, page_count: int, section_pages: List[Tuple[int, int]]):
+        self.page_count = page_count
+        self.section_pages = section_pages
+
+        self._pages_before_section = []
+        pages_before = 0
+        for start_page, end_page in section_pages:
+            self._pages_before_section.append(pages_before)
+            pages_before += end_page - start_page + 1
+
+    @classmethod
+    def from_layout(cls, layout: LayoutService) -> "DocumentGeometry":
+        sections = list(layout.doc.sections)
+        return cls(layout.doc.page_count, layout.page_ranges(sections))
+
+    @property
+    def sections_count(self) -> int:
+        return len(self.section_pages)
+
+    def section_page_count(self, section_index: int) -> int:
+        start_page, end_page = self.section_pages[section_index]
+        return end_page - start_page + 1
+
+    def pages_before_section(self, section_index: int) -> int:
+        return self._pages_before_section[section_index]
+
+    @property
+    def body_first_page(self) -> int:
+        """1-based index of the first page after the front matter"""
+        return self.FRONT_MATTER_PAGES + 1
+
+    @property
+    def body_last_page(self) -> int:
+        """1-based index of the last page before the change registration page"""
+        return self.page_count - 1
+
+    def is_front_matter_page(self, page_number: int) -> bool:
+        return page_number <= self.FRONT_MATTER_PAGES
+
+    def is_body_page(self, page_number: int) -> bool:
+        return self.body_first_page <= page_number <= self.body_last_page
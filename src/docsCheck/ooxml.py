@@ -0,0 +1,541 @@
+"""
+Backend reading a .docx package straight from its zip with a streaming XML parser, importable without loading aspose.
+It serves the layout-free checks of the quick tier, the checks that need pagination are left to aspose
+"""
+import posixpath
+import re
+import zipfile
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from xml.etree import ElementTree
+
+from docsCheck.backends import PageSetup, DocumentChecks, TocLink
+from docsCheck.profiling import NULL_PROFILER
+from docsCheck.registry import QUICK_TIER, RuleProfile
+from docsCheck.scheduler import CancellationToken, CheckTask
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+PACKAGE_RELATIONSHIP = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+
+TWIPS_TO_POINTS = 1 / 20
+# page of a section without a page setup, as aspose reads it
+DEFAULT_PAGE = {"w": 612.0, "h": 792.0, "left": 70.85, "right": 70.85, "bottom": 70.85, "top": 70.85}
+DEFAULT_FONT = "Times New Roman"
+
+# values of aspose.words.PaperSize by the page width and height in points, the first match wins
+PAPER_SIZES = [
+    (0, 841.9, 1190.55),  # A3
+    (1, 595.3, 841.9),  # A4
+    (2, 419.55, 595.3),  # A5
+    (3, 728.5, 1031.8),  # B4
+    (4, 515.9, 728.5),  # B5
+    (5, 522.0, 756.0),  # EXECUTIVE
+    (6, 612.0, 936.0),  # FOLIO
+    (7, 1224.0, 792.0),  # LEDGER
+    (8, 612.0, 1008.0),  # LEGAL
+    (9, 612.0, 792.0),  # LETTER
+    (10, 311.8, 623.6),  # ENVELOPE_DL
+    (11, 609.4, 779.5),  # QUARTO
+    (12, 396.0, 612.0),  # STATEMENT
+    (13, 792.0, 1224.0),  # TABLOID
+    (14, 720.0, 1008.0),  # PAPER_10X14
+    (16, 296.9, 684.0),  # NUMBER_10_ENVELOPE
+]
+PAPER_CUSTOM = 17
+# points, the page size is rounded to a known paper within 2 millimeters
+PAPER_TOLERANCE = 5.67
+
+# run content that makes aspose read the run as a Run node, fields marks and objects are nodes of their own
+RUN_CONTENT = {W + tag for tag in ["t", "tab", "br", "cr", "sym", "noBreakHyphen", "softHyphen", "instrText",
+                                   "delText", "delInstrText", "ptab"]}
+# text of the elements as paragraph.to_string(aw.SaveFormat.TEXT) exports it
+TEXT_CHARACTERS = {W + "tab": "\t", W + "cr": "\r\n", W + "noBreakHyphen": "\x1e", W + "softHyphen": "\x1f"}
+NOTE_REFERENCES = {W + "footnoteReference": "footnotes", W + "endnoteReference": "endnotes",
+                   W + "commentReference": "comments"}
+HYPERLINK_ANCHOR = re.compile(r'\\l\s+(?:"([^"]*)"|(\S+))')
+
+
+class OoxmlError(ValueError):
+    pass
+
+
+def paper_size(width: float, height: float) -> int:
+    for size, paper_width, paper_height in PAPER_SIZES:
+        if abs(width - paper_width) <= PAPER_TOLERANCE and abs(height - paper_height) <= PAPER_TOLERANCE:
+            return size
+    return PAPER_CUSTOM
+
+
+def _twips(element: Optional[ElementTree.Element], attribute: str, default: float) -> float:
+    value = element.get(W + attribute) if element is not None else None
+    return float(value) * TWIPS_TO_POINTS if value is not None else default
+
+
+def _value(element: Optional[ElementTree.Element], path: str) -> Optional[str]:
+    found = element.find(path) if element is not None else None
+    return found.get(W + "val") if found is not None else None
+
+
+class StyleSheet:
+    """Styles of the package, the effective font of a style combination is resolved once"""
+
+    def __init__(self, styles: Optional[ElementTree.Element], theme_fonts: Dict[str, str]):
+        self._theme_fonts = theme_fonts
+        self._styles: Dict[str, ElementTree.Element] = {}
+        self.default_paragraph_style = None
+        self.default_font = None
+        self._fonts: Dict[Tuple[Optional[str], Optional[str]], str] = {}
+        if styles is None:
+            return
+
+        self.default_font = self.rfonts_font(styles.find(f"{W}docDefaults/{W}rPrDefault/{W}rPr/{W}rFonts"))
+        for style in styles.iter(W + "style"):
+            style_id = style.get(W + "styleId")
+            self._styles[style_id] = style
+            if style.get(W + "type") == "paragraph" and style.get(W + "default") in ("1", "true", "on"):
+                self.default_paragraph_style = style_id
+
+    def rfonts_font(self, rfonts: Optional[ElementTree.Element]) -> Optional[str]:
+        """ASCII font of w:rFonts, the theme font takes precedence"""
+        if rfonts is None:
+            return None
+        theme = rfonts.get(W + "asciiTheme")
+        if theme is not None:
+            return self._theme_fonts.get("major" if theme.startswith("major") else "minor")
+        return rfonts.get(W + "ascii")
+
+    def _chain(self, style_id: Optional[str]) -> Iterator[ElementTree.Element]:
+        seen = set()
+        while style_id is not None and style_id in self._styles and style_id not in seen:
+            seen.add(style_id)
+            style = self._styles[style_id]
+            yield style
+            style_id = _value(style, W + "basedOn")
+
+    def _style_font(self, style_id: Optional[str]) -> Optional[str]:
+        for style in self._chain(style_id):
+            font = self.rfonts_font(style.find(f"{W}rPr/{W}rFonts"))
+            if font is not None:
+                return font
+        return None
+
+    def font(self, run_style: Optional[str], paragraph_style: Optional[str]) -> str:
+        """Font of a run without its own w:rFonts"""
+        key = (run_style, paragraph_style)
+        font = self._fonts.get(key)
+        if font is None:
+            font = (self._style_font(run_style) or self._style_font(paragraph_style or self.default_paragraph_style)
+                    or self.default_font or DEFAULT_FONT)
+            self._fonts[key] = font
+        return font
+
+    def numbering(self, style_id: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """numId and ilvl given by the paragraph style"""
+        for style in self._chain(style_id or self.default_paragraph_style):
+            num_pr = style.find(f"{W}pPr/{W}numPr")
+            if num_pr is not None:
+                return _value(num_pr, W + "numId"), _value(num_pr, W + "ilvl")
+        return None, None
+
+
+class Numbering:
+    """Levels of the lists of the package as (number format, level text)"""
+
+    def __init__(self, numbering: Optional[ElementTree.Element], styles: StyleSheet):
+        self._styles = styles
+        self._abstract: Dict[str, ElementTree.Element] = {}
+        self._nums: Dict[str, ElementTree.Element] = {}
+        self._levels: Dict[Tuple[str, str], Optional[Tuple[str, str]]] = {}
+        if numbering is None:
+            return
+        for abstract in numbering.iter(W + "abstractNum"):
+            self._abstract[abstract.get(W + "abstractNumId")] = abstract
+        for num in numbering.iter(W + "num"):
+            self._nums[num.get(W + "numId")] = num
+
+    def level(self, num_id: str, ilvl: str) -> Optional[Tuple[str, str]]:
+        key = (num_id, ilvl)
+        if key not in self._levels:
+            self._levels[key] = self._find_level(num_id, ilvl, set())
+        return self._levels[key]
+
+    def _find_level(self, num_id: str, ilvl: str, seen: set) -> Optional[Tuple[str, str]]:
+        num = self._nums.get(num_id)
+        if num is None or num_id in seen:
+            return None
+        seen.add(num_id)
+
+        for override in num.iter(W + "lvlOverride"):
+            if override.get(W + "ilvl") == ilvl and override.find(W + "lvl") is not None:
+                return self._format(override.find(W + "lvl"))
+
+        abstract = self._abstract.get(_value(num, W + "abstractNumId"))
+        if abstract is None:
+            return None
+        link = _value(abstract, W + "numStyleLink")
+        if link is not None:
+            # the list is defined by a numbering style
+            linked_num_id, _ = self._styles.numbering(link)
+            return self._find_level(linked_num_id, ilvl, seen) if linked_num_id is not None else None
+        for lvl in abstract.iter(W + "lvl"):
+            if lvl.get(W + "ilvl") == ilvl:
+                return self._format(lvl)
+        return None
+
+    @staticmethod
+    def _format(lvl: ElementTree.Element) -> Tuple[str, str]:
+        return _value(lvl, W + "numFmt") or "decimal", _value(lvl, W + "lvlText") or ""
+
+
+class StoryContent:
+    """Fonts of the runs and level texts of the bulleted list items of a story or of a part of it"""
+
+    def __init__(self):
+        self.fonts: Set[str] = set()
+        self.bullets: Set[str] = set()
+
+    def update(self, other: "StoryContent"):
+        self.fonts |= other.fonts
+        self.bullets |= other.bullets
+
+
+class DocxSection(StoryContent):
+    def __init__(self):
+        super().__init__()
+        self.page_setup: Optional[PageSetup] = None
+        # relationship ids of the headers and footers of the section
+        self.parts: List[str] = []
+        # (part, id) of the footnotes, endnotes and comments referenced from the section
+        self.notes: List[Tuple[str, str]] = []
+
+
+class _Field:
+    __slots__ = ("paragraph", "code", "in_code")
+
+    def __init__(self, paragraph: int):
+        self.paragraph = paragraph
+        self.code = []
+        self.in_code = True
+
+
+class DocxPackage:
+    """
+    .docx read straight from its zip. The main document is parsed in one streaming pass:
+    every paragraph is dropped once its fonts, list level and links are taken,
+    only the texts of the paragraphs with table of contents links or bookmarks are kept
+    """
+
+    def __init__(self, source):
+        try:
+            self._zip = zipfile.ZipFile(source)
+            self._document_part = self._main_part()
+            self._relationships = self._part_relationships(self._document_part)
+        except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as err:
+            raise OoxmlError(f"Not a .docx package: {err}") from None
+        self.sections: List[DocxSection] = []
+        # anchors of the hyperlinks to the table of contents items with the paragraphs they start in
+        self._links: List[Tuple[int, str]] = []
+        self._bookmarks: Dict[str, int] = {}
+        self._texts: Dict[int, str] = {}
+        self._read = False
+
+    @staticmethod
+    def is_package(source) -> bool:
+        return zipfile.is_zipfile(source)
+
+    def close(self):
+        self._zip.close()
+
+    def _parse(self, part: str) -> Optional[ElementTree.Element]:
+        if part is None or part not in self._zip.namelist():
+            return None
+        with self._zip.open(part) as stream:
+            return ElementTree.parse(stream).getroot()
+
+    def _main_part(self) -> str:
+        for relationship in self._parse("_rels/.rels").iter(PACKAGE_RELATIONSHIP):
+            if relationship.get("Type", "").endswith("/officeDocument"):
+                return relationship.get("Target").lstrip("/")
+        raise KeyError("officeDocument")
+
+    def _part_relationships(self, part: str) -> Dict[str, Tuple[str, str]]:
+        """Type and part name of every relationship of the part by its id"""
+        directory, name = posixpath.split(part)
+        root = self._parse(posixpath.join(directory, "_rels", name + ".rels"))
+        relationships = {}
+        for relationship in root.iter(PACKAGE_RELATIONSHIP) if root is not None else []:
+            if relationship.get("TargetMode") == "External":
+                continue
+            target = posixpath.normpath(posixpath.join(directory, relationship.get("Target")))
+            relationships[relationship.get("Id")] = (relationship.get("Type", "").rsplit("/", 1)[-1], target)
+        return relationships
+
+    def _related_part(self, relationship_type: str) -> Optional[str]:
+        for found_type, part in self._relationships.values():
+            if found_type == relationship_type:
+                return part
+        return None
+
+    def _theme_fonts(self) -> Dict[str, str]:
+        theme = self._parse(self._related_part("theme"))
+        fonts = {}
+        for kind in ["major", "minor"]:
+            latin = theme.find(f"{A}themeElements/{A}fontScheme/{A}{kind}Font/{A}latin") if theme is not None else None
+            if latin is not None:
+                fonts[kind] = latin.get("typeface")
+        return fonts
+
+    def read(self, token: CancellationToken = None):
+        """Parses the package once, the token is looked at between paragraphs"""
+        if self._read:
+            return
+        # a read stopped by its token leaves partial results, the next one starts over
+        self.sections = []
+        self._links = []
+        self._bookmarks = {}
+        self._texts = {}
+        self._styles = StyleSheet(self._parse(self._related_part("styles")), self._theme_fonts())
+        self._numbering = Numbering(self._parse(self._related_part("numbering")), self._styles)
+        self._token = token or CancellationToken()
+        self._fields: List[_Field] = []
+        self._paragraph_count = 0
+        # bookmarks outside of paragraphs belong to the next paragraph
+        self._pending_bookmarks: List[str] = []
+
+        stories = [DocxSection()]
+        for element in self._stream(self._document_part, stories, depth=2):
+            # the last section is described by the w:sectPr of the body
+            if element.tag == W + "sectPr":
+                self._close_section(stories[-1], element)
+                stories.append(DocxSection())
+        self._read_notes()
+        self._read_headers_footers()
+        self._read = True
+
+    def _stream(self, part: str, stories: List[StoryContent], depth: int = 1) -> Iterator[ElementTree.Element]:
+        """
+        Reads the paragraphs of the part into the last of stories, yields the elements that are not paragraphs
+        and are depth levels below the root of the part: the notes of a notes part, w:body children of the document.
+        Every element is dropped once it is read
+        """
+        path = []
+        fallback = 0
+        with self._zip.open(part) as stream:
+            for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+                if event == "start":
+                    path.append(element)
+                    if element.tag == MC_FALLBACK:
+                        fallback += 1
+                    continue
+
+                path.pop()
+                if element.tag == MC_FALLBACK:
+                    # the same content as in the choice, aspose reads only one of them
+                    fallback -= 1
+                elif element.tag == W + "p" and not fallback:
+                    self._token.raise_if_cancelled()
+                    section_properties = self._read_paragraph(element, stories[-1])
+                    if section_properties is not None:
+                        yield section_properties
+                elif element.tag == W + "bookmarkStart" and path and path[-1].tag != W + "p":
+                    self._pending_bookmarks.append(element.get(W + "name"))
+                if len(path) == depth and element.tag != W + "p":
+                    yield element
+                if element.tag == W + "p" or len(path) == depth:
+                    path[-1].remove(element)
+
+    def _close_section(self, section: DocxSection, properties: ElementTree.Element):
+        size = properties.find(W + "pgSz")
+        margins = properties.find(W + "pgMar")
+        width = _twips(size, "w", DEFAULT_PAGE["w"])
+        height = _twips(size, "h", DEFAULT_PAGE["h"])
+        section.page_setup = PageSetup(
+            size is None or size.get(W + "orient") != "landscape", paper_size(width, height),
+            *(_twips(margins, side, DEFAULT_PAGE[side]) for side in ["left", "right", "bottom", "top"])
+        )
+        for reference in list(properties.iter(W + "headerReference")) + list(properties.iter(W + "footerReference")):
+            section.parts.append(reference.get(R + "id"))
+        self.sections.append(section)
+
+    def _read_paragraph(self, paragraph: ElementTree.Element,
+                        content: StoryContent) -> Optional[ElementTree.Element]:
+        """Adds the runs and the list level of the paragraph, returns its w:sectPr if it ends a section"""
+        number = self._paragraph_count
+        self._paragraph_count += 1
+        properties = paragraph.find(W + "pPr")
+        style = _value(properties, W + "pStyle")
+        self._read_list_item(properties, style, content)
+
+        keep_text = False
+        if self._pending_bookmarks:
+            for name in self._pending_bookmarks:
+                self._bookmarks.setdefault(name, number)
+            self._pending_bookmarks = []
+            keep_text = True
+
+        chunks = []
+        for element in self._walk(paragraph):
+            tag = element.tag
+            if tag == W + "r":
+                if any(child.tag in RUN_CONTENT for child in element):
+                    run_properties = element.find(W + "rPr")
+                    font = self._styles.rfonts_font(run_properties.find(W + "rFonts")
+                                                    if run_properties is not None else None)
+                    content.fonts.add(font or self._styles.font(_value(run_properties, W + "rStyle"), style))
+            elif tag == W + "fldChar":
+                kind = element.get(W + "fldCharType")
+                if kind == "begin":
+                    self._fields.append(_Field(number))
+                elif self._fields:
+                    field = self._fields[-1]
+                    if field.in_code:
+                        field.in_code = False
+                        keep_text |= self._read_instruction("".join(field.code), field.paragraph)
+                    if kind == "end":
+                        self._fields.pop()
+            elif tag in (W + "instrText", W + "delInstrText"):
+                if self._fields and self._fields[-1].in_code:
+                    self._fields[-1].code.append(element.text or "")
+            elif tag == W + "fldSimple":
+                keep_text |= self._read_instruction(element.get(W + "instr", ""), number)
+            elif tag == W + "hyperlink":
+                anchor = element.get(W + "anchor")
+                if anchor is not None and anchor.startswith("_Toc"):
+                    self._links.append((number, anchor))
+                    keep_text = True
+            elif tag == W + "bookmarkStart":
+                self._bookmarks.setdefault(element.get(W + "name"), number)
+                keep_text = True
+            elif tag in NOTE_REFERENCES and isinstance(content, DocxSection):
+                content.notes.append((NOTE_REFERENCES[tag], element.get(W + "id")))
+            elif not any(field.in_code for field in self._fields):
+                if tag in (W + "t", W + "delText"):
+                    chunks.append(element.text or "")
+                elif tag in TEXT_CHARACTERS:
+                    chunks.append(TEXT_CHARACTERS[tag])
+                elif tag == W + "br" and element.get(W + "type") not in ("page", "column"):
+                    chunks.append("\r\n")
+
+        if keep_text:
+            self._texts[number] = "".join(chunks) + "\r\n"
+        return properties.find(W + "sectPr") if properties is not None else None
+
+    def _read_list_item(self, properties: Optional[ElementTree.Element], style: Optional[str],
+                        content: StoryContent):
+        num_pr = properties.find(W + "numPr") if properties is not None else None
+        num_id, ilvl = _value(num_pr, W + "numId"), _value(num_pr, W + "ilvl")
+        if num_id is None or ilvl is None:
+            style_num_id, style_ilvl = self._styles.numbering(style)
+            num_id = num_id or style_num_id
+            ilvl = ilvl or style_ilvl
+        if num_id is None or num_id == "0":
+            return
+        level = self._numbering.level(num_id, ilvl or "0")
+        if level is not None and level[0] == "bullet":
+            content.bullets.add(level[1])
+
+    def _read_instruction(self, instruction: str, paragraph: int) -> bool:
+        """Keeps the table of contents link of a HYPERLINK field, True if the field is one"""
+        words = instruction.split()
+        if not words or words[0].upper() != "HYPERLINK":
+            return False
+        matched = HYPERLINK_ANCHOR.search(instruction)
+        anchor = matched and (matched.group(1) if matched.group(1) is not None else matched.group(2))
+        if not anchor or not anchor.startswith("_Toc"):
+            return False
+        self._links.append((paragraph, anchor))
+        return True
+
+    @staticmethod
+    def _walk(element: ElementTree.Element) -> Iterator[ElementTree.Element]:
+        """Content of the paragraph in the order of the document, properties and fallback content are skipped"""
+        for child in element:
+            if child.tag in (W + "pPr", W + "rPr", MC_FALLBACK):
+                continue
+            yield child
+            yield from DocxPackage._walk(child)
+
+    def _read_notes(self):
+        """Footnotes, endnotes and comments are a part of the section their reference is in"""
+        referenced: Dict[Tuple[str, str], List[DocxSection]] = {}
+        for section in self.sections:
+            for note in section.notes:
+                referenced.setdefault(note, []).append(section)
+
+        for relationship_type in sorted(set(kind for kind, _ in referenced)):
+            part = self._related_part(relationship_type)
+            if part is None or part not in self._zip.namelist():
+                continue
+            stories = [StoryContent()]
+            for element in self._stream(part, stories):
+                note = (relationship_type, element.get(W + "id"))
+                for section in referenced.get(note, []):
+                    section.update(stories[-1])
+                stories.append(StoryContent())
+
+    def _read_headers_footers(self):
+        for section in self.sections:
+            for relationship_id in section.parts:
+                _, part = self._relationships.get(relationship_id, (None, None))
+                if part is None or part not in self._zip.namelist():
+                    continue
+                for _ in self._stream(part, [section]):
+                    pass
+
+    def page_setups(self) -> List[PageSetup]:
+        return [section.page_setup for section in self.sections]
+
+    def toc_links(self) -> Iterator[TocLink]:
+        for paragraph, anchor in self._links:
+            bookmark = self._bookmarks.get(anchor)
+            pointed_text = self._texts.get(bookmark) if bookmark is not None else None
+            yield TocLink(self._texts.get(paragraph, "").strip(), pointed_text, anchor)
+
+
+class OoxmlChecker(DocumentChecks):
+    """
+    Checks of the quick tier on a .docx package, aspose is never loaded.
+    Every check reads the package on first use, main_check reads it in its own task
+    """
+
+    def __init__(self, package: DocxPackage, profile: RuleProfile, profiler=NULL_PROFILER, jobs: int = 1):
+        super().__init__(profiler, jobs, QUICK_TIER)
+        self.package = package
+        self.profile = profile
+
+    def release_layout(self):
+        self.package.close()
+
+    def _check_tasks(self) -> List[CheckTask]:
+        return [
+            self._task("package", lambda: self.package.read(self.cancel_token)),
+            self._task("check_page_margins", self.check_page_margins, "package"),
+            self._task("check_table_of_contents", self.check_table_of_contents, "package"),
+            self._task("check_fonts, check_lists", lambda: [self.check_fonts(), self.check_lists()], "package"),
+            self._task("check_chapters", self.check_chapters, "check_table_of_contents"),
+        ]
+
+    def _package(self) -> DocxPackage:
+        self.package.read(self.cancel_token)
+        return self.package
+
+    def _page_setups(self) -> List[PageSetup]:
+        return self._package().page_setups()
+
+    def check_table_of_contents(self):
+        return self._read_table_of_contents(self._package().toc_links())
+
+    def check_fonts(self):
+        return self._fonts_report([
+            {"pages": [i + 1] if any(font != self.profile.font for font in section.fonts) else []}
+            for i, section in enumerate(self._package().sections)
+        ])
+
+    def check_lists(self):
+        return self._lists_report([
+            {"pages": [i + 1] if any(bullet not in ("–", "-") for bullet in section.bullets) else [],
+             "has_hyphen": any(bullet in ("–", "-") for bullet in section.bullets)}
+            for i, section in enumerate(self._package().sections)
+        ])
@@ -0,0 +1,175 @@
+import gc
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# expensive backend operations counted for each check
+CLONE = "clone"
+EXTRACT_PAGES = "extract_pages"
+LAYOUT_COLLECTOR = "layout_collector"
+TO_STRING = "to_string"
+PAGE_LOOKUP = "page_lookup"
+OPERATIONS = [CLONE, EXTRACT_PAGES, LAYOUT_COLLECTOR, TO_STRING, PAGE_LOOKUP]
+
+
+def current_memory() -> Optional[int]:
+    """Resident set size of the process in bytes, the peak one where the current one is unknown"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes everywhere but macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+class MemoryLimitExceeded(MemoryError):
+    def __init__(self, memory: int, limit: int):
+        super().__init__(f"Resident set size {memory} exceeds the limit {limit}")
+        self.memory = memory
+        self.limit = limit
+
+
+class MemoryGuard:
+    """Memory ceiling of the low memory mode, checked between sections"""
+
+    def __init__(self, limit: Optional[int] = None):
+        # bytes, None only collects garbage of the finished sections
+        self.limit = limit
+
+    def check(self):
+        gc.collect()
+        if self.limit is None:
+            return
+        memory = current_memory()
+        if memory is not None and memory > self.limit:
+            raise MemoryLimitExceeded(memory, self.limit)
+
+
+@dataclass
+class CheckProfile:
+    check: str
+    wall_time: float = 0.0
+    memory_delta: Optional[int] = None
+    counts: Dict[str, int] = field(default_factory=Counter)
+    # name of the check this one is a part of, its time and operations are included in that check
+    part_of: Optional[str] = None
+    parts: List["CheckProfile"] = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> dict:
+        data = {"check": self.check, "wall_time": self.wall_time, "memory_delta": self.memory_delta,
+                "counts": dict(self.counts)}
+        if self.part_of is not None:
+            data["part_of"] = self.part_of
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CheckProfile":
+        return cls(data["check"], data["wall_time"], data["memory_delta"], Counter(data["counts"]),
+                   data.get("part_of"))
+
+
+class Profiler:
+    """Wall time, memory delta and backend operation counts of every check of one run"""
+    enabled = True
+
+    def __init__(self):
+        self.checks: List[CheckProfile] = []
+        # checks scheduled in parallel count their operations in their own threads
+        self._local = threading.local()
+
+    @property
+    def _stack(self) -> List[CheckProfile]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def count(self, operation: str, number: int = 1):
+        # a part counts the operation for the check it is a part of as well
+        for profile in reversed(self._stack):
+            profile.counts[operation] += number
+            if profile.part_of is None:
+                break
+
+    def part(self, name: str) -> Optional[CheckProfile]:
+        """
+        Part of the running check by name, such as one of the checks sharing a document traversal,
+        None outside a check or for the check itself. Parts get no memory delta, it is not told apart
+        """
+        stack = self._stack
+        parent = next((profile for profile in reversed(stack) if profile.part_of is None), None)
+        if parent is None or parent.check == name:
+            return None
+        for part in parent.parts:
+            if part.check == name:
+                return part
+        part = CheckProfile(name, part_of=parent.check)
+        parent.parts.append(part)
+        return part
+
+    @contextmanager
+    def accumulate(self, part: Optional[CheckProfile]):
+        """Adds the time and the operations of the block to the part, the block may be entered many times"""
+        if part is None:
+            yield
+            return
+        self._stack.append(part)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            part.wall_time += time.perf_counter() - start
+            self._stack.pop()
+
+    @contextmanager
+    def check(self, name: str):
+        profile = CheckProfile(name)
+        self._stack.append(profile)
+        memory_before = current_memory()
+        start = time.perf_counter()
+        try:
+            yield profile
+        finally:
+            profile.wall_time = time.perf_counter() - start
+            memory_after = current_memory()
+            if memory_before is not None and memory_after is not None:
+                profile.memory_delta = memory_after - memory_before
+            self._stack.pop()
+            self.checks.append(profile)
+            self.checks.extend(profile.parts)
+
+
+class NullProfiler:
+    """Used when profiling is off, costs a no-op call per counted operation"""
+    enabled = False
+    checks: List[CheckProfile] = []
+
+    def count(self, operation: str, number: int = 1):
+        pass
+
+    def part(self, name: str) -> None:
+        return None
+
+    @contextmanager
+    def accumulate(self, part: Optional[CheckProfile]):
+        yield
+
+    @contextmanager
+    def check(self, name: str):
+        yield None
+
+
+NULL_PROFILER = NullProfiler()
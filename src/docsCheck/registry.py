@@ -0,0 +1,185 @@
+"""Document types known to the checker, importable without loading aspose"""
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# the TOML parser and the hashes are imported with the first profile, the CLI starts without them
+
+# bump when checks change their results, cached verdicts of older versions are ignored
+CHECKS_VERSION = "2"
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+# directories with additional profiles separated by os.pathsep, a profile with a known name replaces it
+PROFILES_ENV = "DOCSCHECK_PROFILES"
+DEFAULT_PROFILE = "ОБЩЕЕ"
+
+# the quick tier runs only the checks that do not need the page layout and reports them by section
+QUICK_TIER = "quick"
+FULL_TIER = "full"
+TIERS = [QUICK_TIER, FULL_TIER]
+
+MILLIMETERS_TO_POINTS = 72 / 25.4
+MARGINS = ["left", "right", "bottom", "top"]
+
+
+class ProfileError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class RuleProfile:
+    """Rules of one document type compiled from its TOML profile"""
+    name: str
+    title: str
+    standard: str
+    doc_type: str
+    doc_type_id: str
+    chapters: Tuple[str, ...]
+    # millimeters as written in the profile and points compared with the page setup
+    margins: Dict[str, float]
+    margin_points: Dict[str, float]
+    margin_tolerance: float
+    font: str
+    font_size: float
+    # points
+    line_spacing: float
+    heading_spacing: float
+    identifier: Pattern
+    short_identifier: Pattern
+    _identifier_prefix: str
+    _full_identifiers: Dict[str, Pattern] = field(default_factory=dict, compare=False, repr=False)
+
+    def full_identifier(self, page_type: Optional[str] = None) -> Pattern:
+        """Identifier with the document type and number, page_type is e.g. "ЛУ" for the certification page"""
+        suffix = "" if page_type is None else "-" + page_type
+        pattern = self._full_identifiers.get(suffix)
+        if pattern is None:
+            pattern = re.compile(self._identifier_prefix + re.escape(suffix) + r"\s*")
+            self._full_identifiers[suffix] = pattern
+        return pattern
+
+
+def _merge(base: dict, override: dict) -> dict:
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = _merge(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+def _compile(data: dict, path: str) -> RuleProfile:
+    try:
+        identifier = data["identifier"]
+        margins = data["margins"]
+        text = data["text"]
+        doc_type = data.get("doc_type", identifier["any_doc_type"])
+        doc_type_id = data.get("doc_type_id", identifier["any_doc_type_id"])
+        font_size = float(text["font_size"])
+        return RuleProfile(
+            name=data["name"],
+            title=data["title"],
+            standard=data["standard"],
+            doc_type=doc_type,
+            doc_type_id=doc_type_id,
+            chapters=tuple(data["chapters"]),
+            margins={side: margins[side] for side in MARGINS},
+            margin_points={side: margins[side] * MILLIMETERS_TO_POINTS for side in MARGINS},
+            margin_tolerance=float(margins["tolerance"]),
+            font=text["font"],
+            font_size=font_size,
+            line_spacing=font_size * text["line_spacing"],
+            heading_spacing=font_size * text["heading_spacing"],
+            identifier=re.compile(identifier["pattern"]),
+            short_identifier=re.compile(r"\s*" + identifier["pattern"] + r"\s"),
+            _identifier_prefix=r"\s*" + identifier["pattern"] + r"\s" + doc_type + r"\s" + doc_type_id,
+        )
+    except KeyError as err:
+        raise ProfileError(f"В профиле {path} нет обязательного поля {err}") from None
+    except (TypeError, re.error) as err:
+        raise ProfileError(f"Некорректный профиль {path}: {err}") from None
+
+
+def _profile_paths() -> List[str]:
+    import glob
+
+    directories = [PROFILES_DIR] + [path for path in os.environ.get(PROFILES_ENV, "").split(os.pathsep) if path]
+    return [path for directory in directories for path in sorted(glob.glob(os.path.join(directory, "*.toml")))]
+
+
+def _load_profiles() -> Tuple[Dict[str, RuleProfile], str]:
+    import hashlib
+
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        import tomli as tomllib
+
+    raw = {}
+    paths = {}
+    digest = hashlib.sha256(CHECKS_VERSION.encode("utf-8"))
+    for path in _profile_paths():
+        with open(path, "rb") as profile_file:
+            content = profile_file.read()
+        digest.update(content)
+        try:
+            data = tomllib.loads(content.decode("utf-8"))
+        except (UnicodeDecodeError, tomllib.TOMLDecodeError) as err:
+            raise ProfileError(f"Некорректный профиль {path}: {err}") from None
+        if "name" not in data:
+            raise ProfileError(f"В профиле {path} нет обязательного поля 'name'")
+        raw[data["name"]] = data
+        paths[data["name"]] = path
+
+    def resolve(name, seen=()):
+        data = raw[name]
+        parent = data.get("extends")
+        if parent is None:
+            return data
+        if parent not in raw or parent in seen:
+            raise ProfileError(f"Профиль {paths[name]} наследует неизвестный или циклический профиль {parent}")
+        return _merge(resolve(parent, seen + (name,)), data)
+
+    profiles = {name: _compile(resolve(name), paths[name]) for name in raw}
+    if DEFAULT_PROFILE not in profiles:
+        raise ProfileError(f"Нет профиля {DEFAULT_PROFILE}")
+    # profile contents change the results, so they are a part of the rules version
+    return profiles, f"{CHECKS_VERSION}-{digest.hexdigest()[:12]}"
+
+
+@lru_cache(maxsize=None)
+def _loaded() -> Tuple[Dict[str, RuleProfile], str]:
+    # compiled once per process on the first use, so a broken profile does not break --help
+    return _load_profiles()
+
+
+def get_profiles() -> Dict[str, RuleProfile]:
+    """Profiles by document type, raises ProfileError if a profile is broken"""
+    return _loaded()[0]
+
+
+def rules_version() -> str:
+    return _loaded()[1]
+
+
+def allowed_doc_types() -> List[str]:
+    return list(get_profiles())
+
+
+def doc_type_titles() -> Dict[str, str]:
+    return {name: profile.title for name, profile in get_profiles().items()}
+
+
+def get_profile(doc_type=None) -> RuleProfile:
+    return get_profiles()[doc_type or DEFAULT_PROFILE]
+
+
+def get_checker(doc_type=None):
+    """Checker class for the document type, imports the aspose backend on the first call"""
+    from docsCheck import checker
+
+    if doc_type is None:
+        return checker.BaseChecker
+    return checker.allowed_checkers[doc_type]
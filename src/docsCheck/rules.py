@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import aspose.words as aw
+
+from docsCheck.profiling import NULL_PROFILER, CheckProfile
+from docsCheck.scheduler import CancellationToken, ErrorBudget
+
+NodeCallback = Callable[[aw.Node], None]
+
+_CASTS = {
+    aw.NodeType.PARAGRAPH: lambda node: node.as_paragraph(),
+    aw.NodeType.RUN: lambda node: node.as_run(),
+}
+
+
+class RuleEngine:
+    """Single document traversal feeding the per-node callbacks of several checks"""
+
+    def __init__(self, error_budget: Optional[ErrorBudget] = None, profiler=NULL_PROFILER):
+        self._callbacks: Dict[aw.NodeType, List[NodeCallback]] = {}
+        # the traversal ends once the errors of the run are over it, the rules keep what they have found
+        self.error_budget = error_budget
+        self.profiler = profiler
+        # part of the profile the callbacks registered now belong to
+        self._part: Optional[CheckProfile] = None
+
+    @contextmanager
+    def rule(self, check: str):
+        """
+        Work of the check and the callbacks it registers inside the block are profiled as a part of the running task,
+        so the checks sharing the traversal get their own time and operation counts
+        """
+        part = self.profiler.part(check)
+        self._part = part
+        try:
+            with self.profiler.accumulate(part):
+                yield
+        finally:
+            self._part = None
+
+    def register(self, node_type: aw.NodeType, callback: NodeCallback):
+        part = self._part
+        if part is not None:
+            accumulate = self.profiler.accumulate
+            rule_callback = callback
+
+            def callback(node: aw.Node):
+                with accumulate(part):
+                    rule_callback(node)
+
+        self._callbacks.setdefault(node_type, []).append(callback)
+
+    def visit(self, root: aw.CompositeNode, token: Optional[CancellationToken] = None):
+        """
+        token is looked at before every visited node, a cancelled run stops the traversal with CheckCancelled.
+        A run over its error budget stops it without an error
+        """
+        if not self._callbacks:
+            return
+
+        budget = self.error_budget
+
+        if len(self._callbacks) == 1:
+            # a single node type is cheaper to enumerate directly
+            node_type, callbacks = next(iter(self._callbacks.items()))
+            cast = _CASTS.get(node_type)
+            for node in root.get_child_nodes(node_type, True):
+                if token is not None:
+                    token.raise_if_cancelled()
+                if budget is not None and budget.exceeded:
+                    return
+                if cast is not None:
+                    node = cast(node)
+                for callback in callbacks:
+                    callback(node)
+            return
+
+        for node in root.get_child_nodes(aw.NodeType.ANY, True):
+            node_type = node.node_type
+            callbacks = self._callbacks.get(node_type)
+            if callbacks is None:
+                continue
+            if token is not None:
+                token.raise_if_cancelled()
+            if budget is not None and budget.exceeded:
+                return
+
+            cast = _CASTS.get(node_type)
+            if cast is not None:
+                node = cast(node)
+            for callback in callbacks:
+                callback(node)
@@ -1,36 +1,313 @@
-import aspose.words as aw
-import pathlib
+import base64
+import io
 import os
-from docsCheck import checker
+import time
+from docsCheck.profiling import NULL_PROFILER, MemoryGuard, MemoryLimitExceeded, Profiler
+from docsCheck.registry import FULL_TIER, QUICK_TIER, get_checker, get_profile
+from docsCheck.scheduler import CancellationToken
+from docsCheck.utils import Message, Verdict
+from typing import Iterator
 
+# aspose and the modules of loading are imported inside the functions, so the CLI can validate arguments
+# and reject wrong input without loading the .NET runtime
 
-def run_check(doc_path, doc_type=None, licence_path=None):
+# images of a .docx package, no check reads them, the layout takes their size from the document markup
+MEDIA_PREFIX = "word/media/"
+# copying the package costs more than loading a few small images
+LEAN_MEDIA_SIZE = 2 ** 20
+# 1x1 transparent png loaded in place of every image by the lean load
+PLACEHOLDER_IMAGE = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+class CheckError(Exception):
+    """Document can not be checked, message is ready to be shown to the user"""
+
+
+_license_path = None
+
+
+def set_license(licence_path=None):
+    """Applies the license once per process"""
+    global _license_path
     if licence_path is None:
-        package_path = pathlib.Path(__file__).parent.resolve()
+        package_path = os.path.dirname(os.path.realpath(__file__))
         licence_path = os.path.join(package_path, "Aspose.WordsforPythonvia.NET.lic")
 
+    if _license_path == licence_path:
+        return
+
+    import aspose.words as aw
+
     lic = aw.License()
     try:
         lic.set_license(licence_path)
     except RuntimeError as err:
-        print("\nThere was an error setting the license:", err)
-        return
+        raise CheckError(f"\nThere was an error setting the license: {err}")
+    _license_path = licence_path
+
+
+def _is_stream(doc_path) -> bool:
+    return hasattr(doc_path, "read")
+
+
+def document_source(doc):
+    """
+    Path of the document or a seekable binary stream over it: bytes, memoryviews and
+    not seekable file-like objects are wrapped in memory, a stream holds the whole document from its start
+    """
+    if isinstance(doc, (bytes, bytearray, memoryview)):
+        return io.BytesIO(doc)
+    if _is_stream(doc) and not (hasattr(doc, "seekable") and doc.seekable()):
+        return io.BytesIO(doc.read())
+    return doc
+
+
+def _rewound(doc_path):
+    """Every reader of a stream starts at the beginning of the document"""
+    if _is_stream(doc_path):
+        doc_path.seek(0)
+    return doc_path
+
+
+def _without_media(doc_path):
+    """In-memory copy of a .docx package with every image replaced by a placeholder, the source if images are small"""
+    import zipfile
+
+    try:
+        package = zipfile.ZipFile(_rewound(doc_path))
+    except (zipfile.BadZipFile, OSError):
+        return doc_path
+
+    with package:
+        media = {info.filename for info in package.infolist()
+                 if info.filename.startswith(MEDIA_PREFIX) and info.file_size > len(PLACEHOLDER_IMAGE)}
+        if sum(package.getinfo(name).file_size for name in media) < LEAN_MEDIA_SIZE:
+            return doc_path
+        lean = io.BytesIO()
+        with zipfile.ZipFile(lean, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as copy:
+            for info in package.infolist():
+                copy.writestr(info.filename, PLACEHOLDER_IMAGE if info.filename in media else package.read(info))
+    return lean
+
+
+def _load_document(doc_path, low_memory=False, lean=True):
+    import aspose.words as aw
+
+    load_options = aw.loading.LoadOptions()
+    if lean:
+        # embedded objects keep their pictures, the checks never read the object data or the images
+        load_options.ignore_ole_data = True
+        doc_path = _without_media(doc_path)
+    doc_path = _rewound(doc_path)
+
+    if not low_memory:
+        return aw.Document(doc_path, load_options)
+
+    import tempfile
+
+    # aspose keeps the parts of the package being read in temporary files instead of memory
+    with tempfile.TemporaryDirectory(prefix="docsCheck-") as temp_folder:
+        load_options.temp_folder = temp_folder
+        return aw.Document(doc_path, load_options)
+
+
+def _uses_package(doc_path, tier) -> bool:
+    """The quick tier reads .docx packages itself, aspose is needed for the layout and the other formats"""
+    from docsCheck.ooxml import DocxPackage
+
+    try:
+        return tier == QUICK_TIER and DocxPackage.is_package(_rewound(doc_path))
+    except OSError:
+        return False
+
+
+def _open_package(doc_path, doc_type, profiler, jobs):
+    from docsCheck.ooxml import DocxPackage, OoxmlChecker, OoxmlError
+
+    try:
+        with profiler.check("load"):
+            package = DocxPackage(doc_path)
+    except OSError:
+        raise CheckError("Невозможно открыть документ. Возможно, он используется другим процессом")
+    except OoxmlError:
+        raise CheckError("Файл повреждён.")
+    return OoxmlChecker(package, get_profile(doc_type), profiler, jobs)
+
+
+def open_checker(doc_path, doc_type=None, profiler=NULL_PROFILER, jobs=1, low_memory=False, memory_limit=None,
+                 tier=FULL_TIER, lean=True, token: CancellationToken = None):
+    """
+    doc_path is a path, bytes, a memoryview or a binary file-like object.
+    low_memory checks the document section by section in one thread,
+    memory_limit in bytes turns it on and stops the check when the process grows above the limit.
+    The quick tier runs only the checks that do not need the page layout, a .docx is then streamed
+    from its package without aspose and without the memory modes, it never holds the whole document.
+    lean loads the document without the images and the embedded object data.
+    Cancelling the token stops the checks at their next node or section, the verdict is marked as truncated
+    """
+    check = _open_checker(document_source(doc_path), doc_type, profiler, jobs, low_memory, memory_limit, tier, lean)
+    if token is not None:
+        check.cancel_token = token
+    return check
+
+
+def _open_checker(doc_path, doc_type, profiler, jobs, low_memory, memory_limit, tier, lean):
+    if _uses_package(doc_path, tier):
+        return _open_package(doc_path, doc_type, profiler, jobs)
+
+    low_memory = low_memory or memory_limit is not None
     try:
-        doc = aw.Document(doc_path)
+        with profiler.check("load"):
+            doc = _load_document(doc_path, low_memory, lean)
     except RuntimeError:
-        print("Невозможно открыть документ. Возможно, он используется другим процессом")
-        return
+        raise CheckError("Невозможно открыть документ. Возможно, он используется другим процессом")
     except Exception:
-        print("Файл повреждён.")
-        return
+        raise CheckError("Файл повреждён.")
 
     try:
-        if doc_type is None:
-            check = checker.BaseChecker(doc)
-        else:
-            check = checker.allowed_checkers[doc_type](doc)
+        return get_checker(doc_type)(doc, profiler, jobs, MemoryGuard(memory_limit) if low_memory else None, tier)
     except RuntimeError:
-        print("Невозможно проверить документ.")
-        return
+        raise CheckError("Невозможно проверить документ.")
+
+
+def _memory_limit_error(err: MemoryLimitExceeded) -> CheckError:
+    return CheckError(f"Проверка остановлена: занято {err.memory / 2 ** 20:.0f} МБ памяти "
+                      f"при пределе {err.limit / 2 ** 20:.0f} МБ")
+
+
+def check_document(doc_path, doc_type=None, incremental=False, profile=False, jobs=1, low_memory=False,
+                   memory_limit=None, tier=FULL_TIER, max_errors=None, lean=True,
+                   token: CancellationToken = None, time_budget: float = None, check_budget: float = None) -> Verdict:
+    """
+    With profile the verdict carries the time, memory and backend operations of every check,
+    jobs > 1 runs independent checks of the document in threads, the checks of an aspose document still take turns.
+    The incremental check keeps the state of the full tier by the path of the document, the quick tier and
+    documents given in memory are always checked whole.
+    max_errors stops a not incremental check once more errors are found, the verdict is marked as truncated.
+    time_budget seconds for the document, loading included, and check_budget seconds for every check
+    stop a not incremental check that runs longer, the truncated verdict names the checks that did not finish
+    """
+    doc_path = document_source(doc_path)
+    if time_budget is not None:
+        token = token or CancellationToken()
+        token.deadline = time.monotonic() + time_budget
+    check = open_checker(doc_path, doc_type, Profiler() if profile else NULL_PROFILER, jobs, low_memory, memory_limit,
+                         tier, lean, token)
+    try:
+        if incremental and tier == FULL_TIER and not _is_stream(doc_path):
+            from docsCheck.incremental import check_incremental
+
+            return check_incremental(check, doc_path, doc_type)
+        return check.main_check(max_errors, check_budget)
+    except MemoryLimitExceeded as err:
+        raise _memory_limit_error(err)
+
+
+def _in_worker() -> bool:
+    from docsCheck import workers
+
+    return workers.in_worker()
+
 
-    return check.main_check()
+def _cached(doc_path, doc_type, tier=FULL_TIER):
+    """Cache, key of the document and its cached verdict, the cache is None if the document can not be read"""
+    from docsCheck.cache import VerdictCache
+
+    try:
+        cache = VerdictCache()
+        key = cache.key(_rewound(doc_path), doc_type, tier)
+    except OSError:
+        # unreadable files are reported by check_document
+        return None, None, None
+    return cache, key, cache.get(key)
+
+
+def _check_killable(doc_path, doc_type, licence_path, token: CancellationToken, options: dict) -> Verdict:
+    """
+    Checks the document in a new worker process, which is killed if it does not return the partial verdict
+    within KILL_GRACE over the time budget, so a document hanging in the load or in a backend call
+    does not hang the caller. Cancelling the token cancels the check in the worker
+    """
+    from docsCheck import workers
+
+    time_budget = options["time_budget"]
+    if _is_stream(doc_path):
+        doc_path = _rewound(doc_path).read()
+    worker = workers.Worker(licence_path)
+    try:
+        worker.submit(workers.check_job, doc_path, doc_type, options, kill_after=time_budget + workers.KILL_GRACE)
+        return worker.result(None if token is None else lambda: token.cancelled)
+    except workers.WorkerDied as err:
+        raise workers.died_error(err, time_budget)
+    finally:
+        worker.kill()
+
+
+def check_cached(doc_path, doc_type=None, licence_path=None, use_cache=True, incremental=False, profile=False,
+                 jobs=1, low_memory=False, memory_limit=None, tier=FULL_TIER, max_errors=None, lean=True,
+                 token: CancellationToken = None, time_budget: float = None, check_budget: float = None) -> Verdict:
+    """
+    doc_path is a path, bytes, a memoryview or a binary file-like object.
+    Cached verdict of an unchanged document is returned without loading aspose,
+    incremental check of a changed one reruns only the checks of its changed fragments.
+    With time_budget aspose checks the document in a worker process killed once it is over the budget
+    by KILL_GRACE, unless this process is a worker itself.
+    Profiled checks always run and are not cached, neither are checks truncated by max_errors, the token
+    or the time budgets.
+    Raises CheckError if the document can not be checked
+    """
+    doc_path = document_source(doc_path)
+    cache, key, verdict = _cached(doc_path, doc_type, tier) if use_cache and not profile else (None, None, None)
+    if verdict is not None:
+        return verdict
+
+    options = dict(incremental=incremental, profile=profile, jobs=jobs, low_memory=low_memory,
+                   memory_limit=memory_limit, tier=tier, max_errors=max_errors, lean=lean,
+                   time_budget=time_budget, check_budget=check_budget)
+    if _uses_package(doc_path, tier):
+        # the package reader looks at the token between nodes and never blocks inside aspose
+        verdict = check_document(doc_path, doc_type, token=token, **options)
+    elif time_budget is not None and not _in_worker():
+        verdict = _check_killable(doc_path, doc_type, licence_path, token, options)
+    else:
+        set_license(licence_path)
+        verdict = check_document(doc_path, doc_type, token=token, **options)
+
+    if cache is not None and not verdict.truncated:
+        cache.put(key, verdict)
+    return verdict
+
+
+def run_check(doc_path, doc_type=None, licence_path=None, use_cache=True, incremental=False, profile=False,
+              jobs=1, low_memory=False, memory_limit=None, tier=FULL_TIER, max_errors=None, lean=True,
+              time_budget=None, check_budget=None):
+    """Same as check_cached, prints the reason and returns None if the document can not be checked"""
+    try:
+        return check_cached(doc_path, doc_type, licence_path, use_cache, incremental, profile, jobs, low_memory,
+                            memory_limit, tier, max_errors, lean, time_budget=time_budget, check_budget=check_budget)
+    except CheckError as err:
+        print(err)
+
+
+def iter_check(doc_path, doc_type=None, licence_path=None, use_cache=True, jobs=1, low_memory=False,
+               memory_limit=None, tier=FULL_TIER, lean=True) -> Iterator[Message]:
+    """
+    Yields messages as soon as each check finishes, raises CheckError if the document can not be checked.
+    A cached verdict is replayed, streamed messages are not kept, so the streamed check is not cached
+    """
+    doc_path = document_source(doc_path)
+    if use_cache:
+        _, _, verdict = _cached(doc_path, doc_type, tier)
+        if verdict is not None:
+            yield from verdict.iter_messages()
+            return
+
+    if not _uses_package(doc_path, tier):
+        set_license(licence_path)
+    try:
+        yield from open_checker(doc_path, doc_type, jobs=jobs, low_memory=low_memory,
+                                memory_limit=memory_limit, tier=tier, lean=lean).iter_check()
+    except MemoryLimitExceeded as err:
+        raise _memory_limit_error(err)
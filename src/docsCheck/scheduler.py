@@ -0,0 +1,252 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# seconds a check over its deadline has to stop before it is abandoned inside a backend call
+ABANDON_GRACE = 1.0
+
+# threads of the tasks abandoned in this process, see abandoned_tasks_running
+_abandoned: List[threading.Thread] = []
+
+
+@dataclass
+class CheckTask:
+    name: str
+    run: Callable[[], Any]
+    # names of the tasks whose results or side effects this task reads
+    requires: Sequence[str] = ()
+
+
+class CheckCancelled(Exception):
+    """Raised by a check that found its run cancelled"""
+
+
+class CheckTimedOut(CheckCancelled):
+    """Raised by a check over its own deadline or over the deadline of the run"""
+
+
+class CancellationToken:
+    """
+    Shared by the checks of one run, they look at it between nodes and stop once it is cancelled
+    or once the run or the check is over its deadline
+    """
+
+    def __init__(self, deadline: float = None):
+        self._cancelled = threading.Event()
+        # time.monotonic() at the end of the time budget of the run
+        self.deadline = deadline
+        # deadline of the check running in the thread
+        self._local = threading.local()
+        # a task of the run was left running in its thread, nothing more is started on its document
+        self.abandoned = False
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or self.expired
+
+    @contextmanager
+    def check_deadline(self, deadline: Optional[float]):
+        """Deadline of the check run by the current thread"""
+        self._local.deadline = deadline
+        try:
+            yield
+        finally:
+            self._local.deadline = None
+
+    def raise_if_cancelled(self):
+        if self._cancelled.is_set():
+            raise CheckCancelled()
+        check_deadline = getattr(self._local, "deadline", None)
+        if self.deadline is None and check_deadline is None:
+            return
+        now = time.monotonic()
+        if (self.deadline is not None and now > self.deadline) or (check_deadline is not None and now > check_deadline):
+            raise CheckTimedOut()
+
+
+class ErrorBudget:
+    """
+    Errors found by the checks of one run by check name, shared by their threads. Node level checks count
+    their errors while they traverse the document, a finished check replaces its count with the one of its verdict
+    """
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self._lock = threading.Lock()
+        self._errors: Dict[str, int] = {}
+        self._seen: Dict[str, set] = {}
+        self._total = 0
+
+    def found(self, check: str, key=None):
+        """One more error of the check, an error with a key the check has already found is not counted again"""
+        with self._lock:
+            if key is not None:
+                seen = self._seen.setdefault(check, set())
+                if key in seen:
+                    return
+                seen.add(key)
+            self._errors[check] = self._errors.get(check, 0) + 1
+            self._total += 1
+
+    def settle(self, check: str, errors: int):
+        with self._lock:
+            self._total += errors - self._errors.get(check, 0)
+            self._errors[check] = errors
+
+    @property
+    def exceeded(self) -> bool:
+        return self._total > self.max_errors
+
+
+def _validate(tasks: List[CheckTask]):
+    seen = set()
+    for task in tasks:
+        if task.name in seen:
+            raise ValueError(f"Task {task.name} is declared twice")
+        # declaration order is the order of the sequential run, so it has to respect dependencies
+        for name in task.requires:
+            if name not in seen:
+                raise ValueError(f"Task {task.name} requires {name} declared after it or not declared")
+        seen.add(task.name)
+
+
+def iter_tasks(tasks: List[CheckTask], jobs: int = 1, token: Optional[CancellationToken] = None,
+               check_budget: float = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Runs every task after the tasks it requires and yields (name, result) as tasks finish.
+    With jobs > 1 independent tasks run in threads, a backend whose document allows one thread at a time
+    serialises its tasks itself.
+    Once the token is cancelled no task is started and the tasks stopped by CheckCancelled are not yielded.
+    check_budget gives every task that many seconds, see _iter_budgeted
+    """
+    _validate(tasks)
+    token = token or CancellationToken()
+    if token.deadline is not None or check_budget is not None:
+        yield from _iter_budgeted(tasks, jobs, token, check_budget)
+        return
+
+    if jobs <= 1:
+        for task in tasks:
+            if token.cancelled:
+                return
+            try:
+                result = task.run()
+            except CheckCancelled:
+                return
+            yield task.name, result
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    done_names = set()
+    pending = list(tasks)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        running = {}
+        try:
+            while (pending and not token.cancelled) or running:
+                if not token.cancelled:
+                    for task in [task for task in pending if all(name in done_names for name in task.requires)]:
+                        pending.remove(task)
+                        running[executor.submit(task.run)] = task
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        result = future.result()
+                    except CheckCancelled:
+                        continue
+                    done_names.add(task.name)
+                    yield task.name, result
+        finally:
+            # an error or a consumer stopping early leaves the queued tasks unstarted
+            for future in running:
+                future.cancel()
+
+
+def abandoned_tasks_running() -> bool:
+    """A task abandoned in this process still runs, so the document it checks is still in use"""
+    _abandoned[:] = [thread for thread in _abandoned if thread.is_alive()]
+    return bool(_abandoned)
+
+
+def _start_thread(task: CheckTask, token: CancellationToken,
+                  deadline: Optional[float]) -> Tuple["Future", threading.Thread]:
+    from concurrent.futures import Future
+
+    future = Future()
+
+    def run():
+        with token.check_deadline(deadline):
+            try:
+                future.set_result(task.run())
+            except BaseException as err:
+                future.set_exception(err)
+
+    # a daemon thread stuck inside a backend call does not keep the process alive
+    thread = threading.Thread(target=run, name=f"docsCheck {task.name}", daemon=True)
+    thread.start()
+    return future, thread
+
+
+def _iter_budgeted(tasks: List[CheckTask], jobs: int, token: CancellationToken,
+                   check_budget: Optional[float]) -> Iterator[Tuple[str, Any]]:
+    """
+    Tasks run in threads, at most jobs at a time. A task over its deadline stops at its next node,
+    one that does not stop within ABANDON_GRACE is left running in its thread and its result is dropped.
+    It still uses the document, so once a task is abandoned no task is started and token.abandoned is set,
+    tasks requiring an unfinished task never start
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    done_names = set()
+    pending = list(tasks)
+    running: Dict["Future", Tuple[CheckTask, Optional[float], threading.Thread]] = {}
+    while (pending and not token.cancelled and not token.abandoned) or running:
+        if not token.cancelled and not token.abandoned:
+            ready = [task for task in pending if all(name in done_names for name in task.requires)]
+            for task in ready[:max(jobs, 1) - len(running)]:
+                pending.remove(task)
+                deadline = time.monotonic() + check_budget if check_budget is not None else None
+                future, thread = _start_thread(task, token, deadline)
+                running[future] = (task, deadline, thread)
+        if not running:
+            return
+
+        limits = [deadline for _, deadline, _ in running.values() if deadline is not None]
+        if token.deadline is not None:
+            limits.append(token.deadline)
+        timeout = max(0.0, min(limits) + ABANDON_GRACE - time.monotonic()) if limits else None
+        done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            task, _, _ = running.pop(future)
+            try:
+                result = future.result()
+            except CheckCancelled:
+                continue
+            done_names.add(task.name)
+            yield task.name, result
+
+        now = time.monotonic()
+        for future, (task, deadline, thread) in list(running.items()):
+            if min(deadline or now, token.deadline or now) + ABANDON_GRACE < now:
+                del running[future]
+                token.abandoned = True
+                _abandoned.append(thread)
+
+
+def run_tasks(tasks: List[CheckTask], jobs: int = 1) -> Dict[str, Any]:
+    """Results of iter_tasks by task name"""
+    return dict(iter_tasks(tasks, jobs))
@@ -0,0 +1,194 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from docsCheck.registry import allowed_doc_types, get_profiles
+from docsCheck.utils import Verdict
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# requests waiting for a free slot above this number per slot are rejected
+QUEUE_FACTOR = 4
+# bytes of the largest accepted request body, larger uploads are rejected before they are read
+DEFAULT_MAX_BODY = 100 * 2 ** 20
+
+
+class CheckServer(ThreadingHTTPServer):
+    """
+    HTTP server whose worker processes keep the Aspose runtime and the license loaded between checks,
+    a document crashing or hanging its worker costs that worker only
+    """
+    daemon_threads = True
+
+    def __init__(self, address, jobs: int, licence_path=None, time_budget: float = None,
+                 max_body: int = DEFAULT_MAX_BODY):
+        from docsCheck import runners, workers
+
+        # a broken profile stops the server at the start instead of failing every request
+        get_profiles()
+        self.runners = runners
+        self.workers = workers
+        self.time_budget = time_budget
+        self.max_body = max_body
+        self.pool = workers.WorkerPool(jobs, licence_path)
+        # the first worker is started with the server, a license it can not apply stops the server
+        error = self.pool.run(workers.license_error)
+        if error is not None:
+            self.pool.close()
+            raise runners.CheckError(error)
+        super().__init__(address, CheckRequestHandler)
+        self.admission = threading.BoundedSemaphore(jobs * (QUEUE_FACTOR + 1))
+
+    def check(self, source, doc_type, use_cache: bool = True) -> Verdict:
+        options = dict(licence_path=self.pool.licence_path, use_cache=use_cache, time_budget=self.time_budget)
+        kill_after = self.time_budget + self.workers.KILL_GRACE if self.time_budget is not None else None
+        try:
+            return self.pool.run(self.workers.check_job, source, doc_type, options, True, kill_after=kill_after)
+        except self.workers.WorkerDied as err:
+            raise self.workers.died_error(err, self.time_budget)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.close()
+
+
+class CheckRequestHandler(BaseHTTPRequestHandler):
+    server: CheckServer
+
+    def _send_json(self, status: int, data: dict):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _parse_url(self) -> urllib.parse.ParseResult:
+        # http.server decodes the request line as latin-1, non-escaped utf-8 query is restored here
+        try:
+            path = self.path.encode("latin-1").decode("utf-8")
+        except UnicodeError:
+            path = self.path
+        return urllib.parse.urlparse(path)
+
+    def do_GET(self):
+        if self._parse_url().path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "Неизвестный адрес"})
+
+    def do_POST(self):
+        url = self._parse_url()
+        if url.path != "/check":
+            self._send_json(404, {"error": "Неизвестный адрес"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self._send_json(400, {"error": "Неверный заголовок Content-Length"})
+            return
+        if length > self.server.max_body:
+            # the body is not read, so the connection can not be reused
+            self.close_connection = True
+            self._send_json(413, {"error": f"Размер документа больше {self.server.max_body / 2 ** 20:g} МБ"})
+            return
+        # a saturated server rejects the request before reading its body, so waiting uploads hold no memory
+        if not self.server.admission.acquire(blocking=False):
+            self.close_connection = True
+            self._send_json(503, {"error": "Сервер перегружен, повторите запрос позже"})
+            return
+        try:
+            self._check(url, self.rfile.read(length))
+        finally:
+            self.server.admission.release()
+
+    def _check(self, url: urllib.parse.ParseResult, body: bytes):
+        query = urllib.parse.parse_qs(url.query)
+        doc_type = query.get("doc_type", [None])[0]
+        use_cache = query.get("use_cache", ["1"])[0] not in ("0", "false")
+
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            # document on the server file system
+            try:
+                request = json.loads(body.decode("utf-8"))
+                source = request["path"]
+            except (ValueError, KeyError):
+                self._send_json(400, {"error": "Ожидается JSON вида {\"path\": ..., \"doc_type\": ...}"})
+                return
+            doc_type = request.get("doc_type", doc_type)
+            use_cache = request.get("use_cache", use_cache)
+            if not os.path.isfile(source):
+                self._send_json(400, {"error": f"Путь {source} не является файлом"})
+                return
+        else:
+            # uploaded document bytes
+            source = body
+
+        if doc_type is not None and doc_type not in allowed_doc_types():
+            self._send_json(400, {"error": f"Тип документа {doc_type} недоступен"})
+            return
+
+        try:
+            verdict = self.server.check(source, doc_type, use_cache)
+        except self.server.runners.CheckError as err:
+            self._send_json(422, {"error": str(err)})
+            return
+        except Exception as err:
+            self._send_json(500, {"error": f"Ошибка при проверке: {err!r}"})
+            return
+
+        self._send_json(200, verdict.to_dict())
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, jobs=None, licence_path=None, time_budget=None,
+          max_body=DEFAULT_MAX_BODY):
+    """
+    time_budget in seconds is the one of runners.check_document for every document,
+    requests with a body over max_body bytes are rejected with 413
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    server = CheckServer((host, port), jobs, licence_path, time_budget, max_body)
+    print(f"docsCheck слушает http://{host}:{port} (параллельных проверок: {jobs})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+class ServerUnavailable(Exception):
+    pass
+
+
+def request_check(doc_path, doc_type=None, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                  timeout: Optional[float] = None, use_cache: bool = True) -> Verdict:
+    """Sends the document path to a running server, raises ServerUnavailable if nobody listens"""
+    data = json.dumps({"path": os.path.abspath(doc_path), "doc_type": doc_type,
+                       "use_cache": use_cache}).encode("utf-8")
+    request = urllib.request.Request(
+        f"http://{host}:{port}/check", data=data, headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return Verdict.from_dict(json.loads(response.read().decode("utf-8")))
+    except urllib.error.HTTPError as err:
+        message = json.loads(err.read().decode("utf-8")).get("error", str(err))
+        if err.code == 503:
+            raise ServerUnavailable(message)
+        raise RuntimeError(message)
+    except (urllib.error.URLError, ConnectionError) as err:
+        raise ServerUnavailable(str(err))
@@ -0,0 +1,70 @@
+from typing import Dict, Optional, Tuple
+
+import aspose.words as aw
+
+from docsCheck.profiling import NULL_PROFILER, TO_STRING
+
+
+class DocumentText:
+    """
+    Plain text of every paragraph of the document, headers and footers included, exported once into one buffer.
+    Nodes map to (start, end) offsets into it: the text of a story, a table or a cell
+    is the concatenation of the texts of its paragraphs, so it is one slice as well
+    """
+
+    def __init__(self, doc: aw.Document, profiler=NULL_PROFILER):
+        self.doc = doc
+        self.profiler = profiler
+        self._offsets: Dict[aw.Node, Tuple[int, int]] = {}
+        self._normalized: Dict[aw.Node, str] = {}
+        # nodes of other documents, e.g. of extracted pages, are exported on their own
+        self._foreign: Dict[aw.Node, str] = {}
+        self.buffer = self._build()
+
+    def _build(self) -> str:
+        chunks = []
+        position = 0
+        for node in self.doc.get_child_nodes(aw.NodeType.PARAGRAPH, True):
+            text = node.to_string(aw.SaveFormat.TEXT)
+            chunks.append(text)
+            self._offsets[node] = (position, position + len(text))
+            position += len(text)
+        self.profiler.count(TO_STRING, len(chunks))
+        return "".join(chunks)
+
+    def offsets(self, node: aw.Node) -> Optional[Tuple[int, int]]:
+        """Offsets of the node text in the buffer, None if the node is not a part of the document"""
+        if node.node_type == aw.NodeType.PARAGRAPH:
+            return self._offsets.get(node)
+        if not node.is_composite:
+            return None
+
+        paragraphs = node.as_composite_node().get_child_nodes(aw.NodeType.PARAGRAPH, True)
+        if paragraphs.count == 0:
+            return None
+        first = self._offsets.get(paragraphs[0])
+        last = self._offsets.get(paragraphs[paragraphs.count - 1])
+        if first is None or last is None:
+            return None
+        return first[0], last[1]
+
+    def text(self, node: aw.Node) -> str:
+        """Same as node.to_string(aw.SaveFormat.TEXT)"""
+        offsets = self.offsets(node)
+        if offsets is not None:
+            return self.buffer[offsets[0]:offsets[1]]
+
+        text = self._foreign.get(node)
+        if text is None:
+            self.profiler.count(TO_STRING)
+            text = node.to_string(aw.SaveFormat.TEXT)
+            self._foreign[node] = text
+        return text
+
+    def normalized(self, node: aw.Node) -> str:
+        """Stripped lowercase text of the node"""
+        text = self._normalized.get(node)
+        if text is None:
+            text = self.text(node).strip().lower()
+            self._normalized[node] = text
+        return text
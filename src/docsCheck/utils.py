@@ -1,66 +1,173 @@
-from dataclasses import dataclass, field
-from typing import List
+from itertools import islice
+from operator import attrgetter
+from sys import intern
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from enum import Enum
 
+from docsCheck.profiling import CheckProfile
+
 
 class MessageTypes(Enum):
     ERROR = 0
     WARNING = 1
 
 
-@dataclass
 class Message:
-    text: str
-    position: str
-    standard: str
-    message_type: MessageTypes = field(repr=False)
+    """
+    One problem found by a check. Text is formatted from the template on access,
+    strings repeated across messages are interned. Merged verdicts share their messages,
+    so a message is read-only and a changed one is a new Message
+    """
+    __slots__ = ("template", "args", "position", "standard", "message_type")
+
+    def __init__(self, text: str, position: str, standard: str, message_type: MessageTypes, args: tuple = ()):
+        set_field = object.__setattr__
+        set_field(self, "template", intern(text))
+        set_field(self, "args", args)
+        set_field(self, "position", intern(position))
+        set_field(self, "standard", intern(standard))
+        set_field(self, "message_type", message_type)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Message is read-only, {name} can not be set")
+
+    def __reduce__(self):
+        return Message, (self.template, self.position, self.standard, self.message_type, self.args)
+
+    @property
+    def text(self) -> str:
+        return self.template.format(*self.args) if self.args else self.template
+
+    def _with_defaults(self, position: str, standard: str) -> "Message":
+        if (self.position or not position) and (self.standard or not standard):
+            return self
+        return Message(self.template, self.position or position, self.standard or standard, self.message_type,
+                       self.args)
+
+    def __eq__(self, other):
+        if not isinstance(other, Message):
+            return NotImplemented
+        return (self.text, self.position, self.standard, self.message_type) == \
+            (other.text, other.position, other.standard, other.message_type)
+
+    def __repr__(self):
+        return f"Message(text={self.text!r}, position={self.position!r}, standard={self.standard!r})"
+
+    def to_dict(self) -> dict:
+        return {
+            "text": self.text,
+            "position": self.position,
+            "standard": self.standard,
+            "message_type": self.message_type.name,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Message":
+        return cls(
+            data["text"],
+            position=data["position"],
+            standard=data["standard"],
+            message_type=MessageTypes[data["message_type"]],
+        )
 
 
 class Verdict:
     """Class for storing result"""
     ok: bool
-    messages: List[Message]
     standard: str
     position: str
+    # filled by a profiled main check
+    profile: Optional[List[CheckProfile]]
+    # a main check stopped by its error budget, the checks that did not finish have no messages
+    truncated: bool
 
     def __init__(self, ok: bool = True, messages: List[Message] = None, position: str = None, standard: str = None):
         self.ok = ok
-        self.messages = messages
+        # own messages and merged verdicts with their number of entries at the merge, in the order they were added,
+        # merged messages get the position and standard of this verdict when they are read
+        self._entries: List[Union[Message, Tuple["Verdict", int]]] = list(messages) if messages is not None else []
         self.position = position
         self.standard = standard
+        self.profile = None
+        self.truncated = False
 
-        if messages is None:
-            self.messages = []
         if position is None:
             self.position = ""
         if standard is None:
             self.standard = ""
 
-    def add_message(self, message: str, position: str = None, message_type: MessageTypes = MessageTypes.ERROR):
+    def add_message(self, message: str, position: str = None, message_type: MessageTypes = MessageTypes.ERROR,
+                    args: tuple = ()):
+        """message is formatted with args when read, so repeated messages share one template"""
         if position is None:
-            self.messages.append(Message(message,
-                                         position=self.position,
-                                         standard=self.standard,
-                                         message_type=message_type
-                                         ))
-        else:
-            self.messages.append(Message(message,
-                                         position=position,
-                                         standard=self.standard,
-                                         message_type=message_type
-                                         ))
-
+            position = self.position
+        self._entries.append(Message(message, position=position, standard=self.standard,
+                                     message_type=message_type, args=args))
         self.ok = False
 
     def __add__(self, other):
-        if self.position and not other.position:
-            for i in range(len(other.messages)):
-                if not other.messages[i].position:
-                    other.messages[i].position = self.position
-                if not other.messages[i].standard and self.standard:
-                    other.messages[i].standard = self.standard
-
-        self.messages += other.messages
+        # messages of other are completed when read, so merging does not touch them,
+        # messages added to other after the merge are not merged
+        self._entries.append((other, len(other._entries)))
         if not other.ok:
             self.ok = False
         return self
+
+    def iter_messages(self) -> Iterator[Message]:
+        stack = [(iter(self._entries), self, "", "")]
+        while stack:
+            entries, verdict, position, standard = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                stack.pop()
+            elif isinstance(entry, tuple):
+                merged, count = entry
+                # the merge fills the position and standard only if the merged verdict has no position
+                if verdict.position and not merged.position:
+                    position, standard = verdict.position, verdict.standard or standard
+                stack.append((islice(merged._entries, count), merged, position, standard))
+            else:
+                yield entry._with_defaults(position, standard)
+
+    @property
+    def messages(self) -> Tuple[Message, ...]:
+        """
+        Messages of the verdict and of the merged ones, a tuple, as changing it would not change the verdict:
+        messages are added with add_message or replaced by assigning a list
+        """
+        return tuple(self.iter_messages())
+
+    @messages.setter
+    def messages(self, messages: List[Message]):
+        self._entries = list(messages)
+
+    def group_by(self, *fields: str) -> Dict[tuple, List[Message]]:
+        """Messages grouped by values of the given Message fields, e.g. group_by("position", "message_type")"""
+        groups = {}
+        getter = attrgetter(*fields)
+        for message in self.iter_messages():
+            key = getter(message)
+            groups.setdefault(key if len(fields) > 1 else (key,), []).append(message)
+        return groups
+
+    def to_dict(self) -> dict:
+        data = {
+            "ok": self.ok,
+            "position": self.position,
+            "standard": self.standard,
+            "messages": [message.to_dict() for message in self.iter_messages()],
+        }
+        if self.profile is not None:
+            data["profile"] = [check.to_dict() for check in self.profile]
+        if self.truncated:
+            data["truncated"] = True
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Verdict":
+        messages = [Message.from_dict(message) for message in data["messages"]]
+        verdict = cls(ok=data["ok"], messages=messages, position=data["position"], standard=data["standard"])
+        if data.get("profile") is not None:
+            verdict.profile = [CheckProfile.from_dict(check) for check in data["profile"]]
+        verdict.truncated = data.get("truncated", False)
+        return verdict
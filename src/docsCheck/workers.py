@@ -0,0 +1,219 @@
+"""
+Spawned worker processes that apply the license once and run one job at a time,
+a worker stuck inside a backend call is killed through its handle and a worker that dies fails only its job
+"""
+import multiprocessing
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, List, Optional
+
+from docsCheck import runners
+from docsCheck.scheduler import CancellationToken, abandoned_tasks_running
+from docsCheck.utils import Verdict
+
+# seconds a worker gets over the time budget of its document to return the partial verdict before it is killed,
+# also given to a cancelled job and covering the start of a new worker
+KILL_GRACE = 10.0
+# seconds between two looks at a cancellation flag or a kill deadline
+POLL_INTERVAL = 0.05
+
+_license_error = None
+_cancel_flag = None
+
+
+class WorkerDied(Exception):
+    """The worker ended before returning the result of its job"""
+
+
+class WorkerKilled(WorkerDied):
+    """The worker was killed for not returning the result in time"""
+
+
+def license_error() -> Optional[str]:
+    """Reason the license could not be applied in this worker, None if it is applied"""
+    return _license_error
+
+
+def in_worker() -> bool:
+    """Checks of a worker run in it, its parent kills it when they hang"""
+    return _cancel_flag is not None
+
+
+def _serve(connection, licence_path, cancel_flag):
+    global _license_error, _cancel_flag
+    _cancel_flag = cancel_flag
+    try:
+        runners.set_license(licence_path)
+    except runners.CheckError as err:
+        _license_error = str(err).strip()
+
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        function, args = job
+        try:
+            outcome = (function(*args), None)
+        except Exception as err:
+            outcome = (None, err)
+        # a check abandoned in its thread still uses its document, so the worker is not reused
+        retiring = abandoned_tasks_running()
+        connection.send(outcome + (retiring,))
+        if retiring:
+            return
+
+
+def died_error(err: WorkerDied, time_budget: float = None) -> runners.CheckError:
+    if isinstance(err, WorkerKilled) and time_budget is not None:
+        return runners.CheckError(f"Проверка прервана: документ не проверен за {time_budget:g} с")
+    return runners.CheckError("Процесс проверки аварийно завершился")
+
+
+@contextmanager
+def _cancelled_by_parent(token: CancellationToken):
+    """Cancels the token once the parent cancels the job of this worker"""
+    finished = threading.Event()
+
+    def watch():
+        while not finished.wait(POLL_INTERVAL):
+            if _cancel_flag.value:
+                token.cancel()
+                return
+
+    threading.Thread(target=watch, daemon=True).start()
+    try:
+        yield
+    finally:
+        finished.set()
+
+
+def check_job(doc, doc_type, options: dict, cached: bool = False) -> Verdict:
+    """
+    Job checking a path or bytes with the options of runners.check_document, or of runners.check_cached if cached,
+    the check stops at its next node or section once the parent cancels the job
+    """
+    if _license_error is not None:
+        raise runners.CheckError(_license_error)
+    token = CancellationToken()
+    check = runners.check_cached if cached else runners.check_document
+    with _cancelled_by_parent(token):
+        return check(doc, doc_type, token=token, **options)
+
+
+class Worker:
+    """Worker process with its own connection, jobs are module level functions and picklable arguments"""
+
+    def __init__(self, licence_path=None):
+        context = multiprocessing.get_context("spawn")
+        self.connection, child = context.Pipe()
+        # raised by the parent to stop the running job at its next node or section
+        self._cancel_flag = context.Value("b", 0, lock=False)
+        # spawned workers load the .NET runtime themselves instead of inheriting it with fork
+        self.process = context.Process(target=_serve, args=(child, licence_path, self._cancel_flag), daemon=True)
+        self.process.start()
+        child.close()
+        # time.monotonic() after which the running job is killed, None waits for it as long as it runs
+        self.kill_at = None
+        # the worker ended or is ending, it takes no more jobs
+        self.retired = False
+
+    def submit(self, function: Callable, *args, kill_after: float = None):
+        """Starts the job, the worker is killed if it does not return within kill_after seconds"""
+        self._cancel_flag.value = 0
+        self.kill_at = time.monotonic() + kill_after if kill_after is not None else None
+        try:
+            self.connection.send((function, args))
+        except OSError:
+            self.kill()
+            raise WorkerDied()
+
+    def cancel(self):
+        """Stops the running job at its next node or section, the worker is killed if it does not return in time"""
+        self._cancel_flag.value = 1
+        deadline = time.monotonic() + KILL_GRACE
+        self.kill_at = deadline if self.kill_at is None else min(self.kill_at, deadline)
+
+    def result(self, cancelled: Callable[[], bool] = None) -> Any:
+        """
+        Waits for the result of the running job and raises its exception. Raises WorkerKilled after killing
+        a worker over kill_at and WorkerDied if the worker died. cancelled is looked at while waiting
+        """
+        while not self.connection.poll(POLL_INTERVAL):
+            if cancelled is not None and not self._cancel_flag.value and cancelled():
+                self.cancel()
+            if self.kill_at is not None and time.monotonic() > self.kill_at:
+                self.kill()
+                raise WorkerKilled()
+        return self.received()
+
+    def received(self) -> Any:
+        """Result of the job whose connection is ready, see result"""
+        try:
+            value, error, retiring = self.connection.recv()
+        except (EOFError, OSError):
+            self.kill()
+            raise WorkerDied()
+        if retiring:
+            self.close()
+        if error is not None:
+            raise error
+        return value
+
+    def kill(self):
+        self.retired = True
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def close(self):
+        """Lets an idle worker finish, kills it if it does not"""
+        if not self.retired:
+            self.retired = True
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+        self.process.join(KILL_GRACE)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+class WorkerPool:
+    """
+    At most size workers started on first use and reused, run blocks the calling thread,
+    so the pool is shared by the threads of the server or the executor of AsyncChecker
+    """
+
+    def __init__(self, size: int, licence_path=None):
+        self.licence_path = licence_path
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: List[Worker] = []
+
+    def run(self, function: Callable, *args, kill_after: float = None, cancelled: Callable[[], bool] = None) -> Any:
+        """Result of the job run by a free worker, see Worker.result for the errors"""
+        with self._slots:
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            if worker is None:
+                worker = Worker(self.licence_path)
+            try:
+                worker.submit(function, *args, kill_after=kill_after)
+                return worker.result(cancelled)
+            finally:
+                if not worker.retired:
+                    with self._lock:
+                        self._idle.append(worker)
+
+    def close(self):
+        """Stops the idle workers, a later job starts new ones"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, "samples", "Система_для_автоматического_перелистывания_нот_на_планшете_актуальное.docx")
+DOC_TYPES = [None, "ТЗ", "РО", "ПЗ", "ПИМИ", "ТП"]
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    # tests never read or fill the cache of the user
+    path = tmp_path / "cache"
+    monkeypatch.setenv("DOCSCHECK_CACHE_DIR", str(path))
+    return path
+
+
+@pytest.fixture(scope="session")
+def aw():
+    return pytest.importorskip("aspose.words")
+
+
+@pytest.fixture(scope="session")
+def licensed(aw):
+    """Checks that apply the license themselves, in workers or through check_cached, need a valid one"""
+    from docsCheck import runners
+
+    try:
+        runners.set_license()
+    except runners.CheckError as err:
+        pytest.skip(str(err).strip())
+
+
+@pytest.fixture(scope="session")
+def generated_document(aw, tmp_path_factory):
+    """Small synthetic document of benchmarks/generator.py, short enough for the evaluation version of aspose"""
+    from generator import SPECS, generate_document
+
+    path = tmp_path_factory.mktemp("generated") / "small.docx"
+    generate_document(SPECS["small"]).save(str(path))
+    return str(path)
+
+
+def messages(verdict):
+    return [(message.position, message.standard, message.text, message.message_type) for message in
+            verdict.iter_messages()]
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import time
+
+import pytest
+from docsCheck import runners, workers
+from docsCheck.aio import AsyncChecker
+
+from conftest import ROOT
+
+# loaded by the spawned workers: the job of hang.docx never returns, even before the license is looked at
+HANG = """
+import os
+import time
+
+import docsCheck.workers
+
+_check_job = docsCheck.workers.check_job
+
+
+def _hanging_check_job(doc, *args, **kwargs):
+    if os.path.basename(str(doc)) == "hang.docx":
+        time.sleep(3600)
+    return _check_job(doc, *args, **kwargs)
+
+
+docsCheck.workers.check_job = _hanging_check_job
+"""
+
+
+@pytest.fixture
+def hanging_job(tmp_path, monkeypatch):
+    (tmp_path / "sitecustomize.py").write_text(HANG, encoding="utf-8")
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join([str(tmp_path), os.path.join(ROOT, "src")]))
+    monkeypatch.setattr(workers, "KILL_GRACE", 3.0)
+    return str(tmp_path / "hang.docx")
+
+
+def test_cancelled_check_frees_its_worker(hanging_job, tmp_path):
+    async def scenario():
+        async with AsyncChecker(concurrency=1) as checker:
+            hanging = asyncio.ensure_future(checker.check_async(hanging_job))
+            await asyncio.sleep(1)
+            hanging.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await hanging
+
+            # the only slot is taken until the hanging worker is killed, the next check gets a new one
+            start = time.monotonic()
+            with pytest.raises(runners.CheckError):
+                await asyncio.wait_for(checker.check_async(str(tmp_path / "missing.docx")), 60)
+            return time.monotonic() - start
+
+    assert asyncio.run(scenario()) < 30
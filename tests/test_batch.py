@@ -0,0 +1,78 @@
+import os
+import textwrap
+
+import pytest
+from docsCheck import batch
+from docsCheck.workers import Worker, WorkerDied
+
+from conftest import ROOT, SAMPLE
+
+# loaded by the spawned workers: crash.docx kills its worker, hang.docx never returns
+FAULTS = """
+import os
+import time
+
+import docsCheck.batch
+
+_check_one = docsCheck.batch._check_one
+
+
+def _faulty_check_one(doc_path, *args):
+    name = os.path.basename(doc_path)
+    if name == "crash.docx":
+        os._exit(3)
+    if name == "hang.docx":
+        time.sleep(3600)
+    return _check_one(doc_path, *args)
+
+
+docsCheck.batch._check_one = _faulty_check_one
+"""
+
+
+@pytest.fixture
+def faulty_workers(aw, tmp_path, monkeypatch):
+    (tmp_path / "sitecustomize.py").write_text(textwrap.dedent(FAULTS), encoding="utf-8")
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join([str(tmp_path), os.path.join(ROOT, "src")]))
+
+
+def _results(doc_paths, **kwargs):
+    return {os.path.basename(result.path): result for result in batch.run_batch(doc_paths, use_cache=False, **kwargs)}
+
+
+def test_crash_fails_only_its_document(faulty_workers, tmp_path):
+    crash = str(tmp_path / "crash.docx")
+    results = _results([crash, SAMPLE, str(tmp_path / "missing.docx")], jobs=2)
+    assert results["crash.docx"].error == "Процесс проверки аварийно завершился"
+    others = [result for name, result in results.items() if name != "crash.docx"]
+    assert len(others) == 2
+    # without a license every worker reports it, the documents are still not blamed on the crash
+    assert all(result.error != "Процесс проверки аварийно завершился" for result in others)
+
+
+def test_stuck_worker_is_killed(faulty_workers, tmp_path, monkeypatch):
+    # the grace also covers the start of the worker, which loads aspose before the document
+    monkeypatch.setattr(batch, "KILL_GRACE", 3.0)
+    hang = str(tmp_path / "hang.docx")
+    missing = str(tmp_path / "missing.docx")
+    results = _results([hang, missing], jobs=2, time_budget=0.5)
+    assert results["hang.docx"].error.startswith("Проверка прервана")
+    assert not results["missing.docx"].error.startswith("Проверка прервана")
+
+
+class _DyingWorker(Worker):
+    """Worker that dies while dead.docx is sent to it"""
+
+    def submit(self, function, *args, kill_after=None):
+        if os.path.basename(args[0]) == "dead.docx":
+            self.kill()
+            raise WorkerDied()
+        super().submit(function, *args, kill_after=kill_after)
+
+
+def test_worker_dying_on_the_last_submit(aw, tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "Worker", _DyingWorker)
+    # the budget makes a wait on no worker fail instead of blocking forever
+    results = _results([str(tmp_path / "missing.docx"), str(tmp_path / "dead.docx")], jobs=1, time_budget=60)
+    assert results["dead.docx"].error == "Процесс проверки аварийно завершился"
+    assert results["missing.docx"].error != "Процесс проверки аварийно завершился"
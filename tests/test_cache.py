@@ -0,0 +1,72 @@
+import io
+import os
+
+from docsCheck import runners
+from docsCheck.cache import VerdictCache
+from docsCheck.registry import QUICK_TIER
+from docsCheck.utils import Verdict
+
+from conftest import SAMPLE, messages
+
+
+def _verdict(text: str) -> Verdict:
+    verdict = Verdict(position="Весь документ", standard="ГОСТ 19.106-78")
+    verdict.add_message(text)
+    return verdict
+
+
+def test_miss_then_hit(cache_dir):
+    cache = VerdictCache()
+    key = cache.key(SAMPLE, "ТЗ")
+    assert cache.get(key) is None
+
+    cache.put(key, _verdict("Ошибка"))
+    assert messages(VerdictCache().get(key)) == messages(_verdict("Ошибка"))
+    assert str(cache_dir) in cache._entry_path(key)
+
+
+def test_key_depends_on_content_type_and_tier(tmp_path):
+    changed = tmp_path / "changed.docx"
+    changed.write_bytes(open(SAMPLE, "rb").read() + b"\0")
+    keys = {
+        VerdictCache.key(SAMPLE, "ТЗ"),
+        VerdictCache.key(SAMPLE, "ПЗ"),
+        VerdictCache.key(SAMPLE, "ТЗ", QUICK_TIER),
+        VerdictCache.key(str(changed), "ТЗ"),
+    }
+    assert len(keys) == 4
+    # an omitted type is the general one, a document in memory is keyed by its content
+    assert VerdictCache.key(SAMPLE) == VerdictCache.key(SAMPLE, "ОБЩЕЕ")
+    assert VerdictCache.key(io.BytesIO(open(SAMPLE, "rb").read()), "ТЗ") == VerdictCache.key(SAMPLE, "ТЗ")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = VerdictCache(str(tmp_path / "lru"))
+    cache.put("a" * 64, _verdict("первый"))
+    entry_size = os.path.getsize(cache._entry_path("a" * 64))
+    cache.max_size = entry_size * 2
+    cache.put("b" * 64, _verdict("второй"))
+    # the first entry is used again, so the second one is the oldest
+    os.utime(cache._entry_path("b" * 64), (0, 0))
+    assert cache.get("a" * 64) is not None
+    cache.put("c" * 64, _verdict("третий"))
+
+    assert cache.get("a" * 64) is not None
+    assert cache.get("b" * 64) is None
+    assert cache.get("c" * 64) is not None
+
+
+def test_clear_removes_every_entry(tmp_path):
+    cache = VerdictCache(str(tmp_path / "clear"))
+    cache.put("a" * 64, _verdict("Ошибка"))
+    cache.clear()
+    assert cache.get("a" * 64) is None
+
+
+def test_unwritable_cache_only_turns_caching_off(tmp_path, monkeypatch):
+    not_a_directory = tmp_path / "notadir"
+    not_a_directory.write_text("")
+    monkeypatch.setenv("DOCSCHECK_CACHE_DIR", str(not_a_directory / "cache"))
+
+    verdict = runners.check_cached(SAMPLE, "ТЗ", tier=QUICK_TIER)
+    assert messages(verdict) == messages(runners.check_document(SAMPLE, "ТЗ", tier=QUICK_TIER))
@@ -0,0 +1,74 @@
+import sys
+
+import pytest
+from docsCheck import runners
+from docsCheck.__main__ import EXIT_ERROR, EXIT_FAILED, _main, _main_parser, main
+from docsCheck.registry import FULL_TIER, QUICK_TIER
+from docsCheck.utils import Verdict
+
+from conftest import DOC_TYPES, SAMPLE
+
+
+def _streamed(path, doc_type, tier):
+    return sorted((message.position, message.standard, message.text, message.message_type) for message in
+                  runners.iter_check(path, doc_type, use_cache=False, tier=tier))
+
+
+def _table(path, doc_type, tier):
+    verdict = runners.check_cached(path, doc_type, use_cache=False, tier=tier)
+    return sorted((message.position, message.standard, message.text, message.message_type) for message in
+                  verdict.iter_messages())
+
+
+@pytest.mark.parametrize("doc_type", DOC_TYPES)
+def test_stream_matches_table_quick(doc_type):
+    # streamed messages come in the order the checks finish, so only the sets are compared
+    assert _streamed(SAMPLE, doc_type, QUICK_TIER) == _table(SAMPLE, doc_type, QUICK_TIER)
+
+
+@pytest.mark.parametrize("doc_type", [None, "ТЗ"])
+def test_stream_matches_table_full(licensed, generated_document, doc_type):
+    assert _streamed(generated_document, doc_type, FULL_TIER) == _table(generated_document, doc_type, FULL_TIER)
+
+
+def test_flags_follow_the_document():
+    options = _main_parser().parse_intermixed_args([SAMPLE, "--no-cache", "ТЗ", "--profile=out.json",
+                                                    "--low-memory", "--max-errors", "3"])
+    assert options.document == [SAMPLE, "ТЗ"]
+    assert options.no_cache and options.profile == "out.json"
+    assert options.low_memory == 0 and options.max_errors == 3
+
+
+@pytest.mark.parametrize("args, message", [
+    (["--fail-fast", "--max-errors", "2"], "not allowed with argument --fail-fast"),
+    (["--incremental", "--fail-fast"], "not allowed with argument --incremental"),
+    (["--incremental", "--tier", "quick"], "--incremental используется только с --tier full"),
+    (["--format", "stream", "--fail-fast"], "--fail-fast и --max-errors не используются с потоковым выводом"),
+    (["--format", "jsonl", "--time-budget", "5"], "--time-budget и --check-budget не используются"),
+    (["--format", "stream", "--profile"], "--incremental и --profile используются только с --format table"),
+    (["--jobs", "x"], "invalid int value: 'x'"),
+])
+def test_conflicting_flags_are_rejected(capsys, args, message):
+    assert _main([SAMPLE, "ТЗ"] + args) == EXIT_ERROR
+    assert message in capsys.readouterr().out
+
+
+def test_exit_codes(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["docsCheck", SAMPLE, "ТЗ", "--tier", "quick"])
+    # the sample lacks the sections of a technical assignment
+    assert main() == EXIT_FAILED
+    monkeypatch.setattr(sys, "argv", ["docsCheck", SAMPLE, "ТЗ", "--tier", "quick", "--format", "jsonl"])
+    assert main() == EXIT_FAILED
+    monkeypatch.setattr(sys, "argv", ["docsCheck", SAMPLE + ".missing"])
+    assert main() == EXIT_ERROR
+    monkeypatch.setattr(sys, "argv", ["docsCheck", "--help"])
+    assert main() == 0
+
+
+def test_stopped_check_fails(monkeypatch):
+    verdict = Verdict()
+    verdict.truncated = True
+    monkeypatch.setattr(runners, "run_check", lambda *args, **kwargs: verdict)
+    assert _main([SAMPLE, "--max-errors", "3"]) == EXIT_FAILED
+    verdict.truncated = False
+    assert _main([SAMPLE, "--max-errors", "3"]) == 0
@@ -0,0 +1,43 @@
+import pytest
+from docsCheck import runners
+from docsCheck.scheduler import ErrorBudget
+
+FONT_ERROR = 'Используется некорректный шрифт, используйте "Times New Roman" 12 или 14'
+
+
+@pytest.fixture
+def wrong_fonts(aw, generated_document, tmp_path):
+    # every page gets a font error, so the fonts rule alone goes over a small budget,
+    # the general type misses no required chapters that would spend the budget first
+    doc = aw.Document(generated_document)
+    for run in doc.get_child_nodes(aw.NodeType.RUN, True):
+        run.as_run().font.name = "Arial"
+    path = str(tmp_path / "wrong_fonts.docx")
+    doc.save(path)
+    return path
+
+
+def _font_errors(verdict):
+    return [message.position for message in verdict.iter_messages() if message.text == FONT_ERROR]
+
+
+def test_budget_counts_keys_once_and_settles():
+    budget = ErrorBudget(2)
+    budget.found("check_fonts", 1)
+    budget.found("check_fonts", 1)
+    budget.found("check_paragraphs")
+    assert not budget.exceeded
+    budget.found("check_paragraphs")
+    assert budget.exceeded
+    budget.settle("check_paragraphs", 0)
+    assert not budget.exceeded
+
+
+def test_traversal_stops_once_over_the_budget(wrong_fonts):
+    full = runners.check_document(wrong_fonts)
+    stopped = runners.check_document(wrong_fonts, max_errors=3)
+    assert stopped.truncated
+    # the fonts rule ends its traversal at the error over the budget instead of reading every page
+    assert 0 < len(_font_errors(stopped)) <= 4 < len(_font_errors(full))
+    assert set(_font_errors(stopped)) <= set(_font_errors(full))
+    assert not runners.check_document(wrong_fonts, max_errors=10 ** 6).truncated
@@ -0,0 +1,67 @@
+import shutil
+
+import pytest
+from docsCheck import checker, runners
+
+from conftest import messages
+
+
+@pytest.fixture
+def document(generated_document, tmp_path):
+    # the incremental state is kept by the path, so every test edits its own copy
+    path = str(tmp_path / "document.docx")
+    shutil.copyfile(generated_document, path)
+    return path
+
+
+def _edit_last_section(aw, path):
+    doc = aw.Document(path)
+    runs = doc.last_section.body.get_child_nodes(aw.NodeType.RUN, True)
+    runs[runs.count - 1].as_run().font.name = "Arial"
+    doc.save(path)
+
+
+def _add_heading_to_first_section(aw, path):
+    # the contents is not refreshed, so the section of the new heading gets no bookmark
+    doc = aw.Document(path)
+    builder = aw.DocumentBuilder(doc)
+    builder.move_to_section(0)
+    builder.paragraph_format.style_identifier = aw.StyleIdentifier.HEADING1
+    builder.writeln("5. НОВАЯ ГЛАВА")
+    doc.save(path)
+
+
+def _full(path, doc_type):
+    return messages(runners.check_document(path, doc_type))
+
+
+@pytest.mark.parametrize("doc_type", [None, "ТЗ"])
+def test_incremental_matches_full(aw, cache_dir, document, doc_type):
+    assert messages(runners.check_document(document, doc_type, incremental=True)) == _full(document, doc_type)
+    assert any((cache_dir / "incremental").iterdir())
+    # the unchanged document is answered from the saved state
+    assert messages(runners.check_document(document, doc_type, incremental=True)) == _full(document, doc_type)
+
+    before = _full(document, doc_type)
+    _edit_last_section(aw, document)
+    after = _full(document, doc_type)
+    assert after != before
+    assert messages(runners.check_document(document, doc_type, incremental=True)) == after
+
+
+def test_heading_without_bookmark_rechecks_titles(aw, document, monkeypatch):
+    runners.check_document(document, "ТЗ", incremental=True)
+    _add_heading_to_first_section(aw, document)
+
+    calls = []
+    check_titles = checker.BaseChecker.check_titles
+    monkeypatch.setattr(checker.BaseChecker, "check_titles", lambda self: calls.append(1) or check_titles(self))
+    assert messages(runners.check_document(document, "ТЗ", incremental=True)) == _full(document, "ТЗ")
+    # once by the incremental check, once by the full one
+    assert len(calls) == 2
+
+
+def test_low_memory_matches_full(generated_document):
+    # low memory checks the document section by section
+    low_memory = runners.check_document(generated_document, "ТЗ", low_memory=True)
+    assert messages(low_memory) == _full(generated_document, "ТЗ")
@@ -0,0 +1,33 @@
+from docsCheck import runners
+from docsCheck.profiling import CheckProfile, Profiler
+
+NODE_RULES = ["check_fonts", "check_paragraphs", "check_lists", "check_line_spacing"]
+
+
+def test_parts_count_into_their_check():
+    profiler = Profiler()
+    with profiler.check("check_fonts, check_lists"):
+        fonts = profiler.part("check_fonts")
+        for _ in range(2):
+            with profiler.accumulate(fonts):
+                profiler.count("page_lookup")
+        with profiler.accumulate(profiler.part("check_lists")):
+            profiler.count("page_lookup", 3)
+        assert profiler.part("check_fonts") is fonts
+        assert profiler.part("check_fonts, check_lists") is None
+    assert profiler.part("check_fonts") is None
+    task, fonts, lists = profiler.checks
+    assert task.counts["page_lookup"] == 5 and task.part_of is None
+    assert fonts.counts["page_lookup"] == 2 and fonts.part_of == task.check
+    assert lists.counts["page_lookup"] == 3 and lists.memory_delta is None
+    assert CheckProfile.from_dict(fonts.to_dict()).part_of == task.check
+
+
+def test_shared_traversal_is_profiled_per_check(generated_document):
+    verdict = runners.check_document(generated_document, profile=True)
+    fused = [check for check in verdict.profile if all(rule in check.check for rule in NODE_RULES)]
+    assert len(fused) == 1
+    parts = {check.check: check for check in verdict.profile if check.part_of == fused[0].check}
+    assert sorted(parts) == sorted(NODE_RULES)
+    assert sum(part.wall_time for part in parts.values()) <= fused[0].wall_time
+    assert sum(part.counts["page_lookup"] for part in parts.values()) == fused[0].counts["page_lookup"]
@@ -0,0 +1,82 @@
+import datetime
+
+import pytest
+from docsCheck import runners
+from docsCheck.registry import QUICK_TIER, get_checker
+
+from conftest import DOC_TYPES, SAMPLE, messages
+
+
+def _aspose_quick(aw, path, doc_type):
+    return get_checker(doc_type)(aw.Document(path), tier=QUICK_TIER).main_check()
+
+
+def _package_quick(path, doc_type):
+    return runners.check_document(path, doc_type, tier=QUICK_TIER)
+
+
+@pytest.fixture(scope="module")
+def notes_document(aw, tmp_path_factory):
+    """Three sections, the wrong fonts and bullets of the last two are only in their notes and comments"""
+    doc = aw.Document()
+    builder = aw.DocumentBuilder(doc)
+    builder.font.name = "Times New Roman"
+    for number in range(1, 4):
+        if number > 1:
+            builder.insert_break(aw.BreakType.SECTION_BREAK_NEW_PAGE)
+        builder.writeln(f"Раздел {number}")
+
+    footnote = builder.insert_footnote(aw.notes.FootnoteType.FOOTNOTE, "")
+    endnote = builder.insert_footnote(aw.notes.FootnoteType.ENDNOTE, "")
+    builder.move_to(footnote.first_paragraph)
+    builder.font.name = "Comic Sans MS"
+    builder.write("Сноска")
+    builder.move_to(endnote.first_paragraph)
+    builder.list_format.apply_bullet_default()
+    builder.write("Концевая сноска")
+
+    comment = aw.Comment(doc, "Автор", "А", datetime.datetime(2024, 1, 1))
+    comment.paragraphs.add(aw.Paragraph(doc))
+    run = aw.Run(doc, "Комментарий")
+    run.font.name = "Arial"
+    comment.first_paragraph.append_child(run)
+    doc.sections[1].body.first_paragraph.append_child(comment)
+
+    path = tmp_path_factory.mktemp("notes") / "notes.docx"
+    doc.save(str(path))
+    return str(path)
+
+
+@pytest.mark.parametrize("doc_type", DOC_TYPES)
+def test_notes_are_read_with_their_section(aw, notes_document, doc_type):
+    package = messages(_package_quick(notes_document, doc_type))
+    assert package == messages(_aspose_quick(aw, notes_document, doc_type))
+    positions = {position for position, _, text, _ in package if "шрифт" in text or "перечисления" in text}
+    assert positions == {"Раздел 2", "Раздел 3"}
+
+
+@pytest.mark.parametrize("doc_type", DOC_TYPES)
+def test_package_matches_aspose_on_generated_document(aw, generated_document, doc_type):
+    assert messages(_package_quick(generated_document, doc_type)) == \
+        messages(_aspose_quick(aw, generated_document, doc_type))
+
+
+@pytest.mark.parametrize("doc_type", DOC_TYPES)
+def test_package_matches_aspose_on_sample(aw, licensed, doc_type):
+    # the evaluation version of aspose truncates the sample, so it is compared only with the license
+    assert messages(_package_quick(SAMPLE, doc_type)) == messages(_aspose_quick(aw, SAMPLE, doc_type))
+
+
+@pytest.mark.parametrize("check", ["check_page_margins", "check_table_of_contents", "check_fonts", "check_lists"])
+def test_package_checks_read_the_package_themselves(notes_document, check):
+    fresh = runners.open_checker(notes_document, tier=QUICK_TIER)
+    read = runners.open_checker(notes_document, tier=QUICK_TIER)
+    try:
+        read.package.read()
+        verdict = getattr(fresh, check)()
+        assert messages(verdict) == messages(getattr(read, check)())
+        # the wrong fonts and bullets are those of the notes of sections 2 and 3, margins are the ones of letter paper
+        assert check == "check_table_of_contents" or not verdict.ok
+    finally:
+        fresh.release_layout()
+        read.release_layout()
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+from docsCheck.scheduler import CancellationToken, CheckCancelled, CheckTask, iter_tasks, run_tasks
+
+from conftest import DOC_TYPES, messages
+
+
+def test_tasks_start_after_their_requirements():
+    finished = []
+
+    def task(name, delay=0.0):
+        def run():
+            time.sleep(delay)
+            finished.append(name)
+            return name
+        return run
+
+    tasks = [
+        CheckTask("toc", task("toc", 0.05)),
+        CheckTask("margins", task("margins")),
+        CheckTask("titles", task("titles"), ("toc",)),
+        CheckTask("chapters", task("chapters"), ("toc", "titles")),
+    ]
+    assert run_tasks(tasks, jobs=4) == {name: name for name in ["toc", "margins", "titles", "chapters"]}
+    assert finished.index("titles") > finished.index("toc")
+    assert finished.index("chapters") > finished.index("titles")
+
+
+def test_requirement_declared_later_is_rejected():
+    with pytest.raises(ValueError):
+        run_tasks([CheckTask("titles", lambda: None, ("toc",)), CheckTask("toc", lambda: None)])
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_cancelled_run_starts_nothing_more(jobs):
+    token = CancellationToken()
+    started = []
+
+    def first():
+        started.append("first")
+        token.cancel()
+        token.raise_if_cancelled()
+
+    tasks = [CheckTask("first", first), CheckTask("second", lambda: started.append("second"), ("first",))]
+    assert list(iter_tasks(tasks, jobs, token)) == []
+    assert started == ["first"]
+    with pytest.raises(CheckCancelled):
+        token.raise_if_cancelled()
+
+
+def test_nothing_starts_after_an_abandoned_task(monkeypatch):
+    from docsCheck import scheduler
+
+    monkeypatch.setattr(scheduler, "ABANDON_GRACE", 0.1)
+    token = CancellationToken()
+    release = threading.Event()
+    started = []
+
+    def stuck():
+        # a backend call that never looks at the token
+        release.wait(5)
+        return "stuck"
+
+    tasks = [CheckTask("stuck", stuck), CheckTask("later", lambda: started.append("later"))]
+    try:
+        assert list(iter_tasks(tasks, 1, token, check_budget=0.1)) == []
+        assert token.abandoned and started == []
+        assert scheduler.abandoned_tasks_running()
+    finally:
+        release.set()
+    time.sleep(0.1)
+    assert not scheduler.abandoned_tasks_running()
+
+
+def test_document_tasks_take_turns(aw):
+    from docsCheck.registry import get_checker
+
+    checker = get_checker()(aw.Document(), jobs=4)
+    active = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def probe():
+        with lock:
+            active.append(None)
+            overlaps.append(len(active) > 1)
+        time.sleep(0.02)
+        with lock:
+            active.pop()
+
+    run_tasks([checker._task(f"probe {i}", probe) for i in range(4)], jobs=4)
+    assert overlaps == [False] * 4
+
+
+@pytest.mark.parametrize("doc_type", DOC_TYPES)
+def test_messages_do_not_depend_on_jobs(aw, generated_document, doc_type):
+    from docsCheck import runners
+
+    assert messages(runners.check_document(generated_document, doc_type, jobs=4)) == \
+        messages(runners.check_document(generated_document, doc_type, jobs=1))
@@ -0,0 +1,65 @@
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+from docsCheck import server as check_server
+from docsCheck.server import CheckRequestHandler
+from docsCheck.utils import Verdict
+
+from conftest import SAMPLE
+
+
+@pytest.fixture
+def small_server():
+    # the size and admission checks come before any worker is used, so a bare server with the handler is enough
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CheckRequestHandler)
+    server.max_body = 16
+    server.admission = threading.BoundedSemaphore(1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _post(server, headers, body=b""):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+    try:
+        connection.putrequest("POST", "/check")
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders(body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read().decode("utf-8"))
+    finally:
+        connection.close()
+
+
+def test_large_body_is_rejected(small_server):
+    # only the header is sent, the server answers without waiting for the body
+    status, data = _post(small_server, {"Content-Length": str(2 ** 30)})
+    assert status == 413
+    assert data["error"].startswith("Размер документа больше")
+
+
+@pytest.mark.parametrize("length", ["x", "-1"])
+def test_bad_length_is_rejected(small_server, length):
+    assert _post(small_server, {"Content-Length": length})[0] == 400
+
+
+def test_saturated_server_does_not_read_the_body(small_server):
+    small_server.admission.acquire()
+    # the body is never sent, a server reading it would not answer before the timeout
+    assert _post(small_server, {"Content-Length": "16"})[0] == 503
+
+
+def test_client_forwards_no_cache(small_server):
+    requests = []
+    small_server.max_body = 2 ** 20
+    small_server.check = lambda source, doc_type, use_cache: requests.append((source, doc_type, use_cache)) or Verdict()
+    host, port = small_server.server_address
+    for use_cache in [True, False]:
+        assert check_server.request_check(SAMPLE, "ТЗ", host, port, use_cache=use_cache).ok
+    assert requests == [(SAMPLE, "ТЗ", True), (SAMPLE, "ТЗ", False)]
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+from typing import Dict
+
+from conftest import ROOT
+
+# modules the CLI loads only to check a document, --help and argument errors must start without them
+DEFERRED = ["aspose", "tomllib", "tomli", "hashlib", "concurrent.futures", "zipfile", "tempfile", "xml.etree",
+            "multiprocessing", "docsCheck.checker", "docsCheck.ooxml", "docsCheck.batch", "docsCheck.server",
+            "docsCheck.workers"]
+# microseconds of importing docsCheck.runners with everything it imports
+RUNNERS_IMPORT_BUDGET = 100_000
+
+
+def _import_times(*args: str) -> Dict[str, int]:
+    """Cumulative import time of every module imported by python -X importtime <args>"""
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "src"))
+    completed = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True,
+                               env=env, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def _deferred(times: Dict[str, int]):
+    return sorted(name for name in times for prefix in DEFERRED if name == prefix or name.startswith(prefix + "."))
+
+
+def test_help_does_not_load_the_checks():
+    assert _deferred(_import_times("-m", "docsCheck", "--help")) == []
+
+
+def test_runners_import_time():
+    # the best of a few runs, a busy machine only slows some of them
+    runs = [_import_times("-c", "import docsCheck.runners") for _ in range(3)]
+    assert _deferred(runs[0]) == []
+    assert min(times["docsCheck.runners"] for times in runs) < RUNNERS_IMPORT_BUDGET
@@ -0,0 +1,72 @@
+import pickle
+
+import pytest
+from docsCheck.utils import Message, MessageTypes, Verdict
+
+from conftest import messages
+
+
+def test_merge_takes_the_messages_of_the_moment():
+    # the footers check merges the same verdict once per header while adding messages to it
+    section = Verdict(position="Нижний колонтитул раздела 1", standard="ГОСТ 19.604-78")
+    verdict = Verdict()
+    for text in ["m0", "m1", "m2"]:
+        verdict.add_message(text)
+        section += verdict
+
+    assert [message.text for message in section.iter_messages()] == ["m0", "m0", "m1", "m0", "m1", "m2"]
+
+
+def test_merge_fills_position_and_standard():
+    section = Verdict(position="Раздел 1", standard="ГОСТ 19.106-78")
+    own = Verdict(position="Страница 2", standard="ГОСТ 2.105-95")
+    own.add_message("свой")
+    merged = Verdict()
+    merged.add_message("общий", message_type=MessageTypes.WARNING)
+    section += own
+    section += merged
+
+    assert messages(section) == [
+        ("Страница 2", "ГОСТ 2.105-95", "свой", MessageTypes.ERROR),
+        ("Раздел 1", "ГОСТ 19.106-78", "общий", MessageTypes.WARNING),
+    ]
+    assert not section.ok
+
+
+def test_nested_merges_are_snapshots():
+    inner = Verdict()
+    inner.add_message("a")
+    middle = Verdict()
+    middle += inner
+    outer = Verdict(position="Раздел 2")
+    outer += middle
+    inner.add_message("b")
+    middle += inner
+
+    assert [message.text for message in outer.iter_messages()] == ["a"]
+    assert [message.text for message in middle.iter_messages()] == ["a", "a", "b"]
+
+
+def test_round_trip_keeps_messages():
+    verdict = Verdict(position="Раздел 1")
+    merged = Verdict(standard="ГОСТ 19.106-78")
+    merged.add_message("Ошибка {}", args=(1,))
+    verdict += merged
+    verdict.truncated = True
+
+    restored = Verdict.from_dict(verdict.to_dict())
+    assert messages(restored) == messages(verdict)
+    assert restored.truncated
+
+
+def test_messages_are_read_only():
+    verdict = Verdict(position="Раздел 1")
+    verdict.add_message("первое")
+    with pytest.raises(AttributeError):
+        verdict.messages.append(Message("второе", "", "", MessageTypes.ERROR))
+    with pytest.raises(AttributeError):
+        verdict.messages[0].position = "Раздел 2"
+
+    verdict.messages = [Message("второе", "Раздел 2", "", MessageTypes.WARNING)]
+    assert messages(verdict) == [("Раздел 2", "", "второе", MessageTypes.WARNING)]
+    assert pickle.loads(pickle.dumps(verdict)).messages == verdict.messages
@@ -0,0 +1,74 @@
+import os
+import time
+
+import pytest
+from docsCheck import runners, workers
+
+from conftest import ROOT
+
+# loaded by the spawned workers: the load of hang.docx never returns
+HANG = """
+import os
+import time
+
+import docsCheck.runners
+
+_check_document = docsCheck.runners.check_document
+
+
+def _hanging_check_document(doc_path, *args, **kwargs):
+    if os.path.basename(str(doc_path)) == "hang.docx":
+        time.sleep(3600)
+    return _check_document(doc_path, *args, **kwargs)
+
+
+docsCheck.runners.check_document = _hanging_check_document
+"""
+
+
+@pytest.fixture
+def hanging_load(aw, tmp_path, monkeypatch):
+    (tmp_path / "sitecustomize.py").write_text(HANG, encoding="utf-8")
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join([str(tmp_path), os.path.join(ROOT, "src")]))
+    # the grace also covers the start of the worker, which loads aspose before the document
+    monkeypatch.setattr(workers, "KILL_GRACE", 3.0)
+    return str(tmp_path / "hang.docx")
+
+
+def test_budgeted_check_kills_a_hanging_load(licensed, hanging_load):
+    start = time.monotonic()
+    with pytest.raises(runners.CheckError, match="Проверка прервана"):
+        runners.check_cached(hanging_load, use_cache=False, time_budget=0.5)
+    assert time.monotonic() - start < 10
+
+
+def test_worker_over_its_deadline_is_killed():
+    worker = workers.Worker()
+    try:
+        worker.submit(time.sleep, 3600, kill_after=3.0)
+        with pytest.raises(workers.WorkerKilled):
+            worker.result()
+        assert not worker.process.is_alive()
+    finally:
+        worker.kill()
+
+
+def test_cancelled_job_kills_its_worker(monkeypatch):
+    monkeypatch.setattr(workers, "KILL_GRACE", 3.0)
+    pool = workers.WorkerPool(1)
+    try:
+        first = pool.run(os.getpid)
+        with pytest.raises(workers.WorkerKilled):
+            pool.run(time.sleep, 3600, cancelled=lambda: True)
+        # the killed worker is replaced by the next job
+        assert pool.run(os.getpid) != first
+    finally:
+        pool.close()
+
+
+def test_worker_is_reused():
+    pool = workers.WorkerPool(1)
+    try:
+        assert pool.run(os.getpid) == pool.run(os.getpid)
+    finally:
+        pool.close()